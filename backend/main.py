@@ -1,16 +1,28 @@
 # backend/main.py
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
-from routes import resume_routes
+from routes import resume_routes, admin_routes, search_routes
+from services.request_context import RequestContextMiddleware
+from services.http_transport import openrouter_transport, OPENROUTER_WARMUP_ENABLED, OPENROUTER_WARMUP_CONNECTIONS
 
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pre-connect to OpenRouter so the first user request doesn't pay for TCP + TLS setup
+    if OPENROUTER_WARMUP_ENABLED:
+        await openrouter_transport.warm_up(connections=OPENROUTER_WARMUP_CONNECTIONS)
+    yield
+    await openrouter_transport.aclose()
+
 app = FastAPI(
     title="AI Resume Builder API",
     description="API for generating and reviewing resumes using AI",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -38,8 +50,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Bind the caller's identity for fair queuing of LLM work
+app.add_middleware(RequestContextMiddleware)
+
 # Include Routes
 app.include_router(resume_routes.router, prefix="/api/resume", tags=["Resume"])
+app.include_router(admin_routes.router, prefix="/api/admin", tags=["Admin"])
+app.include_router(search_routes.router, prefix="/api/search", tags=["Search"])
 
 @app.get("/")
 def read_root():
@@ -0,0 +1,153 @@
+# backend/routes/admin_routes.py
+import os
+import hmac
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from services.llm_cache import response_cache
+from services.single_flight import llm_single_flight
+from services.latency_tracker import llm_latency_tracker
+from services.model_health import model_health_registry
+from services.upstream_scheduler import upstream_scheduler
+from services.http_transport import openrouter_transport
+from services.disconnect import disconnect_stats
+from services.token_budget import token_usage_tracker
+from services.prompt_registry import prompt_registry
+from services.json_repair import json_repair_stats
+from services.synonym_graph import synonym_graph_stats
+from services.search_index import resume_search_index
+from services.near_duplicates import analysis_reuse_cache
+
+# These endpoints expose internals and can wipe caches or reset circuit breakers, so they
+# all need their own key; they are disabled until ADMIN_API_KEY is set
+ADMIN_API_KEY = os.getenv("ADMIN_API_KEY", "")
+
+def require_admin_key(x_admin_key: Optional[str] = Header(None)) -> None:
+    if not ADMIN_API_KEY:
+        raise HTTPException(status_code=503, detail="Admin endpoints are not configured.")
+    if not x_admin_key or not hmac.compare_digest(x_admin_key, ADMIN_API_KEY):
+        raise HTTPException(status_code=401, detail="Invalid or missing X-Admin-Key header.")
+
+router = APIRouter(dependencies=[Depends(require_admin_key)])
+
+@router.get("/llm-cache")
+async def get_llm_cache_stats():
+    """
+    Hit/miss counters and occupancy of the LLM response cache.
+    """
+    return response_cache.stats()
+
+@router.delete("/llm-cache")
+async def clear_llm_cache():
+    """
+    Drop every cached LLM response from both the memory and disk tiers.
+    """
+    await response_cache.clear()
+    return response_cache.stats()
+
+@router.get("/llm-single-flight")
+async def get_llm_single_flight_stats():
+    """
+    How many identical in-flight LLM requests were coalesced into a shared upstream call.
+    """
+    return llm_single_flight.stats()
+
+@router.get("/llm-latency")
+async def get_llm_latency_stats():
+    """
+    Rolling upstream latency percentiles per endpoint (also the hedging thresholds).
+    """
+    return llm_latency_tracker.stats()
+
+@router.get("/models")
+async def get_model_health():
+    """
+    Circuit breaker state and health counters for every upstream model seen so far.
+    """
+    return model_health_registry.snapshot()
+
+@router.delete("/models")
+async def reset_model_health(model: Optional[str] = None):
+    """
+    Close the circuit for one model (?model=...) or reset the whole registry.
+    """
+    model_health_registry.reset(model)
+    return model_health_registry.snapshot()
+
+@router.get("/upstream-scheduler")
+async def get_upstream_scheduler_stats():
+    """
+    Per-model concurrency, rate limits, queue depth and queue wait times for upstream calls.
+    """
+    return upstream_scheduler.stats()
+
+@router.get("/http-pool")
+async def get_http_pool_stats():
+    """
+    Upstream connection pool usage: open/idle connections, reuse and connect/TLS setup times.
+    """
+    return openrouter_transport.stats()
+
+@router.get("/disconnects")
+async def get_disconnect_stats():
+    """
+    Per-endpoint count of requests abandoned by the client and the upstream work cancelled with them.
+    """
+    return disconnect_stats.stats()
+
+@router.get("/token-usage")
+async def get_token_usage_stats():
+    """
+    Per-endpoint tokens in/out histograms and how often prompts were trimmed to fit their budget.
+    """
+    return token_usage_tracker.stats()
+
+@router.get("/prompts")
+async def get_prompt_stats():
+    """
+    Registered prompt versions per endpoint, their static prefix size and cached prompt tokens.
+    """
+    return prompt_registry.stats()
+
+@router.get("/json-repair")
+async def get_json_repair_stats():
+    """
+    Per-endpoint JSON responses parsed cleanly, repaired, or unrepairable, and upstream calls per success.
+    """
+    return json_repair_stats.stats()
+
+@router.get("/synonym-graph")
+async def get_synonym_graph_stats():
+    """
+    Size of the keyword synonym graph and how many /expand-keywords terms it served without the LLM.
+    """
+    return synonym_graph_stats.stats()
+
+@router.get("/search-index")
+async def get_search_index_stats():
+    """
+    Size of the resume search index: live and dead docs, segment vs not-yet-compacted postings.
+    """
+    return resume_search_index.stats()
+
+@router.post("/search-index/compact")
+async def compact_search_index():
+    """
+    Fold logged updates into a new segment file now instead of waiting for the threshold.
+    """
+    await resume_search_index.compact_async()
+    return resume_search_index.stats()
+
+@router.get("/near-duplicates")
+async def get_near_duplicate_stats():
+    """
+    How many review/heatmap/benchmark requests reused the result of a near-identical earlier resume.
+    """
+    return analysis_reuse_cache.stats()
+
+@router.delete("/near-duplicates")
+async def clear_near_duplicate_cache():
+    """
+    Forget every stored analysis, so the next request for each resume calls the LLM again.
+    """
+    analysis_reuse_cache.clear()
+    return analysis_reuse_cache.stats()
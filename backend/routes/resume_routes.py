@@ -1,13 +1,16 @@
 # backend/routes/resume_routes.py
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Body
+import time
+import asyncio
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Body, Query, Request
+from fastapi.responses import StreamingResponse
 from schemas.resume import (
     ResumeInput, ResumeOutput, ReviewInput, ReviewOutput,
     CoverLetterInput, CoverLetterOutput,
     InterviewQuestionsInput, InterviewQuestionsOutput,
-    JobMatchInput, JobMatchOutput,
+    JobMatchInput, JobMatchOutput, BatchJobMatchInput, BatchJobMatchOutput,
     ImproveResumeInput, ImproveResumeOutput,
     ResignationLetterInput, ResignationLetterOutput,
-    RewriteBulletInput, RewriteBulletOutput,
+    RewriteBulletInput, RewriteBulletOutput, RewriteBulletsInput, RewriteBulletsOutput,
     CareerPathInput, CareerPathOutput,
     ResumeHeatMapInput, ResumeHeatMapOutput,
     IndustryBenchmarkInput, IndustryBenchmarkOutput,
@@ -21,41 +24,82 @@ from schemas.resume import (
     MultiResumePortfolioInput, MultiResumePortfolioOutput,
     SkillGapAnalyzerInput, SkillGapAnalyzerOutput,
     CareerTrendAnalyzerInput, CareerTrendAnalyzerOutput,
-    SalaryNegotiationInput, SalaryNegotiationOutput
+    SalaryNegotiationInput, SalaryNegotiationOutput,
+    ExtractSkillsInput, ExtractSkillsOutput, ExtractedSkill
 )
 from services.ai_service import (
     generate_resume_content, review_resume_content,
-    match_job_description, generate_cover_letter,
+    match_job_description, match_job_descriptions_batch, generate_cover_letter,
     generate_interview_questions, improve_resume_content,
     generate_resignation_letter, rewrite_bullet_point,
+    rewrite_bullet_points, stream_rewrite_bullets, MAX_REWRITE_BULLETS,
+    stream_cover_letter, stream_resignation_letter,
     predict_career_path, generate_resume_heatmap,
     benchmark_against_industry, translate_resume,
-    analyze_resume_analytics, chat_with_ai_agent,
+    analyze_resume_analytics, chat_with_ai_agent, stream_chat_with_ai_agent,
     analyze_and_tailor_resume,
     quantify_achievement, generate_summary_variations,
     expand_keyword_synonyms,     generate_multi_resume_portfolio,     analyze_skill_gaps_with_learning_paths,     analyze_career_trends, simulate_salary_negotiation
 )
 from services.parser_service import extract_text_from_pdf
+from services.skill_taxonomy import extract_skills
+from services.job_ranker import MAX_BATCH_JOBS
+from services.streaming import format_sse, format_ndjson, STREAM_HEADERS
+from services.disconnect import run_until_disconnected, disconnect_stats
 
 router = APIRouter()
 
+def streaming_response(events, stream_format: str = "sse", endpoint: str = "") -> StreamingResponse:
+    """
+    Relay (event, payload) pairs from a streaming service function as SSE or NDJSON.
+    `token` payloads are sent as {"delta": text}; the final `done` payload is the endpoint's
+    output model. Failures after the stream has started are reported as an `error` event.
+    If the client disconnects mid-stream the generator is closed, which closes the upstream
+    stream and frees its scheduler slot; that is counted under `endpoint`.
+    """
+    encode = format_ndjson if stream_format == "ndjson" else format_sse
+    media_type = "application/x-ndjson" if stream_format == "ndjson" else "text/event-stream"
+
+    async def body():
+        disconnect_stats.record_request(endpoint)
+        started = time.monotonic()
+        try:
+            async for event, payload in events:
+                if event == "token":
+                    yield encode("token", {"delta": payload})
+                else:
+                    yield encode(event, payload.model_dump())
+        except HTTPException as e:
+            yield encode("error", {"status_code": e.status_code, "detail": e.detail})
+        except Exception as e:
+            yield encode("error", {"status_code": 500, "detail": str(e)})
+        except (asyncio.CancelledError, GeneratorExit):
+            disconnect_stats.record_disconnect(endpoint, time.monotonic() - started)
+            raise
+
+    return StreamingResponse(body(), media_type=media_type, headers=STREAM_HEADERS)
+
 @router.post("/generate", response_model=ResumeOutput)
-async def generate_resume(data: ResumeInput):
+async def generate_resume(request: Request, data: ResumeInput):
     """
     Generate an AI-optimized resume based on structured user input.
     """
     try:
-        result = generate_resume_content(data)
+        result = await run_until_disconnected(request, "generate", generate_resume_content(data))
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/review", response_model=ReviewOutput)
 async def review_resume(
+    request: Request,
     file: UploadFile = File(None),
     resume_text: str = Form(None),
     target_role: str = Form(...),
-    job_description: str = Form(None)
+    job_description: str = Form(None),
+    force_refresh: bool = Form(False)
 ):
     """
     Review a resume (PDF upload or text paste) against a target role.
@@ -78,56 +122,97 @@ async def review_resume(
         review_input = ReviewInput(
             resume_text=text_to_review,
             target_role=target_role,
-            job_description=job_description
+            job_description=job_description,
+            force_refresh=force_refresh
         )
-        result = review_resume_content(review_input)
+        result = await run_until_disconnected(request, "review", review_resume_content(review_input))
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/match-job", response_model=JobMatchOutput)
-async def match_job(data: JobMatchInput):
+async def match_job(request: Request, data: JobMatchInput, mode: str = Query("llm", pattern="^(fast|hybrid|llm)$")):
     """
     Match resume against a specific job description.
     Provides detailed keyword analysis and recommendations.
+    
+    `mode=fast` uses the local keyword matcher only (no LLM call), `mode=hybrid` adds
+    LLM-written recommendations to the local match, `mode=llm` (default) is fully LLM-based.
+    """
+    try:
+        result = await run_until_disconnected(request, "match-job", match_job_description(data, mode))
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/match-jobs/batch", response_model=BatchJobMatchOutput)
+async def match_jobs_batch(request: Request, data: BatchJobMatchInput):
+    """
+    Rank many job descriptions against one resume by BM25 similarity and keyword coverage.
+    Scoring is local and vectorised; only the top_k matches get LLM recommendations.
     """
+    if not data.job_descriptions:
+        raise HTTPException(status_code=400, detail="job_descriptions must not be empty.")
+    if len(data.job_descriptions) > MAX_BATCH_JOBS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_JOBS} job descriptions per request.")
     try:
-        result = match_job_description(data)
+        result = await run_until_disconnected(request, "match-jobs-batch", match_job_descriptions_batch(data))
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/cover-letter", response_model=CoverLetterOutput)
-async def create_cover_letter(data: CoverLetterInput):
+async def create_cover_letter(request: Request, data: CoverLetterInput):
     """
     Generate a personalized cover letter based on resume and job description.
     """
     try:
-        result = generate_cover_letter(data)
+        result = await run_until_disconnected(request, "cover-letter", generate_cover_letter(data))
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/cover-letter/stream")
+async def create_cover_letter_stream(data: CoverLetterInput, format: str = Query("sse", pattern="^(sse|ndjson)$")):
+    """
+    Streaming variant of /cover-letter (SSE by default, `?format=ndjson` for chunked NDJSON).
+    Emits `token` events with the letter body as it is written, then a `done` event with
+    the full CoverLetterOutput including personalized_sections.
+    """
+    return streaming_response(stream_cover_letter(data), format, endpoint="cover-letter")
+
 @router.post("/interview-questions", response_model=InterviewQuestionsOutput)
-async def get_interview_questions(data: InterviewQuestionsInput):
+async def get_interview_questions(request: Request, data: InterviewQuestionsInput):
     """
     Generate interview questions and suggested answers based on resume.
     """
     try:
-        result = generate_interview_questions(data)
+        result = await run_until_disconnected(request, "interview-questions", generate_interview_questions(data))
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/improve", response_model=ImproveResumeOutput)
-async def improve_resume(data: ImproveResumeInput):
+async def improve_resume(request: Request, data: ImproveResumeInput):
     """
     Improve a resume by applying AI suggestions and recommendations.
     Takes the original resume and suggestions, returns an improved version.
     """
     try:
-        result = improve_resume_content(data)
+        result = await run_until_disconnected(request, "improve", improve_resume_content(data))
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -145,109 +230,195 @@ async def extract_text_from_uploaded_pdf(file: UploadFile = File(...)):
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/extract-skills", response_model=ExtractSkillsOutput)
+async def extract_skills_from_text(data: ExtractSkillsInput):
+    """
+    Canonical skills mentioned in a resume (or any text), found with the local skill
+    taxonomy: aliases like "k8s" or "ReactJS" map to one skill. No LLM call. With a job
+    description, also returns its skills and the ones the text is missing.
+    """
+    skills = [ExtractedSkill(**m._asdict()) for m in extract_skills(data.text)]
+    categories = {}
+    for s in skills:
+        categories.setdefault(s.category, []).append(s.skill)
+    job_skills = missing = None
+    if data.job_description:
+        job_skills = [ExtractedSkill(**m._asdict()) for m in extract_skills(data.job_description)]
+        found = {s.skill for s in skills}
+        missing = [s.skill for s in job_skills if s.skill not in found]
+    return ExtractSkillsOutput(skills=skills, categories=categories, job_skills=job_skills, missing_skills=missing)
+
 @router.post("/resignation-letter", response_model=ResignationLetterOutput)
-async def create_resignation_letter(data: ResignationLetterInput):
+async def create_resignation_letter(request: Request, data: ResignationLetterInput):
     """
     Generate a professional resignation letter.
     """
     try:
-        result = generate_resignation_letter(data)
+        result = await run_until_disconnected(request, "resignation-letter", generate_resignation_letter(data))
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/resignation-letter/stream")
+async def create_resignation_letter_stream(data: ResignationLetterInput, format: str = Query("sse", pattern="^(sse|ndjson)$")):
+    """
+    Streaming variant of /resignation-letter (SSE by default, `?format=ndjson` for chunked NDJSON).
+    Emits `token` events with the letter body as it is written, then a `done` event with
+    the full ResignationLetterOutput including personalized_sections.
+    """
+    return streaming_response(stream_resignation_letter(data), format, endpoint="resignation-letter")
+
 @router.post("/rewrite-bullet", response_model=RewriteBulletOutput)
-async def rewrite_bullet(data: RewriteBulletInput):
+async def rewrite_bullet(request: Request, data: RewriteBulletInput):
     """
     Rewrite a single bullet point to be more impactful and ATS-friendly.
     """
     try:
-        result = rewrite_bullet_point(data)
+        result = await run_until_disconnected(request, "rewrite-bullet", rewrite_bullet_point(data))
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def validate_bullet_batch(data: RewriteBulletsInput) -> None:
+    if not data.bullets:
+        raise HTTPException(status_code=400, detail="bullets must not be empty.")
+    if len(data.bullets) > MAX_REWRITE_BULLETS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_REWRITE_BULLETS} bullets per request.")
+
+@router.post("/rewrite-bullets", response_model=RewriteBulletsOutput)
+async def rewrite_bullets(request: Request, data: RewriteBulletsInput):
+    """
+    Rewrite many bullet points at once. Bullets are grouped by context (role/company) and
+    each group is rewritten in one LLM call, all groups concurrently. A bullet that could
+    not be rewritten comes back unchanged with `error` set.
+    """
+    validate_bullet_batch(data)
+    try:
+        result = await run_until_disconnected(request, "rewrite-bullets", rewrite_bullet_points(data))
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/rewrite-bullets/stream")
+async def rewrite_bullets_stream(data: RewriteBulletsInput, format: str = Query("sse", pattern="^(sse|ndjson)$")):
+    """
+    Streaming variant of /rewrite-bullets (SSE by default, `?format=ndjson` for chunked NDJSON).
+    Emits a `bullet` event with each RewrittenBullet as soon as it is parsed (in completion
+    order, `index` gives its input position), then a `done` event with all of them in order.
+    """
+    validate_bullet_batch(data)
+    return streaming_response(stream_rewrite_bullets(data), format, endpoint="rewrite-bullets")
+
 @router.post("/career-path", response_model=CareerPathOutput)
-async def get_career_path(data: CareerPathInput):
+async def get_career_path(request: Request, data: CareerPathInput):
     """
     Predicts career progression path based on resume and current role.
     Provides next steps, skill gaps, and recommended learning paths.
     """
     try:
-        result = predict_career_path(data)
+        result = await run_until_disconnected(request, "career-path", predict_career_path(data))
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/heatmap", response_model=ResumeHeatMapOutput)
-async def get_resume_heatmap(data: ResumeHeatMapInput):
+async def get_resume_heatmap(request: Request, data: ResumeHeatMapInput):
     """
     Generates a visual heat map of resume strength by section.
     Shows which sections are strong, moderate, or weak.
     """
     try:
-        result = generate_resume_heatmap(data)
+        result = await run_until_disconnected(request, "heatmap", generate_resume_heatmap(data))
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/benchmark", response_model=IndustryBenchmarkOutput)
-async def benchmark_resume(data: IndustryBenchmarkInput):
+async def benchmark_resume(request: Request, data: IndustryBenchmarkInput):
     """
     Compares resume against industry standards and benchmarks.
     Shows how the resume performs relative to industry averages.
     """
     try:
-        result = benchmark_against_industry(data)
+        result = await run_until_disconnected(request, "benchmark", benchmark_against_industry(data))
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/translate", response_model=MultiLanguageOutput)
-async def translate_resume_to_language(data: MultiLanguageInput):
+async def translate_resume_to_language(request: Request, data: MultiLanguageInput):
     """
     Translates resume to target language with cultural adaptations.
     """
     try:
-        result = translate_resume(data)
+        result = await run_until_disconnected(request, "translate", translate_resume(data))
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/analytics", response_model=ResumeAnalyticsOutput)
-async def get_resume_analytics(data: ResumeAnalyticsInput):
+async def get_resume_analytics(request: Request, data: ResumeAnalyticsInput):
     """
     Provides comprehensive analytics and metrics for the resume.
     Includes keyword density, readability, completeness, and performance predictions.
     """
     try:
-        result = analyze_resume_analytics(data)
+        result = await run_until_disconnected(request, "analytics", analyze_resume_analytics(data))
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/chat", response_model=ChatOutput)
-async def chat_with_agent(data: ChatInput):
+async def chat_with_agent(request: Request, data: ChatInput):
     """
     Conversational AI agent for resume and job search assistance.
     Provides intelligent responses based on user queries and resume context.
     """
     try:
-        result = chat_with_ai_agent(data)
+        result = await run_until_disconnected(request, "chat", chat_with_ai_agent(data))
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/chat/stream")
+async def chat_with_agent_stream(data: ChatInput):
+    """
+    Streaming variant of /chat over Server-Sent Events.
+    Emits `token` events with {"delta": "..."} as the reply is generated, then a single
+    `done` event with the full ChatOutput (message and suggestions), or an `error` event.
+    """
+    return streaming_response(stream_chat_with_ai_agent(data), endpoint="chat")
+
 @router.post("/analyze-job-and-tailor", response_model=JobDescriptionAnalyzerOutput)
-async def analyze_job_and_tailor_resume(data: JobDescriptionAnalyzerInput):
+async def analyze_job_and_tailor_resume(request: Request, data: JobDescriptionAnalyzerInput):
     """
     AI Job Description Analyzer & Auto-Tailor:
     Analyzes a job description and automatically tailors the resume to match it.
     Returns analysis metrics and a tailored version of the resume.
     """
     try:
-        result = analyze_and_tailor_resume(data)
+        result = await run_until_disconnected(request, "analyze-job-and-tailor", analyze_and_tailor_resume(data))
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -256,41 +427,47 @@ async def analyze_job_and_tailor_resume(data: JobDescriptionAnalyzerInput):
 # ============================================
 
 @router.post("/quantify-achievement", response_model=AchievementQuantifierOutput)
-async def quantify_achievement_endpoint(data: AchievementQuantifierInput):
+async def quantify_achievement_endpoint(request: Request, data: AchievementQuantifierInput):
     """
     AI Achievement Quantifier:
     Suggests ways to add metrics and quantification to vague achievements.
     Helps make achievements more impactful and measurable.
     """
     try:
-        result = quantify_achievement(data)
+        result = await run_until_disconnected(request, "quantify-achievement", quantify_achievement(data))
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/summary-variations", response_model=SummaryVariationsOutput)
-async def get_summary_variations(data: SummaryVariationsInput):
+async def get_summary_variations(request: Request, data: SummaryVariationsInput):
     """
     Resume Summary Variations Generator:
     Generates multiple resume summary variations (10+ options) with different styles.
     Users can choose the best fit for their needs.
     """
     try:
-        result = generate_summary_variations(data)
+        result = await run_until_disconnected(request, "summary-variations", generate_summary_variations(data))
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/expand-keywords", response_model=KeywordSynonymExpanderOutput)
-async def expand_keywords(data: KeywordSynonymExpanderInput):
+async def expand_keywords(request: Request, data: KeywordSynonymExpanderInput):
     """
     Keyword Synonym Expander:
     Suggests alternative keywords and synonyms to improve ATS matching
     without keyword stuffing. Helps diversify keyword usage naturally.
     """
     try:
-        result = expand_keyword_synonyms(data)
+        result = await run_until_disconnected(request, "expand-keywords", expand_keyword_synonyms(data))
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -299,53 +476,61 @@ async def expand_keywords(data: KeywordSynonymExpanderInput):
 # ============================================
 
 @router.post("/multi-resume-portfolio", response_model=MultiResumePortfolioOutput)
-async def create_multi_resume_portfolio(data: MultiResumePortfolioInput):
+async def create_multi_resume_portfolio(request: Request, data: MultiResumePortfolioInput):
     """
     Multi-Resume Portfolio Generator:
     Automatically creates multiple resume versions (technical, executive, creative, etc.)
     from one master resume. Maintains consistency while adapting to different needs.
     """
     try:
-        result = generate_multi_resume_portfolio(data)
+        result = await run_until_disconnected(request, "multi-resume-portfolio", generate_multi_resume_portfolio(data))
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/analyze-skill-gaps", response_model=SkillGapAnalyzerOutput)
-async def analyze_skill_gaps(data: SkillGapAnalyzerInput):
+async def analyze_skill_gaps(request: Request, data: SkillGapAnalyzerInput):
     """
     AI Skill Gap Analyzer with Learning Paths:
     Identifies skill gaps for target roles and generates personalized learning paths
     with courses, certifications, and resources. Provides actionable career development guidance.
     """
     try:
-        result = analyze_skill_gaps_with_learning_paths(data)
+        result = await run_until_disconnected(request, "analyze-skill-gaps", analyze_skill_gaps_with_learning_paths(data))
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/analyze-career-trends", response_model=CareerTrendAnalyzerOutput)
-async def analyze_career_trends_endpoint(data: CareerTrendAnalyzerInput):
+async def analyze_career_trends_endpoint(request: Request, data: CareerTrendAnalyzerInput):
     """
     AI Career Trend Analyzer:
     Analyzes industry trends and predicts which skills/roles will be in demand.
     Provides proactive career guidance based on market trends and suggests resume updates.
     """
     try:
-        result = analyze_career_trends(data)
+        result = await run_until_disconnected(request, "analyze-career-trends", analyze_career_trends(data))
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/salary-negotiation", response_model=SalaryNegotiationOutput)
-async def simulate_salary_negotiation_endpoint(data: SalaryNegotiationInput):
+async def simulate_salary_negotiation_endpoint(request: Request, data: SalaryNegotiationInput):
     """
     Real-Time Salary Negotiation Simulator:
     Simulates salary negotiation conversations to help users prepare.
     Generates realistic negotiation scenarios and provides practice conversations.
     """
     try:
-        result = simulate_salary_negotiation(data)
+        result = await run_until_disconnected(request, "salary-negotiation", simulate_salary_negotiation(data))
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
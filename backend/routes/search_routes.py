@@ -0,0 +1,64 @@
+# backend/routes/search_routes.py
+import os
+import hmac
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from schemas.search import SearchInput, SearchOutput, SearchResult, ResumeIndexInput, ResumeWebhookPayload
+from services.search_index import resume_search_index
+
+router = APIRouter()
+
+# Search spans every user's resumes, so all of these endpoints need the shared key
+SEARCH_API_KEY = os.getenv("SEARCH_API_KEY", "")
+MAX_SEARCH_RESULTS = 200
+
+def require_search_key(x_search_key: Optional[str] = Header(None)) -> None:
+    if not SEARCH_API_KEY or not resume_search_index.enabled:
+        raise HTTPException(status_code=503, detail="Resume search is not configured.")
+    if not x_search_key or not hmac.compare_digest(x_search_key, SEARCH_API_KEY):
+        raise HTTPException(status_code=401, detail="Invalid or missing X-Search-Key header.")
+
+@router.post("", response_model=SearchOutput, dependencies=[Depends(require_search_key)])
+async def search_resumes(data: SearchInput):
+    """
+    Rank indexed resumes for a job description by BM25 over their skills, titles and bullets.
+    """
+    if not 1 <= data.limit <= MAX_SEARCH_RESULTS:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_SEARCH_RESULTS}.")
+    hits = resume_search_index.search(data.job_description, data.limit)
+    return SearchOutput(
+        results=[SearchResult(**hit._asdict()) for hit in hits],
+        total_indexed=resume_search_index.stats()["resumes"],
+    )
+
+@router.put("/resumes/{resume_id}", dependencies=[Depends(require_search_key)])
+async def index_resume(resume_id: str, data: ResumeIndexInput):
+    """
+    Add a saved resume to the index, or replace its previous version.
+    """
+    await resume_search_index.upsert_async(resume_id, data.title, data.content, data.user_id)
+    return {"resume_id": resume_id, "indexed": True}
+
+@router.delete("/resumes/{resume_id}", dependencies=[Depends(require_search_key)])
+async def remove_resume(resume_id: str):
+    """
+    Drop a resume from the index.
+    """
+    return {"resume_id": resume_id, "removed": await resume_search_index.delete_async(resume_id)}
+
+@router.post("/webhook", dependencies=[Depends(require_search_key)])
+async def resume_saved_webhook(payload: ResumeWebhookPayload):
+    """
+    Supabase database webhook for the resumes table, so every save updates the index.
+    """
+    if payload.table != "resumes":
+        raise HTTPException(status_code=400, detail=f"Unexpected table: {payload.table}")
+    if payload.type == "DELETE":
+        record = payload.old_record or {}
+        removed = await resume_search_index.delete_async(str(record.get("id", "")))
+        return {"resume_id": record.get("id"), "removed": removed}
+    record = payload.record or {}
+    if not record.get("id") or not isinstance(record.get("content"), dict):
+        raise HTTPException(status_code=400, detail="Webhook record needs an id and a JSON content object.")
+    await resume_search_index.upsert_async(str(record["id"]), record.get("title") or "", record["content"], record.get("user_id"))
+    return {"resume_id": record["id"], "indexed": True}
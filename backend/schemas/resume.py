@@ -54,6 +54,7 @@ class ReviewInput(BaseModel):
     resume_text: str
     target_role: str
     job_description: Optional[str] = None  # New: Job description for matching
+    force_refresh: bool = False  # Skip reusing an earlier analysis of a near-identical resume
 
 class ScoreCriteriaItem(BaseModel):
     name: str
@@ -94,6 +95,8 @@ class ReviewOutput(BaseModel):
     missing_keywords: Optional[List[str]] = None  # New: Missing keywords
     score_breakdown: Optional[ScoreBreakdown] = None  # New: Detailed scoring breakdown
     detailed_scores: Optional[List[ScoreCategory]] = None  # New: Detailed scoring breakdown
+    reused_from_similar: bool = False  # Served from an earlier analysis of a near-identical resume
+    reuse_similarity: Optional[float] = None  # Estimated similarity to that resume, when reused
 
 class CoverLetterInput(BaseModel):
     resume_text: str
@@ -150,6 +153,28 @@ class JobMatchOutput(BaseModel):
     recommendations: List[str]
     skill_gaps: List[str]
 
+class JobMatchRecommendations(BaseModel):
+    recommendations: List[str]
+
+class BatchJobMatchInput(BaseModel):
+    resume_text: str
+    job_descriptions: List[str]
+    top_k: int = 3  # How many of the best matches get LLM recommendations (0 for none)
+
+class RankedJobMatch(BaseModel):
+    index: int  # Position in job_descriptions
+    rank: int  # 1 = best match
+    match_score: int  # 0-100
+    similarity: float  # Cosine similarity of BM25 vectors, 0-1
+    keyword_coverage: float  # Weighted share of the job's keywords found in the resume, 0-1
+    matched_keywords: List[str]
+    missing_keywords: List[str]
+    skill_gaps: List[str]
+    recommendations: Optional[List[str]] = None  # Only for the top_k matches
+
+class BatchJobMatchOutput(BaseModel):
+    matches: List[RankedJobMatch]  # Best match first
+
 class ImproveResumeInput(BaseModel):
     resume_text: str
     target_role: str
@@ -188,6 +213,32 @@ class RewriteBulletOutput(BaseModel):
     improvements_made: List[str]
     keywords_added: List[str]
 
+class BulletToRewrite(BaseModel):
+    text: str
+    context: Optional[str] = None  # Role/company the bullet is from; bullets are batched per context
+
+class RewriteBulletsInput(BaseModel):
+    bullets: List[BulletToRewrite]
+    target_role: str
+    context: Optional[str] = None  # Used for bullets without their own context
+
+class RewrittenBullet(BaseModel):
+    index: int  # Position in the input list
+    original_bullet: str
+    improved_bullet: str  # The original bullet when error is set
+    improvements_made: List[str]
+    keywords_added: List[str]
+    error: Optional[str] = None  # Why this bullet couldn't be rewritten
+
+class RewriteBulletsOutput(BaseModel):
+    bullets: List[RewrittenBullet]  # In input order
+
+class BatchRewrittenBullet(BaseModel):
+    id: int  # Bullet number as given in the prompt
+    improved_bullet: str
+    improvements_made: List[str]
+    keywords_added: List[str]
+
 # New Advanced Features Schemas
 
 class CareerPathInput(BaseModel):
@@ -212,6 +263,7 @@ class CareerPathOutput(BaseModel):
 class ResumeHeatMapInput(BaseModel):
     resume_text: str
     target_role: str
+    force_refresh: bool = False  # Skip reusing an earlier analysis of a near-identical resume
 
 class SectionScore(BaseModel):
     section_name: str
@@ -225,11 +277,14 @@ class ResumeHeatMapOutput(BaseModel):
     overall_score: int
     section_scores: List[SectionScore]
     heat_map_data: dict  # For visualization
+    reused_from_similar: bool = False  # Served from an earlier analysis of a near-identical resume
+    reuse_similarity: Optional[float] = None  # Estimated similarity to that resume, when reused
 
 class IndustryBenchmarkInput(BaseModel):
     resume_text: str
     target_role: str
     industry: str
+    force_refresh: bool = False  # Skip reusing an earlier analysis of a near-identical resume
 
 class BenchmarkComparison(BaseModel):
     metric: str
@@ -243,6 +298,8 @@ class IndustryBenchmarkOutput(BaseModel):
     comparisons: List[BenchmarkComparison]
     recommendations: List[str]
     industry_insights: List[str]
+    reused_from_similar: bool = False  # Served from an earlier analysis of a near-identical resume
+    reuse_similarity: Optional[float] = None  # Estimated similarity to that resume, when reused
 
 class MultiLanguageInput(BaseModel):
     resume_text: str
@@ -269,6 +326,10 @@ class ResumeAnalyticsOutput(BaseModel):
     improvement_potential: int
     estimated_interview_rate: Optional[float] = None
 
+
+class ResumeAnalyticsPredictions(BaseModel):
+    improvement_potential: int
+    estimated_interview_rate: Optional[float] = None
 class ChatMessage(BaseModel):
     role: str  # "user" or "assistant"
     content: str
@@ -349,6 +410,9 @@ class KeywordSynonym(BaseModel):
     context: str  # When to use each synonym
     ats_impact: str = "medium"  # "high", "medium", "low" - expected ATS impact (default: medium)
 
+class KeywordSynonymBatch(BaseModel):
+    keyword_synonyms: List[KeywordSynonym]  # LLM answer for the terms the synonym graph lacks
+
 class KeywordSynonymExpanderOutput(BaseModel):
     keyword_synonyms: List[KeywordSynonym]
     suggested_replacements: dict  # Original -> suggested alternatives with context
@@ -379,6 +443,7 @@ class MultiResumePortfolioOutput(BaseModel):
     versions: List[ResumeVersion]
     usage_guide: dict  # Guide on when to use each version
     differences_summary: dict  # Summary of differences between versions
+    duplicate_versions_dropped: int = 0  # Generated versions left out as near-copies of another
 
 class SkillGapAnalyzerInput(BaseModel):
     resume_text: str
@@ -505,3 +570,21 @@ class SalaryNegotiationOutput(BaseModel):
     common_mistakes_to_avoid: List[str]
     power_phrases: List[str]  # Phrases that strengthen negotiation position
     scenarios_practiced: List[str]
+
+# Skill Extraction (taxonomy lookup, no LLM)
+
+class ExtractSkillsInput(BaseModel):
+    text: str
+    job_description: Optional[str] = None  # When given, its skills are compared with the text's
+
+class ExtractedSkill(BaseModel):
+    skill: str  # Canonical name, e.g. "Kubernetes" for "k8s"
+    category: str
+    count: int
+    matched_terms: List[str]  # Aliases as they matched (lowercased)
+
+class ExtractSkillsOutput(BaseModel):
+    skills: List[ExtractedSkill]
+    categories: dict  # Category -> canonical skills found
+    job_skills: Optional[List[ExtractedSkill]] = None
+    missing_skills: Optional[List[str]] = None  # In the job description but not the text
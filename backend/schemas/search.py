@@ -0,0 +1,30 @@
+# backend/schemas/search.py
+from typing import List, Optional
+from pydantic import BaseModel
+
+class SearchInput(BaseModel):
+    job_description: str
+    limit: int = 20
+
+class SearchResult(BaseModel):
+    resume_id: str
+    user_id: Optional[str] = None
+    title: str
+    score: float  # BM25
+    matched_terms: List[str]
+
+class SearchOutput(BaseModel):
+    results: List[SearchResult]  # Best match first
+    total_indexed: int
+
+class ResumeIndexInput(BaseModel):
+    title: str
+    content: dict  # The resume's `content` JSON, as stored in the resumes table
+    user_id: Optional[str] = None
+
+class ResumeWebhookPayload(BaseModel):
+    # Shape of a Supabase database webhook
+    type: str  # "INSERT", "UPDATE" or "DELETE"
+    table: str
+    record: Optional[dict] = None
+    old_record: Optional[dict] = None
@@ -0,0 +1,42 @@
+# backend/scripts/build_skill_index.py
+"""
+Compile data/skill_taxonomy.json into the binary Aho-Corasick artifact the API loads at
+startup (data/skill_taxonomy.bin). Run it after editing the taxonomy; the API still works
+with a stale artifact, but compiles the JSON in memory on every start until it's rebuilt.
+
+Usage (from the backend directory):
+    python scripts/build_skill_index.py [--taxonomy data/skill_taxonomy.json] [--output data/skill_taxonomy.bin]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.skill_taxonomy import ARTIFACT_PATH, TAXONOMY_PATH, SkillTaxonomy, compile_taxonomy, file_sha256
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--taxonomy", default=TAXONOMY_PATH, help="taxonomy JSON to compile")
+    parser.add_argument("--output", default=ARTIFACT_PATH, help="where to write the binary artifact")
+    args = parser.parse_args()
+
+    with open(args.taxonomy, encoding="utf-8") as f:
+        source = json.load(f)
+    started = time.perf_counter()
+    taxonomy = compile_taxonomy(source, file_sha256(args.taxonomy))
+    compile_ms = (time.perf_counter() - started) * 1000
+    data = taxonomy.to_bytes()
+    with open(args.output, "wb") as f:
+        f.write(data)
+
+    started = time.perf_counter()
+    SkillTaxonomy.from_bytes(data)
+    load_ms = (time.perf_counter() - started) * 1000
+    print(f"{len(taxonomy.skills)} skills, {len(taxonomy.patterns)} patterns, {taxonomy.node_count} automaton nodes")
+    print(f"Wrote {args.output} ({len(data) / 1024:.1f} KiB); compile {compile_ms:.1f} ms, load {load_ms:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,204 @@
 # backend/services/ai_helpers.py
+import asyncio
+import random
 import time
+from contextlib import AsyncExitStack, nullcontext
+from email.utils import parsedate_to_datetime
 from fastapi import HTTPException
-from openai import OpenAI
+import httpx
+from openai import APIConnectionError, APIError, APIStatusError, AsyncOpenAI
 from typing import List, Optional
+from services.http_transport import capped_timeout
+from services.model_health import ModelHealthRegistry
+from services.upstream_scheduler import UpstreamScheduler, estimate_request_tokens
 
-def create_chat_completion_with_retry(
-    client: OpenAI,
+def get_retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    Extract the server-provided wait time from a rate limit error, if any.
+    
+    Checks `retry-after-ms`, `retry-after` (seconds or HTTP date) and
+    `x-ratelimit-reset` (epoch seconds or milliseconds, as sent by OpenRouter).
+    
+    Returns:
+        Seconds to wait, or None if the provider did not say
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(0.0, float(retry_after_ms) / 1000)
+        except ValueError:
+            pass
+    
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    
+    reset = headers.get("x-ratelimit-reset")
+    if reset:
+        try:
+            reset_at = float(reset)
+            # OpenRouter sends epoch milliseconds; plain epoch seconds are ~1e9
+            if reset_at > 1e11:
+                reset_at /= 1000
+            return max(0.0, reset_at - time.time())
+        except ValueError:
+            pass
+    
+    return None
+
+def compute_backoff_delay(
+    attempt: int,
+    retry_delay: float,
+    max_retry_delay: float,
+    retry_after: Optional[float] = None
+) -> float:
+    """
+    Compute how long to wait before the next retry.
+    
+    Without a server hint this is exponential backoff with full jitter
+    (uniform between 0 and retry_delay * 2**attempt), so concurrent requests that hit
+    the same rate limit don't all retry at the same instant. When the provider tells us
+    when the limit resets, we wait at least that long plus a small jitter.
+    
+    Args:
+        attempt: Zero-based retry attempt number
+        retry_delay: Base delay in seconds
+        max_retry_delay: Upper bound for any single wait
+        retry_after: Server-provided wait time in seconds, if known
+    
+    Returns:
+        Delay in seconds
+    """
+    if retry_after is not None:
+        return min(max_retry_delay, retry_after + random.uniform(0, retry_delay))
+    return random.uniform(0, min(max_retry_delay, retry_delay * (2 ** attempt)))
+
+RATE_LIMITED = "rate_limited"
+MODEL_FAILURE = "model_failure"
+REQUEST_ERROR = "request_error"
+
+def classify_upstream_error(error: Exception) -> str:
+    """
+    Whether an upstream error says something about the model's health, by status code:
+    429 is a rate limit; 5xx, 408, timeouts and connection errors are model failures; other
+    4xx (context too long, bad payload, auth) are caused by the request itself and are not
+    held against the model.
+    """
+    status = getattr(error, "status_code", None)
+    if status is None and isinstance(error, APIStatusError):
+        status = error.response.status_code
+    if status == 429:
+        return RATE_LIMITED
+    if status is not None:
+        return MODEL_FAILURE if status >= 500 or status == 408 else REQUEST_ERROR
+    if isinstance(error, (APIConnectionError, httpx.TransportError, asyncio.TimeoutError, ConnectionError)):
+        return MODEL_FAILURE
+    # An error the provider reported without a status (e.g. mid-stream) is still the model's
+    return MODEL_FAILURE if isinstance(error, APIError) else REQUEST_ERROR
+
+def llm_unavailable(error: Exception) -> bool:
+    """
+    Whether `error` means no model could answer (rate limits, upstream failures, the
+    deadline running out) rather than a problem with the request itself. Also reads the
+    HTTPExceptions raised below, so endpoints with a local answer can serve it instead.
+    """
+    return classify_upstream_error(error) != REQUEST_ERROR
+
+def deadline_exceeded(model_list: List[str]) -> HTTPException:
+    return HTTPException(
+        status_code=504,
+        detail=f"AI service could not answer within the request's time budget. "
+               f"Tried models: {', '.join(model_list)}. "
+               f"Please try again, or raise the budget with the X-Request-Timeout header."
+    )
+
+class HeldStream:
+    """
+    A streamed completion that keeps its upstream scheduler slot until it is closed.
+    Use it as `async with stream:` and iterate inside the block.
+    """
+
+    def __init__(self, stream, resources: AsyncExitStack):
+        self._stream = stream
+        self._resources = resources
+
+    def __aiter__(self):
+        return self._stream.__aiter__()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.close()
+        finally:
+            await self._resources.aclose()
+
+async def create_chat_completion_with_retry(
+    client: AsyncOpenAI,
     model: str,
     messages: list,
     max_retries: int = 3,
-    retry_delay: int = 2,
+    retry_delay: float = 2,
     fallback_models: Optional[List[str]] = None,
+    max_retry_delay: float = 30,
+    health_registry: Optional[ModelHealthRegistry] = None,
+    scheduler: Optional[UpstreamScheduler] = None,
+    priority: str = "standard",
+    client_id: Optional[str] = None,
+    deadline: Optional[float] = None,
+    min_attempt_seconds: float = 1,
     **kwargs
 ):
     """
     Create a chat completion with automatic retry on rate limit errors and automatic model switching.
+    All upstream calls and backoff waits are awaited, so a slow or rate-limited model never blocks
+    the event loop serving other requests.
     
     Args:
-        client: OpenAI client instance
+        client: AsyncOpenAI client instance
         model: Primary model name to use
         messages: List of message dicts
         max_retries: Maximum number of retry attempts per model
-        retry_delay: Base delay in seconds (uses exponential backoff)
+        retry_delay: Base delay in seconds (exponential backoff with full jitter)
         fallback_models: Optional list of fallback models to try when rate limits are hit
+        max_retry_delay: Upper bound in seconds for a single backoff wait
+        health_registry: Optional model health registry. When given, models are tried in order
+            of current health, models with an open circuit are skipped, and every outcome is
+            recorded so the next request doesn't re-probe a rate-limited model
+        scheduler: Optional upstream scheduler. When given, each attempt waits for a concurrency
+            slot and rate budget on its model instead of bursting past provider limits
+        priority: Scheduler priority class ("interactive", "standard" or "batch")
+        client_id: Identity of the caller, used for fair queuing within a priority class
+        deadline: Optional absolute time.monotonic() by which the request must be answered.
+            Each phase of an attempt's upstream timeout (the client's, or a `timeout` passed in
+            kwargs) is capped at the remaining budget, queue waits and
+            backoff sleeps stop at the deadline, and retries or fallbacks that would start with
+            less than min_attempt_seconds left are skipped
+        min_attempt_seconds: Smallest remaining budget worth starting a retry or fallback with
         **kwargs: Additional arguments to pass to chat.completions.create
     
     Returns:
-        Response from OpenAI API
+        Response from OpenAI API, or a HeldStream when stream=True is passed. Retries and
+        model switching only cover opening the stream; errors after that reach the caller
     
     Raises:
-        HTTPException: If rate limit persists after trying all models
+        HTTPException: 429 if rate limit persists after trying all models, 504 if the deadline
+            runs out first
     """
     # Build the complete model list: primary model first, then fallbacks
     model_list = [model]
@@ -39,31 +208,98 @@ def create_chat_completion_with_retry(
             if fallback != model and fallback not in model_list:
                 model_list.append(fallback)
     
+    if health_registry is not None:
+        model_list = health_registry.available_models(model_list)
+    
+    base_timeout = kwargs.get("timeout", getattr(client, "timeout", None))
+    
     # Try each model in sequence
     for model_idx, current_model in enumerate(model_list):
         model_display = f"{current_model} ({model_idx + 1}/{len(model_list)})"
         
         for attempt in range(max_retries):
+            estimated_tokens = estimate_request_tokens(messages, kwargs.get("max_tokens"))
+            call_kwargs = kwargs
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                # The first attempt always gets whatever budget is left; a retry or fallback
+                # that can't realistically finish is skipped instead of burning tokens
+                needed = min_attempt_seconds if (model_idx or attempt) else 0
+                if remaining <= needed:
+                    print(f"⏱ Deadline reached before trying {model_display}, giving up")
+                    raise deadline_exceeded(model_list)
+                call_kwargs = {**kwargs, "timeout": capped_timeout(base_timeout, remaining)}
+            probe = 0
+            if health_registry is not None:
+                # Claim the probe of a half-open model now, before queueing, so requests that
+                # arrive while it is being probed go elsewhere instead of probing it too
+                probe = health_registry.begin_request(current_model)
+                if probe is None:
+                    if model_idx < len(model_list) - 1:
+                        print(f"⚠ {current_model} is being probed after failures. Switching to next model: {model_list[model_idx + 1]}")
+                        break
+                    raise HTTPException(
+                        status_code=503,
+                        detail=f"AI service is recovering from upstream errors on all available models. "
+                               f"Tried models: {', '.join(model_list)}. Please try again in a few moments."
+                    )
             try:
-                response = client.chat.completions.create(
-                    model=current_model,
-                    messages=messages,
-                    **kwargs
+                slot = (
+                    scheduler.slot(current_model, estimated_tokens, priority=priority, client_id=client_id)
+                    if scheduler is not None else nullcontext()
                 )
+                async with AsyncExitStack() as stack:
+                    try:
+                        limiter = await asyncio.wait_for(stack.enter_async_context(slot), remaining)
+                    except asyncio.TimeoutError:
+                        print(f"⏱ Deadline reached while queued for {model_display}")
+                        raise deadline_exceeded(model_list)
+                    started = time.monotonic()
+                    if remaining is not None:
+                        call_kwargs["timeout"] = capped_timeout(base_timeout, deadline - started)
+                    response = await client.chat.completions.create(
+                        model=current_model,
+                        messages=messages,
+                        **call_kwargs
+                    )
+                    if kwargs.get("stream"):
+                        # Keep the scheduler slot until the caller has drained the stream
+                        response = HeldStream(response, stack.pop_all())
+                if limiter is not None:
+                    usage = getattr(response, "usage", None)
+                    limiter.record_usage(estimated_tokens, getattr(usage, "total_tokens", None))
+                if health_registry is not None:
+                    health_registry.record_success(current_model, time.monotonic() - started)
                 # Log successful model usage if we switched models
                 if model_idx > 0:
                     print(f"✓ Successfully used fallback model: {current_model}")
                 return response
+            except asyncio.CancelledError:
+                if health_registry is not None:
+                    health_registry.cancel_request(current_model, probe)
+                raise
+            except HTTPException:
+                if health_registry is not None:
+                    health_registry.cancel_request(current_model, probe)
+                raise
             except Exception as e:
-                error_str = str(e)
-                # Check if it's a rate limit error (429)
-                is_rate_limit = (
-                    "429" in error_str or 
-                    "rate" in error_str.lower() or 
-                    "rate limit" in error_str.lower() or
-                    "quota" in error_str.lower() or
-                    "limit exceeded" in error_str.lower()
-                )
+                if deadline is not None and time.monotonic() >= deadline:
+                    # Our own budget ran out mid-call; that says nothing about the model's health
+                    if health_registry is not None:
+                        health_registry.cancel_request(current_model, probe)
+                    print(f"⏱ Deadline reached while waiting on {model_display}")
+                    raise deadline_exceeded(model_list) from e
+                error_kind = classify_upstream_error(e)
+                is_rate_limit = error_kind == RATE_LIMITED
+                retry_after = get_retry_after_seconds(e)
+                if health_registry is not None:
+                    if error_kind == REQUEST_ERROR:
+                        health_registry.cancel_request(current_model, probe)
+                    else:
+                        health_registry.record_failure(
+                            current_model, rate_limited=is_rate_limit, retry_after=retry_after, error=str(e), probe=probe
+                        )
                 
                 if is_rate_limit:
                     # If we have more models to try, switch to next model
@@ -72,9 +308,13 @@ def create_chat_completion_with_retry(
                         break  # Break out of retry loop to try next model
                     elif attempt < max_retries - 1:
                         # Last model, but still have retries left
-                        wait_time = retry_delay * (2 ** attempt)  # Exponential backoff
-                        print(f"⚠ Rate limit hit on {current_model}. Retrying in {wait_time} seconds... (attempt {attempt + 1}/{max_retries})")
-                        time.sleep(wait_time)
+                        # Honor Retry-After / x-ratelimit-reset, otherwise jittered exponential backoff
+                        wait_time = compute_backoff_delay(attempt, retry_delay, max_retry_delay, retry_after)
+                        if deadline is not None and time.monotonic() + wait_time + min_attempt_seconds > deadline:
+                            print(f"⏱ Rate limit hit on {current_model} and no time left to retry before the deadline")
+                            raise deadline_exceeded(model_list)
+                        print(f"⚠ Rate limit hit on {current_model}. Retrying in {wait_time:.1f} seconds... (attempt {attempt + 1}/{max_retries})")
+                        await asyncio.sleep(wait_time)
                         continue
                     else:
                         # All models exhausted and all retries used
@@ -95,3 +335,68 @@ def create_chat_completion_with_retry(
         detail="Unexpected error: All models exhausted without success."
     )
 
+
+async def create_chat_completion_hedged(
+    client: AsyncOpenAI,
+    model: str,
+    messages: list,
+    hedge_delay: float,
+    fallback_models: Optional[List[str]] = None,
+    **kwargs
+):
+    """
+    Hedged variant of create_chat_completion_with_retry for tail-latency control.
+    
+    Starts the request on the primary model. If it hasn't answered within hedge_delay
+    seconds, the same request is fired at the next fallback model. Whichever answers first
+    wins and the other is cancelled. If the first one to finish fails, we keep waiting
+    for the other.
+    
+    Args:
+        client: AsyncOpenAI client instance
+        model: Primary model name to use
+        messages: List of message dicts
+        hedge_delay: Seconds to wait on the primary before sending the hedge request
+        fallback_models: Optional list of fallback models, the first one is used for the hedge
+        **kwargs: Additional arguments passed through to create_chat_completion_with_retry
+    
+    Returns:
+        Response from OpenAI API
+    """
+    model_list = [model] + [m for m in (fallback_models or []) if m != model]
+    health_registry = kwargs.get("health_registry")
+    if health_registry is not None:
+        model_list = health_registry.available_models(model_list)
+    if len(model_list) < 2:
+        return await create_chat_completion_with_retry(
+            client=client, model=model_list[0], messages=messages, fallback_models=model_list[1:], **kwargs
+        )
+    
+    primary = asyncio.ensure_future(create_chat_completion_with_retry(
+        client=client, model=model_list[0], messages=messages, fallback_models=model_list[1:], **kwargs
+    ))
+    hedge = None
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+        if done:
+            return primary.result()
+        
+        print(f"⏱ {model_list[0]} has not answered after {hedge_delay:.1f}s. Hedging with {model_list[1]}")
+        hedge = asyncio.ensure_future(create_chat_completion_with_retry(
+            client=client, model=model_list[1], messages=messages, fallback_models=model_list[2:], **kwargs
+        ))
+        pending = {primary, hedge}
+        errors = []
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        print(f"✓ Hedge request on {model_list[1]} answered first")
+                    return task.result()
+                errors.append(task.exception())
+        raise errors[0]
+    finally:
+        for task in (primary, hedge):
+            if task is not None and not task.done():
+                task.cancel()
@@ -1,28 +1,55 @@
 # backend/services/ai_service.py
 import os
 import json
+import time
+import asyncio
 from dotenv import load_dotenv
-from openai import OpenAI
-from services.ai_helpers import create_chat_completion_with_retry
+from fastapi import HTTPException
+from openai import AsyncOpenAI
+from services.ai_helpers import create_chat_completion_with_retry, create_chat_completion_hedged, llm_unavailable
+from services.llm_cache import response_cache, make_cache_key, LLM_CACHE_ENABLED
+from services.single_flight import llm_single_flight
+from services.latency_tracker import llm_latency_tracker
+from services.model_health import model_health_registry
+from services.upstream_scheduler import upstream_scheduler
+from services.request_context import current_client_id, current_deadline
+from services.streaming import JSONStringFieldStreamer
+from services.keyword_matcher import KeywordMatch, match_keywords, local_recommendations
+from services.job_ranker import rank_jobs
+from services.resume_analytics import analyze_resume_text
+from services.skill_taxonomy import extract_skills
+from services.synonym_graph import synonym_graph, synonym_votes, learned_synonyms, synonym_graph_stats, expand_keywords_locally
+from services.near_duplicates import (
+    analysis_reuse_cache, dedupe, edit_touches_result, scope_key, NEAR_DUPLICATE_DEDUPE_THRESHOLD, NEAR_DUPLICATE_PORTFOLIO_THRESHOLD
+)
+from services.json_repair import IncrementalJSONParser, JSONRepairError, JSONSchemaMismatch, coerce_to_schema, parse_model_output, json_repair_stats
+from services.prompt_encoding import encode_for_prompt, COMPACT_FORMAT_NOTE
+from services.prompt_registry import prompt_registry
+from services.http_transport import openrouter_transport, OPENROUTER_BASE_URL
+from services.token_budget import (
+    PromptSection, count_tokens, count_message_tokens, endpoint_budget, fit_sections, trim_history,
+    token_usage_tracker
+)
 from schemas.resume import (
     ResumeInput, ResumeOutput, ReviewInput, ReviewOutput,
     CoverLetterInput, CoverLetterOutput,
     InterviewQuestionsInput, InterviewQuestionsOutput, InterviewQuestion, CodeExample,
-    JobMatchInput, JobMatchOutput,
+    JobMatchInput, JobMatchOutput, BatchJobMatchInput, BatchJobMatchOutput, RankedJobMatch, JobMatchRecommendations,
     ImproveResumeInput, ImproveResumeOutput,
     ResignationLetterInput, ResignationLetterOutput,
     RewriteBulletInput, RewriteBulletOutput,
+    RewriteBulletsInput, RewriteBulletsOutput, RewrittenBullet, BatchRewrittenBullet,
     ScoreBreakdown,
     CareerPathInput, CareerPathOutput, CareerPathStep,
     ResumeHeatMapInput, ResumeHeatMapOutput, SectionScore,
     IndustryBenchmarkInput, IndustryBenchmarkOutput, BenchmarkComparison,
     MultiLanguageInput, MultiLanguageOutput,
-    ResumeAnalyticsInput, ResumeAnalyticsOutput,
+    ResumeAnalyticsInput, ResumeAnalyticsOutput, ResumeAnalyticsPredictions,
     ChatInput, ChatOutput, ChatMessage,
     JobDescriptionAnalyzerInput, JobDescriptionAnalyzerOutput,
     AchievementQuantifierInput, AchievementQuantifierOutput, QuantifiedSuggestion,
     SummaryVariationsInput, SummaryVariationsOutput, SummaryVariation,
-    KeywordSynonymExpanderInput, KeywordSynonymExpanderOutput, KeywordSynonym,
+    KeywordSynonymExpanderInput, KeywordSynonymExpanderOutput, KeywordSynonym, KeywordSynonymBatch,
     MultiResumePortfolioInput, MultiResumePortfolioOutput, ResumeVersion,
     SkillGapAnalyzerInput, SkillGapAnalyzerOutput, RequiredSkill, LearningResource, LearningPath,
     CareerTrendAnalyzerInput, CareerTrendAnalyzerOutput, SkillTrend, RoleTrend, ResumeRecommendation,
@@ -40,10 +67,17 @@ if not api_key:
         "Please create a .env file in the backend directory with your OpenRouter API key."
     )
 
-# Initialize OpenAI client with OpenRouter configuration
-client = OpenAI(
-    base_url="https://openrouter.ai/api/v1",
+# Initialize async OpenAI client with OpenRouter configuration so that route
+# handlers can await upstream calls without blocking the event loop
+# The SDK's own retries are disabled: create_chat_completion_with_retry owns backoff
+# and model switching, and stacking both multiplies the wait on every 429
+# All calls share one pooled (HTTP/2 when available) transport with per-phase timeouts
+client = AsyncOpenAI(
+    base_url=OPENROUTER_BASE_URL,
     api_key=api_key,
+    max_retries=0,
+    timeout=openrouter_transport.timeout,
+    http_client=openrouter_transport.async_client,
 )
 
 # Using a valid OpenRouter model ID
@@ -76,32 +110,369 @@ if MODEL_NAME in FALLBACK_MODELS:
 # Build the complete model list: primary first, then fallbacks
 MODEL_LIST = [MODEL_NAME] + FALLBACK_MODELS
 
-def create_chat_completion_with_auto_fallback(
+# Hedged requests: endpoints that opt in send a duplicate request to the next model when the
+# primary hasn't answered within that endpoint's p95 latency. Until enough samples exist the
+# default delay is used; the minimum keeps a fast p95 from doubling every request.
+# Off unless LLM_HEDGING_ENABLED=true, since a hedge can cost a second paid upstream call.
+LLM_HEDGING_ENABLED = os.getenv("LLM_HEDGING_ENABLED", "false").lower() not in ("0", "false", "no")
+HEDGE_DEFAULT_DELAY = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY_SECONDS", "8"))
+HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY_SECONDS", "2"))
+
+def get_hedge_delay(endpoint: str) -> float:
+    """
+    Hedge threshold for an endpoint: its observed p95 latency, clamped to HEDGE_MIN_DELAY.
+    """
+    p95 = llm_latency_tracker.percentile(endpoint, 95) if endpoint else None
+    if p95 is None:
+        return HEDGE_DEFAULT_DELAY
+    return max(HEDGE_MIN_DELAY, p95)
+
+# Deadline budgets: every LLM-backed request must be answered within its endpoint's budget
+# (or the caller's X-Request-Timeout header), so retries and fallbacks stop once the browser
+# or serverless function would have given up anyway. LLM_ENDPOINT_DEADLINES overrides the
+# per-endpoint budgets as JSON, e.g. {"review": 45, "chat": 20}.
+LLM_DEFAULT_DEADLINE = float(os.getenv("LLM_DEFAULT_DEADLINE_SECONDS", "55"))
+LLM_MIN_ATTEMPT_SECONDS = float(os.getenv("LLM_MIN_ATTEMPT_SECONDS", "1"))
+ENDPOINT_DEADLINES = {
+    "chat": 30,
+    "rewrite-bullet": 20,
+    "rewrite-bullets": 45,
+    "quantify-achievement": 20,
+    "multi-resume-portfolio": 120,
+    "analyze-skill-gaps": 120,
+    "analyze-career-trends": 120,
+    "salary-negotiation": 120,
+    **json.loads(os.getenv("LLM_ENDPOINT_DEADLINES") or "{}"),
+}
+
+def get_request_deadline(endpoint: str) -> float:
+    """
+    Absolute time.monotonic() deadline for the current request: the caller's X-Request-Timeout
+    if it sent one, otherwise the endpoint's budget starting now.
+    """
+    deadline = current_deadline.get()
+    if deadline is not None:
+        return deadline
+    return time.monotonic() + float(ENDPOINT_DEADLINES.get(endpoint, LLM_DEFAULT_DEADLINE))
+
+def get_min_attempt_seconds(endpoint: str) -> float:
+    """
+    Budget a retry needs to be worth starting: the endpoint's median latency once known.
+    """
+    p50 = llm_latency_tracker.percentile(endpoint, 50) if endpoint else None
+    return max(LLM_MIN_ATTEMPT_SECONDS, p50 or 0)
+
+# Extra upstream calls allowed when a JSON response can't be repaired
+LLM_JSON_REPAIR_RETRIES = int(os.getenv("LLM_JSON_REPAIR_RETRIES", "1"))
+
+# Room left in the prompt budget for the user-prompt wording around the trimmable sections
+PROMPT_TEMPLATE_RESERVE = 300
+
+def fit_prompt(endpoint: str, fixed_text: str, *sections: PromptSection) -> list:
+    """
+    Trim the variable parts of an endpoint's prompt (resume text, job description, ...) so the
+    whole prompt fits the endpoint's token budget on every model it may be routed to.
+    fixed_text is the part that is never trimmed, usually the system prompt. Lowest-priority
+    sections are cut first; the texts come back in the order they were passed.
+    """
+    budget = endpoint_budget(endpoint, MODEL_LIST)
+    available = budget.prompt_tokens - count_tokens(fixed_text, MODEL_NAME) - PROMPT_TEMPLATE_RESERVE
+    texts = fit_sections(list(sections), max(0, available), MODEL_NAME)
+    trimmed = sum(count_tokens(s.text or "", MODEL_NAME) - count_tokens(t, MODEL_NAME) for s, t in zip(sections, texts))
+    if trimmed > 0:
+        token_usage_tracker.record_truncation(endpoint, trimmed)
+        print(f"✂ Trimmed ~{trimmed} prompt tokens on {endpoint} to fit its budget")
+    return texts
+
+def record_token_usage(endpoint: str, model: str, messages: list, response=None, completion_text: str = "", usage=None) -> None:
+    """
+    Record tokens in/out (and cached prompt tokens) for an upstream call, preferring the
+    provider's reported usage.
+    """
+    usage = usage or getattr(response, "usage", None)
+    tokens_in = getattr(usage, "prompt_tokens", None) or count_message_tokens(messages, model)
+    tokens_out = getattr(usage, "completion_tokens", None)
+    if tokens_out is None:
+        if not completion_text and response is not None and response.choices:
+            completion_text = response.choices[0].message.content or ""
+        tokens_out = count_tokens(completion_text, model)
+    token_usage_tracker.record(endpoint or "unknown", tokens_in, tokens_out)
+    prompt_registry.record_usage(endpoint or "unknown", usage)
+
+def request_cache_key(endpoint: str, model: str, messages: list, kwargs: dict) -> str:
+    """
+    Cache and single-flight key of a create_chat_completion_with_auto_fallback call.
+    """
+    max_tokens = kwargs.get("max_tokens") or endpoint_budget(endpoint, MODEL_LIST).completion_tokens
+    return make_cache_key(
+        model, messages, kwargs.get("temperature"), kwargs.get("response_format"), max_tokens=max_tokens, endpoint=endpoint
+    )
+
+async def create_chat_completion_with_auto_fallback(
     messages: list,
     model: str = MODEL_NAME,
     max_retries: int = 3,
-    retry_delay: int = 2,
+    retry_delay: float = 2,
+    cache: bool = False,
+    endpoint: str = "",
+    hedge: bool = False,
+    priority: str = "standard",
+    count_json_call: bool = False,
     **kwargs
 ):
     """
     Wrapper function that automatically includes fallback models for rate limit handling.
     This ensures all AI service calls have automatic model switching capability.
+    
+    Endpoints whose output is a deterministic analysis of the input pass cache=True to reuse
+    responses for identical (model, messages, temperature, response_format) requests.
+    High-temperature generators leave it off so users keep getting fresh variations.
+    
+    Identical requests that are already in flight (double clicks, re-renders) are coalesced
+    into a single upstream call regardless of the cache setting. Requests only count as
+    identical for the same endpoint and max_tokens. A coalesced follower waits on the
+    leader's call as it was made: with the leader's deadline, priority and client identity
+    for fair queuing, not its own.
+    
+    endpoint names the calling feature for per-endpoint latency stats. Latency-sensitive
+    endpoints pass hedge=True to race the next fallback model once the primary is slower
+    than the endpoint's p95.
+    
+    count_json_call counts the call in json_repair_stats only if it actually goes upstream,
+    i.e. not for a cache hit or a coalesced follower.
+    
+    priority is the upstream scheduler class: short interactive calls pass "interactive" and
+    heavy long-output jobs pass "batch" so they can't starve everyone else. Within a class,
+    upstream slots are shared fairly between client identities.
+    
+    Each call carries a deadline (see get_request_deadline); once it can't be met the request
+    fails with a 504 instead of walking the rest of the model list.
+    
+    max_tokens defaults to the endpoint's completion budget (see services/token_budget.py),
+    and tokens in/out are recorded per endpoint for every upstream call.
+    """
+    kwargs.setdefault("max_tokens", endpoint_budget(endpoint, MODEL_LIST).completion_tokens)
+    deadline = get_request_deadline(endpoint)
+    min_attempt_seconds = get_min_attempt_seconds(endpoint)
+    request_key = request_cache_key(endpoint, model, messages, kwargs)
+    use_cache = cache and LLM_CACHE_ENABLED
+    if use_cache:
+        cached = await response_cache.get(request_key)
+        if cached is not None:
+            return cached
+    
+    async def call_upstream():
+        started = time.monotonic()
+        if count_json_call:
+            json_repair_stats.record_call(endpoint)
+        if hedge and LLM_HEDGING_ENABLED:
+            response = await create_chat_completion_hedged(
+                client=client,
+                model=model,
+                messages=messages,
+                hedge_delay=get_hedge_delay(endpoint),
+                fallback_models=FALLBACK_MODELS,
+                max_retries=max_retries,
+                retry_delay=retry_delay,
+                health_registry=model_health_registry,
+                scheduler=upstream_scheduler,
+                priority=priority,
+                client_id=current_client_id.get(),
+                deadline=deadline,
+                min_attempt_seconds=min_attempt_seconds,
+                **kwargs
+            )
+        else:
+            response = await create_chat_completion_with_retry(
+                client=client,
+                model=model,
+                messages=messages,
+                max_retries=max_retries,
+                retry_delay=retry_delay,
+                fallback_models=FALLBACK_MODELS,
+                health_registry=model_health_registry,
+                scheduler=upstream_scheduler,
+                priority=priority,
+                client_id=current_client_id.get(),
+                deadline=deadline,
+                min_attempt_seconds=min_attempt_seconds,
+                **kwargs
+            )
+        if endpoint:
+            llm_latency_tracker.record(endpoint, time.monotonic() - started)
+        record_token_usage(endpoint, model, messages, response)
+        return response
+    
+    response = await llm_single_flight.do(request_key, call_upstream)
+    
+    # Only cache usable answers, never an empty completion
+    if use_cache and response.choices and response.choices[0].message.content:
+        await response_cache.set(request_key, response)
+    return response
+
+async def stream_chat_completion_with_auto_fallback(
+    messages: list,
+    model: str = MODEL_NAME,
+    max_retries: int = 3,
+    retry_delay: float = 2,
+    endpoint: str = "",
+    priority: str = "standard",
+    **kwargs
+):
     """
-    return create_chat_completion_with_retry(
+    Streaming counterpart of create_chat_completion_with_auto_fallback.
+    Yields content deltas as they arrive. Rate limits, model switching and the deadline are
+    handled while opening the stream; streamed responses are never cached or coalesced.
+    """
+    kwargs.setdefault("max_tokens", endpoint_budget(endpoint, MODEL_LIST).completion_tokens)
+    # The final chunk then carries the usage block, including cached prompt tokens
+    kwargs.setdefault("stream_options", {"include_usage": True})
+    started = time.monotonic()
+    stream = await create_chat_completion_with_retry(
         client=client,
         model=model,
         messages=messages,
         max_retries=max_retries,
         retry_delay=retry_delay,
         fallback_models=FALLBACK_MODELS,
+        health_registry=model_health_registry,
+        scheduler=upstream_scheduler,
+        priority=priority,
+        client_id=current_client_id.get(),
+        deadline=get_request_deadline(endpoint),
+        min_attempt_seconds=get_min_attempt_seconds(endpoint),
+        stream=True,
         **kwargs
-    ) 
+    )
+    completion_parts = []
+    usage = None
+    async with stream:
+        async for chunk in stream:
+            if getattr(chunk, "usage", None):
+                usage = chunk.usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                completion_parts.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
+    if endpoint:
+        llm_latency_tracker.record(endpoint, time.monotonic() - started)
+    record_token_usage(endpoint, model, messages, completion_text="".join(completion_parts), usage=usage)
 
-def generate_resume_content(data: ResumeInput) -> ResumeOutput:
+async def stream_json_field(field: str, schema=None, **kwargs):
     """
-    Generates an ATS-friendly resume content using AI.
+    Streams a JSON-mode completion, relaying one top-level string field as it is generated.
+    Yields ("token", text) for each decoded piece of `field`, then ("result", dict) with the
+    fully parsed object so the remaining (metadata) fields can be sent at the end.
+
+    The object is parsed incrementally alongside the field, so a truncated or fenced
+    response is repaired (see services/json_repair.py) instead of failing at the end.
+    Tokens have already been sent by then, so an unrepairable stream is not retried.
+    """
+    endpoint = kwargs.get("endpoint", "")
+    streamer = JSONStringFieldStreamer(field)
+    parser = IncrementalJSONParser()
+    parts = []
+    json_repair_stats.record_call(endpoint)
+    async for delta in stream_chat_completion_with_auto_fallback(**kwargs):
+        parts.append(delta)
+        parser.feed(delta)
+        text = streamer.feed(delta)
+        if text:
+            yield "token", text
+    text = streamer.close()
+    if text:
+        yield "token", text
+
+    content = "".join(parts)
+    try:
+        result, repaired = parse_model_output(content, schema, parser=parser)
+    except JSONRepairError:
+        json_repair_stats.record_unrepairable(endpoint)
+        raise
+    json_repair_stats.record_parse(endpoint, repaired)
+    yield "result", result
+
+async def create_json_completion(
+    schema=None,
+    defaults: dict = None,
+    fallback=None,
+    max_repair_retries: int = LLM_JSON_REPAIR_RETRIES,
+    **kwargs
+) -> dict:
+    """
+    JSON-mode completion parsed by the shared repair engine (services/json_repair.py).
+
+    Fenced, truncated or loosely typed output is repaired and coerced towards `schema`
+    instead of being thrown away; the call is only repeated when repair is impossible.
+    `defaults` are output fields the caller fills in itself, used for validation only.
+    `fallback(content)` salvages output with no JSON in it at all (e.g. plain text)
+    instead of retrying. Other arguments go to create_chat_completion_with_auto_fallback.
+    """
+    endpoint = kwargs.get("endpoint", "")
+    attempt = 0
+    while True:
+        response = await create_chat_completion_with_auto_fallback(count_json_call=True, **kwargs)
+        content = response.choices[0].message.content if response.choices else ""
+        try:
+            data, repaired = parse_model_output(content or "", schema, defaults)
+            json_repair_stats.record_parse(endpoint, repaired)
+            if repaired:
+                print(f"🩹 Repaired JSON response on {endpoint}")
+            return data
+        except JSONRepairError as e:
+            json_repair_stats.record_unrepairable(endpoint)
+            # Don't serve the unusable answer from the cache again
+            await response_cache.discard(request_cache_key(endpoint, kwargs.get("model", MODEL_NAME), kwargs["messages"], kwargs))
+            if fallback is not None and content and not isinstance(e, JSONSchemaMismatch):
+                json_repair_stats.record_fallback(endpoint)
+                return fallback(content)
+            if attempt >= max_repair_retries:
+                raise
+            attempt += 1
+            print(f"⚠ Unrepairable JSON on {endpoint} ({e}), retrying ({attempt}/{max_repair_retries})")
+
+def drop_near_duplicates(items: list, texts: list, endpoint: str, threshold: float = NEAR_DUPLICATE_DEDUPE_THRESHOLD):
+    """
+    Keep the first of each group of near-identical generated items (MinHash/LSH over
+    `texts`). Returns the kept items and, for every original position, its position in
+    the kept list, so indexes into the original output can be remapped.
+    """
+    representative = dedupe(texts, threshold)
+    kept_positions = {}
+    kept = []
+    for i, item in enumerate(items):
+        if representative[i] == i:
+            kept_positions[i] = len(kept)
+            kept.append(item)
+    if len(kept) < len(items):
+        print(f"✂ Dropped {len(items) - len(kept)} near-duplicate item(s) from {endpoint}")
+    return kept, [kept_positions[r] for r in representative]
+
+def analysis_scope(*parts) -> str:
     """
-    system_prompt = """
+    Reuse scope of an analysis: the requesting client plus the inputs other than the resume
+    text, so one client is never served an analysis of another client's resume.
+    """
+    return scope_key(current_client_id.get(), *parts)
+
+def reuse_analysis(endpoint: str, scope: str, text: str, force_refresh: bool = False):
+    """
+    The fields of an earlier result for a near-identical text in the same scope, flagged
+    with reused_from_similar and reuse_similarity, if there is one. A result is only reused
+    when the edit leaves alone the lines it quotes and the terms it lists; with
+    force_refresh the stored results are dropped instead, so the fresh one replaces them.
+    """
+    if force_refresh:
+        analysis_reuse_cache.invalidate(endpoint, scope, text)
+        return None
+    reused = analysis_reuse_cache.lookup(
+        endpoint, scope, text, accept=lambda stored_text, result: not edit_touches_result(stored_text, text, result)
+    )
+    if reused is None:
+        return None
+    print(f"♻ Reusing {endpoint} result of a near-identical resume (similarity {reused.similarity:.2f})")
+    return {**reused.result, "reused_from_similar": True, "reuse_similarity": round(reused.similarity, 3)}
+
+GENERATE_PROMPT = prompt_registry.register("generate", "1", """
     You are an expert Resume Writer and Career Coach. Your goal is to create an ATS-optimized, 
     professional resume based on the user's input.
     
@@ -112,12 +483,7 @@ def generate_resume_content(data: ResumeInput) -> ResumeOutput:
     3. SKILLS: Organize and filter the skills to prioritize those most relevant to 'target_role'.
     
     Return the output strictly as valid JSON following the provided schema structure.
-    """
-    
-    user_prompt = f"""
-    Target Role: {data.target_role}
-    User Data: {data.model_dump_json()}
-    
+
     Format the response as a JSON object with:
     - full_name
     - contact_info (email, phone, location, linkedin, website)
@@ -127,10 +493,24 @@ def generate_resume_content(data: ResumeInput) -> ResumeOutput:
     - education (as provided)
     - projects (as provided)
     - certifications (as provided)
+    """)
+
+async def generate_resume_content(data: ResumeInput) -> ResumeOutput:
+    """
+    Generates an ATS-friendly resume content using AI.
+    """
+    system_prompt = GENERATE_PROMPT.content
+    
+    user_prompt = f"""
+    Target Role: {data.target_role}
+    User Data ({COMPACT_FORMAT_NOTE}):
+    {encode_for_prompt(data)}
     """
 
     try:
-        response = create_chat_completion_with_auto_fallback(
+        resume_data = await create_json_completion(
+            schema=ResumeOutput,
+            endpoint="generate",
             model=MODEL_NAME,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -143,26 +523,13 @@ def generate_resume_content(data: ResumeInput) -> ResumeOutput:
                 "X-Title": "AI Resume Builder",
             }
         )
-        
-        content = response.choices[0].message.content
-        resume_data = json.loads(content)
         return ResumeOutput(**resume_data)
 
     except Exception as e:
         print(f"Error generating resume: {e}")
         raise
 
-def review_resume_content(data: ReviewInput) -> ReviewOutput:
-    """
-    Reviews a resume against a target role and provides feedback.
-    """
-    # Validate input
-    if not data.resume_text or len(data.resume_text.strip()) < 10:
-        raise ValueError("Resume text is too short or empty. Please provide a valid resume.")
-    
-    if not data.target_role or len(data.target_role.strip()) < 2:
-        raise ValueError("Target role is required and must be at least 2 characters.")
-    system_prompt = """
+REVIEW_PROMPT = prompt_registry.register("review", "1", """
     You are an expert ATS (Applicant Tracking System) Scanner and Recruiter. 
     Analyze the resume text against the target job role.
     
@@ -213,90 +580,86 @@ def review_resume_content(data: ReviewInput) -> ReviewOutput:
     - Never return empty arrays
     - All string values must be meaningful and specific
     - detailed_scores should cover at least 5-7 categories with 3-5 criteria each
+
+    Provide a comprehensive analysis in the required JSON format with all fields populated.
+    """)
+
+async def review_resume_content(data: ReviewInput) -> ReviewOutput:
+    """
+    Reviews a resume against a target role and provides feedback.
     """
+    # Validate input
+    if not data.resume_text or len(data.resume_text.strip()) < 10:
+        raise ValueError("Resume text is too short or empty. Please provide a valid resume.")
     
-    jd_context = f"\n\nJob Description:\n{data.job_description}" if data.job_description else ""
+    if not data.target_role or len(data.target_role.strip()) < 2:
+        raise ValueError("Target role is required and must be at least 2 characters.")
+    reuse_scope = analysis_scope(REVIEW_PROMPT.version, MODEL_NAME, data.target_role.strip().lower(), data.job_description)
+    reused = reuse_analysis("review", reuse_scope, data.resume_text, data.force_refresh)
+    if reused is not None:
+        return ReviewOutput(**reused)
+    system_prompt = REVIEW_PROMPT.content
+    
+    resume_text, job_description = fit_prompt(
+        "review", system_prompt,
+        PromptSection(data.resume_text, priority=2),
+        PromptSection(data.job_description or "", priority=1),
+    )
+    jd_context = f"\n\nJob Description:\n{job_description}" if data.job_description else ""
     
     user_prompt = f"""
     Analyze this resume for the target role: {data.target_role}
     {jd_context}
     
     Resume Text:
-    {data.resume_text}
-    
-    Provide a comprehensive analysis in the required JSON format with all fields populated.
+    {resume_text}
     """
 
     try:
-        response = create_chat_completion_with_auto_fallback(
+        review_data = await create_json_completion(
+            schema=ReviewOutput,
+            defaults={"ats_score": 0},
+            endpoint="review",
+            hedge=True,
             model=MODEL_NAME,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
             response_format={"type": "json_object"},
+            cache=True,
             temperature=0.2,
             extra_headers={
                 "HTTP-Referer": "https://antigravity.dev",
                 "X-Title": "AI Resume Builder",
             }
         )
-        
-        content = response.choices[0].message.content
-        
-        if not content or len(content.strip()) == 0:
-            raise ValueError("AI returned empty response")
-        
-        print(f"AI Response (first 500 chars): {content[:500]}...")  # Debug logging
-        print(f"Full response length: {len(content)}")  # Debug logging
-        
-        # Try to extract JSON if wrapped in markdown code blocks
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0].strip()
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0].strip()
-        
-        review_data = json.loads(content)
         print(f"Parsed JSON keys: {list(review_data.keys())}")  # Debug logging
-        print(f"Sample values - ats_score: {review_data.get('ats_score')}, strengths type: {type(review_data.get('strengths'))}")
-        
-        # Validate and ensure all required fields exist with proper types
-        # Convert string arrays to lists if needed
-        def ensure_list(value, default=[]):
-            if value is None:
-                return default
-            if isinstance(value, list):
-                return value
-            if isinstance(value, str):
-                try:
-                    parsed = json.loads(value)
-                    return parsed if isinstance(parsed, list) else default
-                except:
-                    return [value] if value else default
-            return default
         
         result = ReviewOutput(
             ats_score=int(review_data.get("ats_score", 0)) if review_data.get("ats_score") is not None else 0,
-            strengths=ensure_list(review_data.get("strengths")),
-            weaknesses=ensure_list(review_data.get("weaknesses")),
-            suggestions=ensure_list(review_data.get("suggestions")),
-            missing_skills=ensure_list(review_data.get("missing_skills")),
-            job_match_score=int(review_data.get("job_match_score")) if review_data.get("job_match_score") is not None and data.job_description else None,
-            keyword_matches=ensure_list(review_data.get("keyword_matches")),
-            missing_keywords=ensure_list(review_data.get("missing_keywords"))
+            strengths=review_data["strengths"],
+            weaknesses=review_data["weaknesses"],
+            suggestions=review_data["suggestions"],
+            missing_skills=review_data["missing_skills"],
+            job_match_score=review_data.get("job_match_score") if data.job_description else None,
+            keyword_matches=review_data.get("keyword_matches") or [],
+            missing_keywords=review_data.get("missing_keywords") or []
         )
         
         # If all fields are empty, this indicates the AI didn't generate proper content
         if result.ats_score == 0 and len(result.strengths) == 0 and len(result.weaknesses) == 0:
             print("WARNING: AI returned empty results. This might indicate a model issue.")
-            print(f"Full response: {content}")
+            print(f"Full response: {review_data}")
+        else:
+            # Empty answers are not worth reusing for the next version of this resume
+            analysis_reuse_cache.store("review", reuse_scope, data.resume_text, result.model_dump())
         
         print(f"Returning result - ats_score: {result.ats_score}, strengths: {len(result.strengths)}, weaknesses: {len(result.weaknesses)}")
         return result
 
-    except json.JSONDecodeError as e:
-        print(f"JSON decode error: {e}")
-        print(f"Raw content received: {content if 'content' in locals() else 'N/A'}")
+    except JSONRepairError as e:
+        print(f"JSON repair error: {e}")
         raise ValueError(f"Failed to parse AI response as JSON: {str(e)}")
     except Exception as e:
         print(f"Error reviewing resume: {e}")
@@ -304,11 +667,7 @@ def review_resume_content(data: ReviewInput) -> ReviewOutput:
         traceback.print_exc()
         raise
 
-def match_job_description(data: JobMatchInput) -> JobMatchOutput:
-    """
-    Matches resume against a specific job description and provides detailed analysis.
-    """
-    system_prompt = """
+MATCH_JOB_PROMPT = prompt_registry.register("match-job", "1", """
     You are an expert Recruiter and ATS System Analyst. Analyze how well the resume matches 
     the job description. Provide:
     1. Match Score (0-100): Overall compatibility
@@ -318,29 +677,69 @@ def match_job_description(data: JobMatchInput) -> JobMatchOutput:
     5. Skill Gaps: Required skills missing from resume
     
     Return strictly as valid JSON.
+    """)
+
+MATCH_JOB_RECOMMENDATIONS_PROMPT = prompt_registry.register("match-job-recommendations", "1", """
+    You are an expert Recruiter and ATS System Analyst. A keyword analysis of the resume
+    against the job description has already been done and is included in the request.
+    Based on it, the job description and the resume, give 3-5 specific, actionable
+    recommendations to improve the match. Do not recompute scores or keyword lists.
+    """, schema="""
+    {
+        "recommendations": ["recommendation 1", "recommendation 2", ...]
+    }
+    """)
+
+async def match_job_description(data: JobMatchInput, mode: str = "llm") -> JobMatchOutput:
     """
+    Matches resume against a specific job description and provides detailed analysis.
+
+    mode="fast" answers from the local keyword matcher (services/keyword_matcher.py) alone,
+    in milliseconds. mode="hybrid" takes the score and keyword lists from the matcher and
+    asks the LLM only for recommendations. mode="llm" leaves the whole analysis to the LLM.
+    """
+    if mode in ("fast", "hybrid"):
+        local = match_keywords(data.resume_text, data.job_description)
+        recommendations = (
+            await recommend_for_job_match(data, local) if mode == "hybrid" else local_recommendations(local)
+        )
+        return JobMatchOutput(
+            match_score=local.match_score,
+            matched_keywords=local.matched_keywords,
+            missing_keywords=local.missing_keywords,
+            recommendations=recommendations,
+            skill_gaps=local.skill_gaps,
+        )
+
+    system_prompt = MATCH_JOB_PROMPT.content
     
+    job_description, resume_text = fit_prompt(
+        "match-job", system_prompt,
+        PromptSection(data.job_description, priority=1),
+        PromptSection(data.resume_text, priority=2),
+    )
     user_prompt = f"""
     Job Description:
-    {data.job_description}
+    {job_description}
     
     Resume Text:
-    {data.resume_text}
+    {resume_text}
     """
 
     try:
-        response = create_chat_completion_with_auto_fallback(
+        match_data = await create_json_completion(
+            schema=JobMatchOutput,
+            defaults={"match_score": 0},
+            endpoint="match-job",
             model=MODEL_NAME,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
             response_format={"type": "json_object"},
+            cache=True,
             temperature=0.2,
         )
-        
-        content = response.choices[0].message.content
-        match_data = json.loads(content)
         return JobMatchOutput(
             match_score=match_data.get("match_score", 0),
             matched_keywords=match_data.get("matched_keywords", []),
@@ -352,11 +751,88 @@ def match_job_description(data: JobMatchInput) -> JobMatchOutput:
         print(f"Error matching job description: {e}")
         raise
 
-def generate_cover_letter(data: CoverLetterInput) -> CoverLetterOutput:
+async def recommend_for_job_match(data: JobMatchInput, local) -> list:
     """
-    Generates a personalized cover letter based on resume and job description.
+    LLM recommendations on top of a local keyword match (hybrid /match-job).
+    """
+    system_prompt = MATCH_JOB_RECOMMENDATIONS_PROMPT.content
+    
+    job_description, resume_text = fit_prompt(
+        "match-job-recommendations", system_prompt,
+        PromptSection(data.job_description, priority=1),
+        PromptSection(data.resume_text, priority=2),
+    )
+    user_prompt = f"""
+    Keyword Match Score: {local.match_score}/100
+    Matched Keywords: {', '.join(local.matched_keywords) or 'None'}
+    Missing Keywords: {', '.join(local.missing_keywords) or 'None'}
+    Missing Skills: {', '.join(local.skill_gaps) or 'None'}
+    
+    Job Description:
+    {job_description}
+    
+    Resume Text:
+    {resume_text}
+    """
+
+    try:
+        result = await create_json_completion(
+            schema=JobMatchRecommendations,
+            endpoint="match-job-recommendations",
+            priority="interactive",
+            model=MODEL_NAME,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            response_format={"type": "json_object"},
+            cache=True,
+            temperature=0.2,
+        )
+        return result["recommendations"]
+    except Exception as e:
+        print(f"Error generating job match recommendations: {e}")
+        raise
+
+async def match_job_descriptions_batch(data: BatchJobMatchInput) -> BatchJobMatchOutput:
+    """
+    Ranks many job descriptions against one resume. Scoring is a single vectorised BM25
+    pass (services/job_ranker.py) with no LLM involved; only the top_k matches get LLM
+    recommendations, requested concurrently. A failed recommendation call falls back to
+    the templated ones instead of failing the batch.
     """
-    system_prompt = """
+    ranked = rank_jobs(data.resume_text, data.job_descriptions)
+    top = ranked[:max(0, data.top_k)]
+
+    async def recommend(job):
+        local = KeywordMatch(
+            match_score=job.match_score,
+            matched_keywords=job.matched_keywords,
+            missing_keywords=job.missing_keywords,
+            skill_gaps=job.skill_gaps,
+            weights={},
+        )
+        try:
+            return await recommend_for_job_match(
+                JobMatchInput(resume_text=data.resume_text, job_description=data.job_descriptions[job.index]), local
+            )
+        except Exception as e:
+            print(f"⚠ Recommendations for job {job.index} unavailable ({e}), using templated ones")
+            return local_recommendations(local)
+
+    recommendations = await asyncio.gather(*(recommend(job) for job in top))
+    return BatchJobMatchOutput(
+        matches=[
+            RankedJobMatch(
+                **job._asdict(),
+                rank=rank,
+                recommendations=recommendations[rank - 1] if rank <= len(top) else None,
+            )
+            for rank, job in enumerate(ranked, start=1)
+        ]
+    )
+
+COVER_LETTER_PROMPT = prompt_registry.register("cover-letter", "1", """
     You are an expert Cover Letter Writer. Create a compelling, personalized cover letter that:
     1. Highlights relevant experience from the resume
     2. Addresses key requirements from the job description
@@ -365,33 +841,54 @@ def generate_cover_letter(data: CoverLetterInput) -> CoverLetterOutput:
     5. Is tailored and not generic
     
     Return the cover letter and key personalized sections as JSON.
+    """, schema="""
+    {
+        "cover_letter": "<complete cover letter text>",
+        "personalized_sections": {"section name": "<how it was tailored>"}
+    }
+    """)
+
+def build_cover_letter_messages(data: CoverLetterInput) -> list:
     """
+    Builds the prompt shared by the regular and streaming cover letter endpoints.
+    The letter field comes first in the JSON so it can be streamed before the metadata.
+    """
+    system_prompt = COVER_LETTER_PROMPT.content
     
+    job_description, resume_text = fit_prompt(
+        "cover-letter", system_prompt,
+        PromptSection(data.job_description, priority=1),
+        PromptSection(data.resume_text, priority=2),
+    )
     user_prompt = f"""
     Applicant Name: {data.applicant_name}
     Position: {data.position}
     Company: {data.company_name}
     
     Job Description:
-    {data.job_description}
+    {job_description}
     
     Resume:
-    {data.resume_text}
+    {resume_text}
     """
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
 
+async def generate_cover_letter(data: CoverLetterInput) -> CoverLetterOutput:
+    """
+    Generates a personalized cover letter based on resume and job description.
+    """
     try:
-        response = create_chat_completion_with_auto_fallback(
+        letter_data = await create_json_completion(
+            schema=CoverLetterOutput,
+            endpoint="cover-letter",
             model=MODEL_NAME,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
+            messages=build_cover_letter_messages(data),
             response_format={"type": "json_object"},
             temperature=0.7,
         )
-        
-        content = response.choices[0].message.content
-        letter_data = json.loads(content)
         return CoverLetterOutput(
             cover_letter=letter_data.get("cover_letter", ""),
             personalized_sections=letter_data.get("personalized_sections", {})
@@ -400,98 +897,128 @@ def generate_cover_letter(data: CoverLetterInput) -> CoverLetterOutput:
         print(f"Error generating cover letter: {e}")
         raise
 
-def generate_interview_questions(data: InterviewQuestionsInput) -> InterviewQuestionsOutput:
+async def stream_cover_letter(data: CoverLetterInput):
     """
-    Generates comprehensive interview questions with technical questions based on experience level
-    and code examples for technical answers.
+    Streaming variant of generate_cover_letter.
+    Yields ("token", text) as the letter body is generated, then ("done", CoverLetterOutput).
     """
-    # Determine experience level from years of experience
-    exp_level = "mid"
-    if data.years_of_experience:
-        if data.years_of_experience < 2:
-            exp_level = "junior"
-        elif data.years_of_experience >= 5:
-            exp_level = "senior"
-    
-    system_prompt = f"""
+    try:
+        async for event, payload in stream_json_field(
+            "cover_letter",
+            schema=CoverLetterOutput,
+            endpoint="cover-letter",
+            model=MODEL_NAME,
+            messages=build_cover_letter_messages(data),
+            response_format={"type": "json_object"},
+            temperature=0.7,
+        ):
+            if event == "token":
+                yield event, payload
+            else:
+                yield "done", CoverLetterOutput(
+                    cover_letter=payload.get("cover_letter", ""),
+                    personalized_sections=payload.get("personalized_sections", {})
+                )
+    except Exception as e:
+        print(f"Error streaming cover letter: {e}")
+        raise
+
+INTERVIEW_QUESTIONS_PROMPT = prompt_registry.register("interview-questions", "1", """
     You are an expert Interview Coach and Technical Interview Specialist.
     Generate comprehensive interview questions based on the resume and experience level.
     
-    For {exp_level}-level candidates, generate:
-    1. Technical questions appropriate for {exp_level} level (algorithms, data structures, system design)
+    For the candidate's experience level (given in the request), generate:
+    1. Technical questions appropriate for that level (algorithms, data structures, system design)
     2. Behavioral questions using STAR method
     3. Questions about specific experiences and projects mentioned
     4. System design questions (if senior level)
     5. Code examples and explanations for technical questions
     
     Return as JSON with this EXACT structure:
-    {{
+    {
         "questions": ["question1", "question2", ...],  // Simple list for backward compatibility
         "answers": ["answer1", "answer2", ...],  // Simple list for backward compatibility
         "categories": ["Technical", "Behavioral", ...],  // Simple list for backward compatibility
         "detailed_questions": [
-            {{
+            {
                 "question": "Explain how you would implement a binary search tree",
                 "answer": "A binary search tree is...",
                 "category": "Technical",
                 "difficulty": "medium",
-                "experience_level": "{exp_level}",
+                "experience_level": "junior|mid|senior",
                 "code_examples": [
-                    {{
+                    {
                         "language": "Python",
                         "code": "class TreeNode:\\n    def __init__(self, val):\\n        self.val = val\\n        self.left = None\\n        self.right = None",
                         "explanation": "This creates a basic tree node structure",
                         "time_complexity": "O(log n) average",
                         "space_complexity": "O(n)"
-                    }}
+                    }
                 ],
                 "key_points": ["point1", "point2"],
                 "follow_up_questions": ["follow-up1", "follow-up2"]
-            }}
+            }
         ],
         "technical_questions_count": 5,
         "behavioral_questions_count": 3,
         "system_design_questions_count": 2
-    }}
+    }
     
     IMPORTANT:
     - Include code examples for ALL technical questions (Python, JavaScript, Java, etc. based on role)
-    - Technical questions should match {exp_level} level difficulty
+    - Technical questions should match the experience level's difficulty
     - Code examples should be complete, runnable, and well-commented
     - Include time/space complexity analysis for algorithms
     - For senior roles, include system design questions
     - All arrays (questions, answers, categories) must have the same length
+
+    For technical questions, provide:
+    - Complete code examples in relevant languages
+    - Time and space complexity analysis
+    - Explanation of approach
+    - Key points to cover
+    - Potential follow-up questions
+    """)
+
+async def generate_interview_questions(data: InterviewQuestionsInput) -> InterviewQuestionsOutput:
     """
+    Generates comprehensive interview questions with technical questions based on experience level
+    and code examples for technical answers.
+    """
+    # Determine experience level from years of experience
+    exp_level = "mid"
+    if data.years_of_experience:
+        if data.years_of_experience < 2:
+            exp_level = "junior"
+        elif data.years_of_experience >= 5:
+            exp_level = "senior"
     
-    jd_context = f"\nJob Description:\n{data.job_description}" if data.job_description else ""
-    exp_context = f"\nYears of Experience: {data.years_of_experience} ({exp_level} level)" if data.years_of_experience else ""
+    system_prompt = INTERVIEW_QUESTIONS_PROMPT.content
+    
+    resume_text, job_description = fit_prompt(
+        "interview-questions", system_prompt,
+        PromptSection(data.resume_text, priority=2),
+        PromptSection(data.job_description or "", priority=1),
+    )
+    jd_context = f"\nJob Description:\n{job_description}" if data.job_description else ""
+    exp_context = f"\nYears of Experience: {data.years_of_experience}" if data.years_of_experience else ""
     code_note = "\nIMPORTANT: Include code examples for all technical questions." if data.include_code_examples else ""
     
     user_prompt = f"""
     Target Role: {data.target_role}
+    Experience Level: {exp_level}
     {exp_context}
     {jd_context}
     {code_note}
     
     Resume:
-    {data.resume_text}
-    
-    Generate comprehensive interview questions:
-    1. Technical questions appropriate for {exp_level} level (include code examples)
-    2. Behavioral questions using STAR method
-    3. System design questions (if applicable)
-    4. Questions about specific projects/experiences
-    
-    For technical questions, provide:
-    - Complete code examples in relevant languages
-    - Time and space complexity analysis
-    - Explanation of approach
-    - Key points to cover
-    - Potential follow-up questions
+    {resume_text}
     """
 
     try:
-        response = create_chat_completion_with_auto_fallback(
+        questions_data = await create_json_completion(
+            endpoint="interview-questions",
+            priority="batch",
             model=MODEL_NAME,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -501,9 +1028,6 @@ def generate_interview_questions(data: InterviewQuestionsInput) -> InterviewQues
             temperature=0.6,
         )
         
-        content = response.choices[0].message.content
-        questions_data = json.loads(content)
-        
         # Handle different response formats
         questions = questions_data.get("questions", [])
         answers = questions_data.get("answers", [])
@@ -565,12 +1089,7 @@ def generate_interview_questions(data: InterviewQuestionsInput) -> InterviewQues
         print(f"Error generating interview questions: {e}")
         raise
 
-def improve_resume_content(data: ImproveResumeInput) -> ImproveResumeOutput:
-    """
-    Improves a resume by applying AI suggestions and recommendations.
-    Takes the original resume text and applies all suggestions to create an improved version.
-    """
-    system_prompt = """
+IMPROVE_PROMPT = prompt_registry.register("improve", "1", """
     You are an expert Resume Writer and Career Coach. Your task is to improve a resume by applying 
     specific suggestions and recommendations.
     
@@ -588,17 +1107,40 @@ def improve_resume_content(data: ImproveResumeInput) -> ImproveResumeOutput:
     but incorporates all the improvements.
     
     Also provide a list of specific improvements made and an estimated new ATS score.
+
+    Please provide:
+    1. The improved resume text (complete, formatted resume)
+    2. A list of specific improvements made (e.g., "Added quantifiable metrics to 3 bullet points", "Incorporated TypeScript and Kubernetes keywords")
+    3. An estimated new ATS score (0-100)
+    """, schema="""
+    {
+        "improved_resume_text": "<complete improved resume text>",
+        "improvements_made": ["improvement 1", "improvement 2", ...],
+        "estimated_new_ats_score": 85
+    }
+    """)
+
+async def improve_resume_content(data: ImproveResumeInput) -> ImproveResumeOutput:
+    """
+    Improves a resume by applying AI suggestions and recommendations.
+    Takes the original resume text and applies all suggestions to create an improved version.
     """
+    system_prompt = IMPROVE_PROMPT.content
     
     suggestions_text = "\n".join([f"- {s}" for s in data.suggestions])
     missing_skills_text = ", ".join(data.missing_skills) if data.missing_skills else "None"
     missing_keywords_text = ", ".join(data.missing_keywords) if data.missing_keywords else "None"
     
+    resume_text, job_description = fit_prompt(
+        "improve", system_prompt,
+        PromptSection(data.resume_text, priority=2),
+        PromptSection(data.job_description or "", priority=1),
+    )
     user_prompt = f"""
     Target Role: {data.target_role}
     
     Original Resume:
-    {data.resume_text}
+    {resume_text}
     
     Strengths to Maintain:
     {chr(10).join([f"- {s}" for s in data.strengths])}
@@ -615,23 +1157,19 @@ def improve_resume_content(data: ImproveResumeInput) -> ImproveResumeOutput:
     Missing Keywords to Add Naturally:
     {missing_keywords_text}
     
-    {f"Job Description Context:{chr(10)}{data.job_description}" if data.job_description else ""}
-    
-    Please provide:
-    1. The improved resume text (complete, formatted resume)
-    2. A list of specific improvements made (e.g., "Added quantifiable metrics to 3 bullet points", "Incorporated TypeScript and Kubernetes keywords")
-    3. An estimated new ATS score (0-100)
-    
-    Return as JSON with:
-    {{
-        "improved_resume_text": "<complete improved resume text>",
-        "improvements_made": ["improvement 1", "improvement 2", ...],
-        "estimated_new_ats_score": 85
-    }}
+    {f"Job Description Context:{chr(10)}{job_description}" if data.job_description else ""}
     """
     
     try:
-        response = create_chat_completion_with_auto_fallback(
+        improved_data = await create_json_completion(
+            schema=ImproveResumeOutput,
+            # Plain-text answers are still usable as the rewritten text
+            fallback=lambda content: {
+                "improved_resume_text": content,
+                "improvements_made": ["Applied all suggestions to improve resume"],
+                "estimated_new_ats_score": None,
+            },
+            endpoint="improve",
             model=MODEL_NAME,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -645,25 +1183,6 @@ def improve_resume_content(data: ImproveResumeInput) -> ImproveResumeOutput:
             }
         )
         
-        content = response.choices[0].message.content
-        
-        # Try to parse JSON, with fallback for markdown code blocks
-        try:
-            improved_data = json.loads(content)
-        except json.JSONDecodeError:
-            import re
-            match = re.search(r"```json\n(.*?)```", content, re.DOTALL)
-            if match:
-                json_string = match.group(1)
-                improved_data = json.loads(json_string)
-            else:
-                # If no JSON found, use the content as improved text
-                improved_data = {
-                    "improved_resume_text": content,
-                    "improvements_made": ["Applied all suggestions to improve resume"],
-                    "estimated_new_ats_score": None
-                }
-        
         return ImproveResumeOutput(
             improved_resume_text=improved_data.get("improved_resume_text", ""),
             improvements_made=improved_data.get("improvements_made", []),
@@ -673,11 +1192,7 @@ def improve_resume_content(data: ImproveResumeInput) -> ImproveResumeOutput:
         print(f"Error improving resume: {e}")
         raise
 
-def generate_resignation_letter(data: ResignationLetterInput) -> ResignationLetterOutput:
-    """
-    Generates a professional resignation letter.
-    """
-    system_prompt = """
+RESIGNATION_LETTER_PROMPT = prompt_registry.register("resignation-letter", "1", """
     You are an expert HR and Career Coach. Create a professional resignation letter that:
     1. Is respectful and maintains positive relationships
     2. Clearly states the resignation and last working day
@@ -686,7 +1201,21 @@ def generate_resignation_letter(data: ResignationLetterInput) -> ResignationLett
     5. Matches the requested tone (professional, friendly, or formal)
     
     Return the resignation letter and key sections as JSON.
+
+    Create a professional resignation letter that maintains a positive relationship with the employer.
+    """, schema="""
+    {
+        "resignation_letter": "<complete resignation letter text>",
+        "personalized_sections": {"section name": "<section text>"}
+    }
+    """)
+
+def build_resignation_letter_messages(data: ResignationLetterInput) -> list:
     """
+    Builds the prompt shared by the regular and streaming resignation letter endpoints.
+    The letter field comes first in the JSON so it can be streamed before the metadata.
+    """
+    system_prompt = RESIGNATION_LETTER_PROMPT.content
     
     tone_instruction = f"Use a {data.tone} tone throughout the letter."
     reason_context = f"\nReason for leaving: {data.reason}" if data.reason else ""
@@ -699,17 +1228,22 @@ def generate_resignation_letter(data: ResignationLetterInput) -> ResignationLett
     {reason_context}
     
     {tone_instruction}
-    
-    Create a professional resignation letter that maintains a positive relationship with the employer.
     """
-    
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+async def generate_resignation_letter(data: ResignationLetterInput) -> ResignationLetterOutput:
+    """
+    Generates a professional resignation letter.
+    """
     try:
-        response = create_chat_completion_with_auto_fallback(
+        letter_data = await create_json_completion(
+            schema=ResignationLetterOutput,
+            endpoint="resignation-letter",
             model=MODEL_NAME,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
+            messages=build_resignation_letter_messages(data),
             response_format={"type": "json_object"},
             temperature=0.7,
             extra_headers={
@@ -717,9 +1251,6 @@ def generate_resignation_letter(data: ResignationLetterInput) -> ResignationLett
                 "X-Title": "AI Resume Builder",
             }
         )
-        
-        content = response.choices[0].message.content
-        letter_data = json.loads(content)
         return ResignationLetterOutput(
             resignation_letter=letter_data.get("resignation_letter", ""),
             personalized_sections=letter_data.get("personalized_sections", {})
@@ -728,12 +1259,37 @@ def generate_resignation_letter(data: ResignationLetterInput) -> ResignationLett
         print(f"Error generating resignation letter: {e}")
         raise
 
-def rewrite_bullet_point(data: RewriteBulletInput) -> RewriteBulletOutput:
+async def stream_resignation_letter(data: ResignationLetterInput):
     """
-    Rewrites a single bullet point to be more impactful and ATS-friendly.
-    Uses real-world best practices and quantifies achievements.
+    Streaming variant of generate_resignation_letter.
+    Yields ("token", text) as the letter body is generated, then ("done", ResignationLetterOutput).
     """
-    system_prompt = """
+    try:
+        async for event, payload in stream_json_field(
+            "resignation_letter",
+            schema=ResignationLetterOutput,
+            endpoint="resignation-letter",
+            model=MODEL_NAME,
+            messages=build_resignation_letter_messages(data),
+            response_format={"type": "json_object"},
+            temperature=0.7,
+            extra_headers={
+                "HTTP-Referer": "https://antigravity.dev",
+                "X-Title": "AI Resume Builder",
+            }
+        ):
+            if event == "token":
+                yield event, payload
+            else:
+                yield "done", ResignationLetterOutput(
+                    resignation_letter=payload.get("resignation_letter", ""),
+                    personalized_sections=payload.get("personalized_sections", {})
+                )
+    except Exception as e:
+        print(f"Error streaming resignation letter: {e}")
+        raise
+
+REWRITE_BULLET_PROMPT = prompt_registry.register("rewrite-bullet", "1", """
     You are an expert Resume Writer. Rewrite bullet points to be more impactful by:
     1. Using strong action verbs
     2. Quantifying achievements with specific numbers, percentages, or metrics
@@ -742,7 +1298,23 @@ def rewrite_bullet_point(data: RewriteBulletInput) -> RewriteBulletOutput:
     5. Ensuring ATS-friendly language
     
     Return the improved bullet point, list of improvements made, and keywords added.
+
+    Rewrite this bullet point to be more impactful, quantified, and ATS-optimized.
+    Make it specific, measurable, and relevant to the target role.
+    """, schema="""
+    {
+        "improved_bullet": "<rewritten bullet point>",
+        "improvements_made": ["improvement 1", "improvement 2", ...],
+        "keywords_added": ["keyword1", "keyword2", ...]
+    }
+    """)
+
+async def rewrite_bullet_point(data: RewriteBulletInput) -> RewriteBulletOutput:
     """
+    Rewrites a single bullet point to be more impactful and ATS-friendly.
+    Uses real-world best practices and quantifies achievements.
+    """
+    system_prompt = REWRITE_BULLET_PROMPT.content
     
     context_text = f"\nContext: {data.context}" if data.context else ""
     
@@ -752,20 +1324,19 @@ def rewrite_bullet_point(data: RewriteBulletInput) -> RewriteBulletOutput:
     
     Original Bullet Point:
     {data.original_bullet}
-    
-    Rewrite this bullet point to be more impactful, quantified, and ATS-optimized.
-    Make it specific, measurable, and relevant to the target role.
-    
-    Return as JSON with:
-    {{
-        "improved_bullet": "<rewritten bullet point>",
-        "improvements_made": ["improvement 1", "improvement 2", ...],
-        "keywords_added": ["keyword1", "keyword2", ...]
-    }}
     """
     
     try:
-        response = create_chat_completion_with_auto_fallback(
+        bullet_data = await create_json_completion(
+            schema=RewriteBulletOutput,
+            # Plain-text answers are still usable as the rewritten text
+            fallback=lambda content: {
+                "improved_bullet": content.strip(),
+                "improvements_made": ["Enhanced with action verbs and metrics"],
+                "keywords_added": [],
+            },
+            endpoint="rewrite-bullet",
+            priority="interactive",
             model=MODEL_NAME,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -779,24 +1350,6 @@ def rewrite_bullet_point(data: RewriteBulletInput) -> RewriteBulletOutput:
             }
         )
         
-        content = response.choices[0].message.content
-        
-        # Try to parse JSON, with fallback
-        try:
-            bullet_data = json.loads(content)
-        except json.JSONDecodeError:
-            import re
-            match = re.search(r"```json\n(.*?)```", content, re.DOTALL)
-            if match:
-                json_string = match.group(1)
-                bullet_data = json.loads(json_string)
-            else:
-                bullet_data = {
-                    "improved_bullet": content,
-                    "improvements_made": ["Enhanced with action verbs and metrics"],
-                    "keywords_added": []
-                }
-        
         return RewriteBulletOutput(
             improved_bullet=bullet_data.get("improved_bullet", ""),
             improvements_made=bullet_data.get("improvements_made", []),
@@ -806,12 +1359,221 @@ def rewrite_bullet_point(data: RewriteBulletInput) -> RewriteBulletOutput:
         print(f"Error rewriting bullet point: {e}")
         raise
 
-def predict_career_path(data: CareerPathInput) -> CareerPathOutput:
+# Bullets per upstream call: enough to amortise the instructions, few enough that the
+# answer fits the rewrite-bullets completion budget
+REWRITE_BULLETS_PER_CALL = max(1, int(os.getenv("REWRITE_BULLETS_PER_CALL", "10")))
+MAX_REWRITE_BULLETS = 100
+
+REWRITE_BULLETS_PROMPT = prompt_registry.register("rewrite-bullets", "1", """
+    You are an expert Resume Writer. Rewrite each of the numbered bullet points to be more
+    impactful by:
+    1. Using strong action verbs
+    2. Quantifying achievements with specific numbers, percentages, or metrics
+    3. Highlighting results and impact
+    4. Making it relevant to the target role
+    5. Ensuring ATS-friendly language
+    
+    The bullets come from the same role, so vary the action verbs across them.
+    Return one entry per bullet, in the order given, with the bullet's id, the improved
+    bullet point, the list of improvements made, and keywords added. Never merge, split
+    or skip bullets.
+    """, schema="""
+    {
+        "bullets": [
+            {
+                "id": 0,
+                "improved_bullet": "<rewritten bullet point>",
+                "improvements_made": ["improvement 1", "improvement 2", ...],
+                "keywords_added": ["keyword1", "keyword2", ...]
+            }
+        ]
+    }
+    """)
+
+def group_bullets(data: RewriteBulletsInput) -> list:
+    """
+    Input positions grouped by context (role/company), in order of first appearance, with
+    large groups split evenly into calls of at most REWRITE_BULLETS_PER_CALL bullets.
+    """
+    by_context = {}
+    for i, bullet in enumerate(data.bullets):
+        by_context.setdefault((bullet.context or data.context or "").strip(), []).append(i)
+    groups = []
+    for positions in by_context.values():
+        calls = -(-len(positions) // REWRITE_BULLETS_PER_CALL)
+        size = -(-len(positions) // calls)
+        groups.extend(positions[start:start + size] for start in range(0, len(positions), size))
+    return groups
+
+def build_rewrite_bullets_messages(data: RewriteBulletsInput, positions: list) -> list:
+    context = data.bullets[positions[0]].context or data.context
+    context_text = f"\nContext: {context}" if context else ""
+    numbered = "\n    ".join(f"[{n}] {data.bullets[i].text}" for n, i in enumerate(positions))
+    user_prompt = f"""
+    Target Role: {data.target_role}
+    {context_text}
+    
+    Bullet Points:
+    {numbered}
     """
-    Predicts career progression path based on resume and current role.
-    Provides next steps, skill gaps, and recommended learning paths.
+    return [
+        {"role": "system", "content": REWRITE_BULLETS_PROMPT.content},
+        {"role": "user", "content": user_prompt}
+    ]
+
+def parse_rewritten_bullets(entries: list, data: RewriteBulletsInput, positions: list, done: set) -> list:
+    """
+    RewrittenBullet for each well-formed entry of a batch answer not already in `done`
+    (input positions). Entries without an id are taken to be in prompt order.
+    """
+    bullets = []
+    for n, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            continue
+        try:
+            item = BatchRewrittenBullet.model_validate(coerce_to_schema({"id": n, **entry}, BatchRewrittenBullet))
+        except ValueError:
+            continue
+        if not 0 <= item.id < len(positions) or positions[item.id] in done or not item.improved_bullet.strip():
+            continue
+        index = positions[item.id]
+        done.add(index)
+        bullets.append(RewrittenBullet(
+            index=index,
+            original_bullet=data.bullets[index].text,
+            improved_bullet=item.improved_bullet,
+            improvements_made=item.improvements_made,
+            keywords_added=item.keywords_added,
+        ))
+    return bullets
+
+def unrewritten_bullet(data: RewriteBulletsInput, index: int, error: Exception) -> RewrittenBullet:
+    text = data.bullets[index].text
+    return RewrittenBullet(
+        index=index, original_bullet=text, improved_bullet=text, improvements_made=[], keywords_added=[],
+        error=str(getattr(error, "detail", "") or error) or type(error).__name__,
+    )
+
+async def rewrite_bullet_individually(data: RewriteBulletsInput, index: int) -> RewrittenBullet:
+    bullet = data.bullets[index]
+    try:
+        result = await rewrite_bullet_point(RewriteBulletInput(
+            original_bullet=bullet.text, target_role=data.target_role, context=bullet.context or data.context
+        ))
+        return RewrittenBullet(index=index, original_bullet=bullet.text, **result.model_dump())
+    except Exception as e:
+        return unrewritten_bullet(data, index, e)
+
+async def stream_bullet_group(data: RewriteBulletsInput, positions: list):
+    """
+    Rewrite one group of bullets in a single streamed call, yielding each RewrittenBullet as
+    soon as its array entry is complete. Bullets the answer skipped (or the whole group, if
+    the answer couldn't be parsed) are then rewritten one at a time, concurrently, within
+    what is left of the batch's deadline. When the call itself failed (rate limited, models
+    down, out of time) the group's bullets come back unchanged with `error` set instead:
+    one call per bullet would only hit the same limits harder.
+    """
+    deadline = get_request_deadline("rewrite-bullets")
+    done = set()
+    parser = IncrementalJSONParser()
+    parts = []
+    try:
+        json_repair_stats.record_call("rewrite-bullets")
+        async for delta in stream_chat_completion_with_auto_fallback(
+            endpoint="rewrite-bullets",
+            priority="interactive",
+            model=MODEL_NAME,
+            messages=build_rewrite_bullets_messages(data, positions),
+            response_format={"type": "json_object"},
+            temperature=0.6,
+            extra_headers={
+                "HTTP-Referer": "https://antigravity.dev",
+                "X-Title": "AI Resume Builder",
+            }
+        ):
+            parts.append(delta)
+            parser.feed(delta)
+            if "}" not in delta:
+                continue
+            snapshot = parser.snapshot()
+            entries = snapshot.get("bullets") if isinstance(snapshot, dict) else None
+            if isinstance(entries, list):
+                # Below depth 3 no entry is open; otherwise the last one is still arriving
+                ready = entries if parser.complete or parser.depth < 3 else entries[:-1]
+                for bullet in parse_rewritten_bullets(ready, data, positions, done):
+                    yield bullet
+        result, repaired = parse_model_output("".join(parts), parser=parser)
+        json_repair_stats.record_parse("rewrite-bullets", repaired)
+        entries = result.get("bullets")
+        for bullet in parse_rewritten_bullets(entries if isinstance(entries, list) else [], data, positions, done):
+            yield bullet
+    except JSONRepairError as e:
+        json_repair_stats.record_unrepairable("rewrite-bullets")
+        print(f"⚠ Unrepairable batch answer for {len(positions)} bullet(s) ({e}), rewriting them one by one")
+    except Exception as e:
+        if not isinstance(e, HTTPException) and not llm_unavailable(e):
+            raise
+        print(f"⚠ Batch rewrite of {len(positions) - len(done)} bullet(s) failed ({e}), returning them unchanged")
+        for i in positions:
+            if i not in done:
+                yield unrewritten_bullet(data, i, e)
+        return
+
+    async def rewrite_within_deadline(index: int) -> RewrittenBullet:
+        # A task of its own (see gather below), so setting the deadline doesn't leak out
+        current_deadline.set(deadline)
+        return await rewrite_bullet_individually(data, index)
+
+    missing = [i for i in positions if i not in done]
+    if missing:
+        if len(missing) < len(positions):
+            print(f"⚠ Batch answer skipped {len(missing)} of {len(positions)} bullet(s), rewriting them one by one")
+        for bullet in await asyncio.gather(*(rewrite_within_deadline(i) for i in missing)):
+            yield bullet
+
+async def stream_rewrite_bullets(data: RewriteBulletsInput):
+    """
+    Rewrites many bullet points with one LLM call per group (see group_bullets), all groups
+    at once. Yields ("bullet", RewrittenBullet) as each one is parsed, in whatever order
+    they finish, then ("done", RewriteBulletsOutput) with every bullet in input order.
+    """
+    queue = asyncio.Queue()
+
+    async def run_group(positions):
+        try:
+            async for bullet in stream_bullet_group(data, positions):
+                await queue.put(bullet)
+        finally:
+            await queue.put(None)
+
+    tasks = [asyncio.create_task(run_group(positions)) for positions in group_bullets(data)]
+    results = {}
+    try:
+        running = len(tasks)
+        while running:
+            bullet = await queue.get()
+            if bullet is None:
+                running -= 1
+                continue
+            results[bullet.index] = bullet
+            yield "bullet", bullet
+        # Surface unexpected failures instead of silently dropping their bullets
+        await asyncio.gather(*tasks)
+    finally:
+        # Client gone or a group failed: stop the upstream calls still running
+        for task in tasks:
+            task.cancel()
+    yield "done", RewriteBulletsOutput(bullets=[results[i] for i in sorted(results)])
+
+async def rewrite_bullet_points(data: RewriteBulletsInput) -> RewriteBulletsOutput:
     """
-    system_prompt = """
+    Non-streaming variant of stream_rewrite_bullets.
+    """
+    async for event, payload in stream_rewrite_bullets(data):
+        if event == "done":
+            return payload
+
+CAREER_PATH_PROMPT = prompt_registry.register("career-path", "1", """
     You are an expert Career Coach and Industry Analyst. Analyze the resume and predict 
     the career progression path. Provide:
     1. Current career level assessment
@@ -822,40 +1584,53 @@ def predict_career_path(data: CareerPathInput) -> CareerPathOutput:
     6. Overall career trajectory description
     
     Return as JSON with detailed career path information.
-    """
-    
-    exp_context = f"\nYears of Experience: {data.years_of_experience}" if data.years_of_experience else ""
-    
-    user_prompt = f"""
-    Current Role: {data.current_role}
-    {exp_context}
-    
-    Resume:
-    {data.resume_text}
-    
+
     Analyze and predict the career progression path. Provide realistic next steps with 
     timelines, required skills, and actionable recommendations.
-    
-    Return as JSON with:
-    {{
+    """, schema="""
+    {
         "current_level": "<assessed career level>",
         "next_steps": [
-            {{
+            {
                 "role_title": "<next role>",
                 "timeline": "<timeframe>",
                 "required_skills": ["skill1", "skill2"],
                 "description": "<description>",
                 "salary_range": "<optional salary range>"
-            }}
+            }
         ],
         "skill_gaps": ["gap1", "gap2"],
         "recommended_courses": ["course1", "course2"],
         "career_trajectory": "<overall trajectory description>"
-    }}
+    }
+    """)
+
+async def predict_career_path(data: CareerPathInput) -> CareerPathOutput:
+    """
+    Predicts career progression path based on resume and current role.
+    Provides next steps, skill gaps, and recommended learning paths.
+    """
+    system_prompt = CAREER_PATH_PROMPT.content
+    
+    exp_context = f"\nYears of Experience: {data.years_of_experience}" if data.years_of_experience else ""
+    
+    [resume_text] = fit_prompt(
+        "career-path", system_prompt,
+        PromptSection(data.resume_text, priority=1),
+    )
+    user_prompt = f"""
+    Current Role: {data.current_role}
+    {exp_context}
+    
+    Resume:
+    {resume_text}
     """
     
     try:
-        response = create_chat_completion_with_auto_fallback(
+        path_data = await create_json_completion(
+            schema=CareerPathOutput,
+            defaults={"current_level": "", "career_trajectory": ""},
+            endpoint="career-path",
             model=MODEL_NAME,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -869,9 +1644,6 @@ def predict_career_path(data: CareerPathInput) -> CareerPathOutput:
             }
         )
         
-        content = response.choices[0].message.content
-        path_data = json.loads(content)
-        
         next_steps = [
             CareerPathStep(**step) for step in path_data.get("next_steps", [])
         ]
@@ -887,12 +1659,7 @@ def predict_career_path(data: CareerPathInput) -> CareerPathOutput:
         print(f"Error predicting career path: {e}")
         raise
 
-def generate_resume_heatmap(data: ResumeHeatMapInput) -> ResumeHeatMapOutput:
-    """
-    Generates a visual heat map of resume strength by section.
-    Shows which sections are strong, moderate, or weak.
-    """
-    system_prompt = """
+HEATMAP_PROMPT = prompt_registry.register("heatmap", "1", """
     You are an expert Resume Analyst. Analyze the resume and provide section-by-section 
     scoring for a heat map visualization. Evaluate each section (Summary, Experience, 
     Education, Skills, etc.) and provide:
@@ -903,41 +1670,59 @@ def generate_resume_heatmap(data: ResumeHeatMapInput) -> ResumeHeatMapOutput:
     5. Overall score
     
     Return as JSON with detailed section analysis.
-    """
-    
-    user_prompt = f"""
-    Target Role: {data.target_role}
-    
-    Resume:
-    {data.resume_text}
-    
+
     Analyze each section of the resume and provide scores, feedback, and keyword analysis.
-    
-    Return as JSON with:
-    {{
+    """, schema="""
+    {
         "overall_score": 75,
         "section_scores": [
-            {{
+            {
                 "section_name": "Summary",
                 "score": 80,
                 "strength_level": "strong",
                 "feedback": "<feedback>",
                 "keywords_found": ["keyword1"],
                 "keywords_missing": ["keyword2"]
-            }}
+            }
         ],
-        "heat_map_data": {{"section1": 80, "section2": 65}}
-    }}
+        "heat_map_data": {"section1": 80, "section2": 65}
+    }
+    """)
+
+async def generate_resume_heatmap(data: ResumeHeatMapInput) -> ResumeHeatMapOutput:
+    """
+    Generates a visual heat map of resume strength by section.
+    Shows which sections are strong, moderate, or weak.
+    """
+    reuse_scope = analysis_scope(HEATMAP_PROMPT.version, MODEL_NAME, data.target_role.strip().lower())
+    reused = reuse_analysis("heatmap", reuse_scope, data.resume_text, data.force_refresh)
+    if reused is not None:
+        return ResumeHeatMapOutput(**reused)
+    system_prompt = HEATMAP_PROMPT.content
+    
+    [resume_text] = fit_prompt(
+        "heatmap", system_prompt,
+        PromptSection(data.resume_text, priority=1),
+    )
+    user_prompt = f"""
+    Target Role: {data.target_role}
+    
+    Resume:
+    {resume_text}
     """
     
     try:
-        response = create_chat_completion_with_auto_fallback(
+        heatmap_data = await create_json_completion(
+            schema=ResumeHeatMapOutput,
+            defaults={"overall_score": 0},
+            endpoint="heatmap",
             model=MODEL_NAME,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
             response_format={"type": "json_object"},
+            cache=True,
             temperature=0.3,
             extra_headers={
                 "HTTP-Referer": "https://antigravity.dev",
@@ -945,28 +1730,22 @@ def generate_resume_heatmap(data: ResumeHeatMapInput) -> ResumeHeatMapOutput:
             }
         )
         
-        content = response.choices[0].message.content
-        heatmap_data = json.loads(content)
-        
         section_scores = [
             SectionScore(**section) for section in heatmap_data.get("section_scores", [])
         ]
         
-        return ResumeHeatMapOutput(
+        result = ResumeHeatMapOutput(
             overall_score=heatmap_data.get("overall_score", 0),
             section_scores=section_scores,
             heat_map_data=heatmap_data.get("heat_map_data", {})
         )
+        analysis_reuse_cache.store("heatmap", reuse_scope, data.resume_text, result.model_dump())
+        return result
     except Exception as e:
         print(f"Error generating resume heatmap: {e}")
         raise
 
-def benchmark_against_industry(data: IndustryBenchmarkInput) -> IndustryBenchmarkOutput:
-    """
-    Compares resume against industry standards and benchmarks.
-    Shows how the resume performs relative to industry averages.
-    """
-    system_prompt = """
+BENCHMARK_PROMPT = prompt_registry.register("benchmark", "1", """
     You are an expert Industry Analyst and Recruiter. Compare the resume against industry 
     benchmarks for the specified industry and role. Provide:
     1. Comparison metrics (ATS score, keyword density, experience level, etc.)
@@ -975,43 +1754,61 @@ def benchmark_against_industry(data: IndustryBenchmarkInput) -> IndustryBenchmar
     4. Industry insights and trends
     
     Return as JSON with benchmark comparisons and insights.
-    """
-    
-    user_prompt = f"""
-    Industry: {data.industry}
-    Target Role: {data.target_role}
-    
-    Resume:
-    {data.resume_text}
-    
+
     Compare this resume against industry benchmarks. Provide percentile rankings and 
     industry-specific recommendations.
-    
-    Return as JSON with:
-    {{
-        "industry": "{data.industry}",
+    """, schema="""
+    {
+        "industry": "<industry>",
         "comparisons": [
-            {{
+            {
                 "metric": "ATS Score",
                 "your_score": 75,
                 "industry_average": 68,
                 "percentile": 75,
                 "status": "above_average"
-            }}
+            }
         ],
         "recommendations": ["rec1", "rec2"],
         "industry_insights": ["insight1", "insight2"]
-    }}
+    }
+    """)
+
+async def benchmark_against_industry(data: IndustryBenchmarkInput) -> IndustryBenchmarkOutput:
+    """
+    Compares resume against industry standards and benchmarks.
+    Shows how the resume performs relative to industry averages.
+    """
+    reuse_scope = analysis_scope(BENCHMARK_PROMPT.version, MODEL_NAME, data.industry.strip().lower(), data.target_role.strip().lower())
+    reused = reuse_analysis("benchmark", reuse_scope, data.resume_text, data.force_refresh)
+    if reused is not None:
+        return IndustryBenchmarkOutput(**reused)
+    system_prompt = BENCHMARK_PROMPT.content
+    
+    [resume_text] = fit_prompt(
+        "benchmark", system_prompt,
+        PromptSection(data.resume_text, priority=1),
+    )
+    user_prompt = f"""
+    Industry: {data.industry}
+    Target Role: {data.target_role}
+    
+    Resume:
+    {resume_text}
     """
     
     try:
-        response = create_chat_completion_with_auto_fallback(
+        benchmark_data = await create_json_completion(
+            schema=IndustryBenchmarkOutput,
+            defaults={"industry": data.industry},
+            endpoint="benchmark",
             model=MODEL_NAME,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
             response_format={"type": "json_object"},
+            cache=True,
             temperature=0.4,
             extra_headers={
                 "HTTP-Referer": "https://antigravity.dev",
@@ -1019,28 +1816,23 @@ def benchmark_against_industry(data: IndustryBenchmarkInput) -> IndustryBenchmar
             }
         )
         
-        content = response.choices[0].message.content
-        benchmark_data = json.loads(content)
-        
         comparisons = [
             BenchmarkComparison(**comp) for comp in benchmark_data.get("comparisons", [])
         ]
         
-        return IndustryBenchmarkOutput(
+        result = IndustryBenchmarkOutput(
             industry=benchmark_data.get("industry", data.industry),
             comparisons=comparisons,
             recommendations=benchmark_data.get("recommendations", []),
             industry_insights=benchmark_data.get("industry_insights", [])
         )
+        analysis_reuse_cache.store("benchmark", reuse_scope, data.resume_text, result.model_dump())
+        return result
     except Exception as e:
         print(f"Error benchmarking against industry: {e}")
         raise
 
-def translate_resume(data: MultiLanguageInput) -> MultiLanguageOutput:
-    """
-    Translates resume to target language with cultural adaptations.
-    """
-    system_prompt = """
+TRANSLATE_PROMPT = prompt_registry.register("translate", "1", """
     You are an expert Translator and Cultural Adaptation Specialist. Translate the resume 
     to the target language while:
     1. Maintaining professional tone and formatting
@@ -1049,35 +1841,48 @@ def translate_resume(data: MultiLanguageInput) -> MultiLanguageOutput:
     4. Ensuring ATS compatibility in the target language
     
     Return the translated resume and notes about cultural adaptations.
+
+    Translate this resume to the target language. Maintain professional formatting and 
+    make appropriate cultural adaptations.
+    """, schema="""
+    {
+        "translated_resume": "<translated text>",
+        "language": "<target language>",
+        "confidence_score": 0.95,
+        "cultural_adaptations": ["adaptation1", "adaptation2"]
+    }
+    """)
+
+async def translate_resume(data: MultiLanguageInput) -> MultiLanguageOutput:
+    """
+    Translates resume to target language with cultural adaptations.
     """
+    system_prompt = TRANSLATE_PROMPT.content
     
+    [resume_text] = fit_prompt(
+        "translate", system_prompt,
+        PromptSection(data.resume_text, priority=1),
+    )
     user_prompt = f"""
     Target Language: {data.target_language}
     Preserve Formatting: {data.preserve_formatting}
     
     Resume:
-    {data.resume_text}
-    
-    Translate this resume to {data.target_language}. Maintain professional formatting and 
-    make appropriate cultural adaptations.
-    
-    Return as JSON with:
-    {{
-        "translated_resume": "<translated text>",
-        "language": "{data.target_language}",
-        "confidence_score": 0.95,
-        "cultural_adaptations": ["adaptation1", "adaptation2"]
-    }}
+    {resume_text}
     """
     
     try:
-        response = create_chat_completion_with_auto_fallback(
+        translation_data = await create_json_completion(
+            schema=MultiLanguageOutput,
+            defaults={"language": data.target_language},
+            endpoint="translate",
             model=MODEL_NAME,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
             response_format={"type": "json_object"},
+            cache=True,
             temperature=0.3,
             extra_headers={
                 "HTTP-Referer": "https://antigravity.dev",
@@ -1085,9 +1890,6 @@ def translate_resume(data: MultiLanguageInput) -> MultiLanguageOutput:
             }
         )
         
-        content = response.choices[0].message.content
-        translation_data = json.loads(content)
-        
         return MultiLanguageOutput(
             translated_resume=translation_data.get("translated_resume", ""),
             language=translation_data.get("language", data.target_language),
@@ -1098,83 +1900,92 @@ def translate_resume(data: MultiLanguageInput) -> MultiLanguageOutput:
         print(f"Error translating resume: {e}")
         raise
 
-def analyze_resume_analytics(data: ResumeAnalyticsInput) -> ResumeAnalyticsOutput:
+ANALYTICS_PROMPT = prompt_registry.register("analytics", "2", """
+    You are an expert Resume Analytics Specialist. The resume's measurable metrics (ATS score,
+    word count, readability, keyword density and section completeness) have already been
+    computed and are included in the request; do not recompute them.
+    
+    Based on the resume, the target role and those metrics, estimate:
+    1. Improvement potential: how many ATS score points (0-100) realistic edits could add
+    2. Estimated interview rate: the expected share (0.0-1.0) of applications to this kind
+       of role that lead to an interview
+    """, schema="""
+    {
+        "improvement_potential": 25,
+        "estimated_interview_rate": 0.15
+    }
+    """)
+
+async def analyze_resume_analytics(data: ResumeAnalyticsInput) -> ResumeAnalyticsOutput:
     """
     Provides comprehensive analytics and metrics for the resume.
     Includes keyword density, readability, completeness, and performance predictions.
-    """
-    system_prompt = """
-    You are an expert Resume Analytics Specialist. Analyze the resume and provide 
-    comprehensive metrics including:
-    1. ATS score
-    2. Keyword density analysis
-    3. Readability score
-    4. Word count
-    5. Section completeness
-    6. Improvement potential
-    7. Estimated interview rate
-    
-    Return as JSON with detailed analytics.
-    """
-    
+
+    Everything measurable is computed locally (services/resume_analytics.py); the LLM is
+    only asked for the two predictions, improvement_potential and estimated_interview_rate.
+    When it can't answer (rate limited, down, out of time, unparseable), the local metrics
+    are returned with the heuristic improvement_potential and no interview rate.
+    """
+    metrics = analyze_resume_text(data.resume_text, data.target_role)
+    improvement_potential = max(0, 90 - metrics.ats_score)
+    system_prompt = ANALYTICS_PROMPT.content
+    
+    [resume_text] = fit_prompt(
+        "analytics", system_prompt,
+        PromptSection(data.resume_text, priority=1),
+    )
     user_prompt = f"""
     Target Role: {data.target_role}
+    ATS Score: {metrics.ats_score}/100
+    Word Count: {metrics.word_count}
+    Readability (Flesch): {metrics.readability_score}
+    Section Completeness: {', '.join(f"{name} {score}" for name, score in metrics.sections_completeness.items())}
+    Role Keywords Found: {', '.join(metrics.role_terms_found) or 'None'}
+    Role Keywords Missing: {', '.join(metrics.role_terms_missing) or 'None'}
     
     Resume:
-    {data.resume_text}
-    
-    Provide comprehensive analytics for this resume including keyword density, readability, 
-    completeness scores, and performance predictions.
-    
-    Return as JSON with:
-    {{
-        "ats_score": 75,
-        "keyword_density": {{"keyword1": 2.5, "keyword2": 1.8}},
-        "readability_score": 65,
-        "word_count": 450,
-        "sections_completeness": {{"summary": 90, "experience": 85}},
-        "improvement_potential": 25,
-        "estimated_interview_rate": 0.15
-    }}
+    {resume_text}
     """
     
     try:
-        response = create_chat_completion_with_auto_fallback(
+        predictions = await create_json_completion(
+            schema=ResumeAnalyticsPredictions,
+            defaults={"improvement_potential": improvement_potential},
+            endpoint="analytics",
             model=MODEL_NAME,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
             response_format={"type": "json_object"},
+            cache=True,
             temperature=0.2,
             extra_headers={
                 "HTTP-Referer": "https://antigravity.dev",
                 "X-Title": "AI Resume Builder",
             }
         )
-        
-        content = response.choices[0].message.content
-        analytics_data = json.loads(content)
-        
-        return ResumeAnalyticsOutput(
-            ats_score=analytics_data.get("ats_score", 0),
-            keyword_density=analytics_data.get("keyword_density", {}),
-            readability_score=analytics_data.get("readability_score", 0),
-            word_count=analytics_data.get("word_count", 0),
-            sections_completeness=analytics_data.get("sections_completeness", {}),
-            improvement_potential=analytics_data.get("improvement_potential", 0),
-            estimated_interview_rate=analytics_data.get("estimated_interview_rate")
-        )
+    except JSONRepairError as e:
+        print(f"⚠ Unparseable analytics predictions ({e}), returning the local metrics only")
+        predictions = {}
     except Exception as e:
-        print(f"Error analyzing resume analytics: {e}")
-        raise
+        if not llm_unavailable(e):
+            print(f"Error analyzing resume analytics: {e}")
+            raise
+        print(f"⚠ Analytics predictions unavailable ({e}), returning the local metrics only")
+        predictions = {}
 
-def chat_with_ai_agent(data: ChatInput) -> ChatOutput:
-    """
-    Conversational AI agent for resume and job search assistance.
-    Provides intelligent responses based on user queries and resume context.
-    """
-    system_prompt = """You are an expert AI Resume Agent and Career Coach. Your role is to help users with:
+    return ResumeAnalyticsOutput(
+        ats_score=metrics.ats_score,
+        keyword_density=metrics.keyword_density,
+        readability_score=metrics.readability_score,
+        word_count=metrics.word_count,
+        sections_completeness=metrics.sections_completeness,
+        improvement_potential=predictions.get("improvement_potential", improvement_potential),
+        estimated_interview_rate=predictions.get("estimated_interview_rate")
+    )
+
+CHAT_PROMPT = prompt_registry.register("chat", "1", """You are an expert AI Resume Agent and Career Coach. Your role is to help users with:
 1. Resume building and optimization
 2. ATS score improvement
 3. Job targeting and matching
@@ -1188,8 +1999,13 @@ Always provide specific, actionable recommendations. If the user asks about impr
 If they want to target a job, help them identify keywords and skills to add.
 If they want to find jobs, provide guidance on job search strategies and platforms.
 
-Keep responses concise but informative. Use bullet points for lists of recommendations."""
-    
+Keep responses concise but informative. Use bullet points for lists of recommendations.""")
+
+def build_chat_messages(data: ChatInput) -> list:
+    """
+    Builds the OpenAI message list for the AI agent: the static system prompt, then the
+    resume context as its own system message, followed by the conversation history.
+    """
     # Build context from resume data if available
     context_parts = []
     if data.resume_data:
@@ -1208,9 +2024,9 @@ User's Resume Context:
     context_text = "\n".join(context_parts)
     
     # Convert messages to OpenAI format
-    messages = [
-        {"role": "system", "content": system_prompt + (f"\n\n{context_text}" if context_text else "")}
-    ]
+    messages = [{"role": "system", "content": CHAT_PROMPT.content}]
+    if context_text:
+        messages.append({"role": "system", "content": context_text.strip()})
     
     # Add conversation history
     for msg in data.messages:
@@ -1219,8 +2035,38 @@ User's Resume Context:
             "content": msg.content
         })
     
+    # Long conversations drop their oldest turns to stay within the chat prompt budget
+    fitted = trim_history(messages, endpoint_budget("chat", MODEL_LIST).prompt_tokens, MODEL_NAME)
+    if len(fitted) < len(messages):
+        token_usage_tracker.record_truncation(
+            "chat", count_message_tokens(messages, MODEL_NAME) - count_message_tokens(fitted, MODEL_NAME)
+        )
+    return fitted
+
+def extract_chat_suggestions(assistant_message: str) -> list:
+    """
+    Extracts actionable bullet/numbered items from an agent reply that suggests or recommends something.
+    """
+    suggestions = []
+    if "suggest" in assistant_message.lower() or "recommend" in assistant_message.lower():
+        # Try to extract bullet points or numbered items
+        lines = assistant_message.split('\n')
+        for line in lines:
+            if line.strip().startswith(('-', '•', '*', '1.', '2.', '3.')):
+                suggestions.append(line.strip().lstrip('-•*1234567890. '))
+    return suggestions[:5]
+
+async def chat_with_ai_agent(data: ChatInput) -> ChatOutput:
+    """
+    Conversational AI agent for resume and job search assistance.
+    Provides intelligent responses based on user queries and resume context.
+    """
+    messages = build_chat_messages(data)
+    
     try:
-        response = create_chat_completion_with_auto_fallback(
+        response = await create_chat_completion_with_auto_fallback(
+            endpoint="chat",
+            priority="interactive",
             model=MODEL_NAME,
             messages=messages,
             temperature=0.7,
@@ -1233,28 +2079,51 @@ User's Resume Context:
         assistant_message = response.choices[0].message.content
         
         # Extract suggestions if the response contains actionable items
-        suggestions = []
-        if "suggest" in assistant_message.lower() or "recommend" in assistant_message.lower():
-            # Try to extract bullet points or numbered items
-            lines = assistant_message.split('\n')
-            for line in lines:
-                if line.strip().startswith(('-', '•', '*', '1.', '2.', '3.')):
-                    suggestions.append(line.strip().lstrip('-•*1234567890. '))
+        suggestions = extract_chat_suggestions(assistant_message)
         
         return ChatOutput(
             message=assistant_message,
-            suggestions=suggestions[:5] if suggestions else None
+            suggestions=suggestions if suggestions else None
         )
     except Exception as e:
         print(f"Error in AI chat: {e}")
         raise
 
-def analyze_and_tailor_resume(data: JobDescriptionAnalyzerInput) -> JobDescriptionAnalyzerOutput:
+async def stream_chat_with_ai_agent(data: ChatInput):
     """
-    Analyzes a job description and automatically tailors the resume to match it.
-    This is the core feature for AI Job Description Analyzer & Auto-Tailor.
+    Streaming variant of chat_with_ai_agent.
+    Yields ("token", text) for each content delta and finally ("done", ChatOutput)
+    with the full message and extracted suggestions.
     """
-    system_prompt = """
+    messages = build_chat_messages(data)
+    parts = []
+    
+    try:
+        async for delta in stream_chat_completion_with_auto_fallback(
+            endpoint="chat",
+            priority="interactive",
+            model=MODEL_NAME,
+            messages=messages,
+            temperature=0.7,
+            extra_headers={
+                "HTTP-Referer": "https://antigravity.dev",
+                "X-Title": "AI Resume Builder",
+            }
+        ):
+            parts.append(delta)
+            yield "token", delta
+        
+        assistant_message = "".join(parts)
+        suggestions = extract_chat_suggestions(assistant_message)
+        yield "done", ChatOutput(
+            message=assistant_message,
+            suggestions=suggestions if suggestions else None
+        )
+    except Exception as e:
+        print(f"Error in AI chat stream: {e}")
+        raise
+
+ANALYZE_JOB_AND_TAILOR_PROMPT = prompt_registry.register("analyze-job-and-tailor", "1", """
     You are an expert Resume Tailoring Specialist. Your job is to analyze a job description
     and automatically tailor a resume to match it perfectly while maintaining authenticity.
     
@@ -1292,31 +2161,48 @@ def analyze_and_tailor_resume(data: JobDescriptionAnalyzerInput) -> JobDescripti
     - Make changes natural and professional
     - Focus on keyword optimization and relevance
     - Maintain the resume structure
+
+    Analyze this job description and tailor the resume to match it. Return the complete
+    tailored resume data along with analysis metrics. tailored_resume must be a JSON object
+    using the same field names as the resume data provided.
+    """)
+
+async def analyze_and_tailor_resume(data: JobDescriptionAnalyzerInput) -> JobDescriptionAnalyzerOutput:
     """
+    Analyzes a job description and automatically tailors the resume to match it.
+    This is the core feature for AI Job Description Analyzer & Auto-Tailor.
+    """
+    system_prompt = ANALYZE_JOB_AND_TAILOR_PROMPT.content
     
-    resume_json = json.dumps(data.resume_data, indent=2)
+    resume_text, job_description = fit_prompt(
+        "analyze-job-and-tailor", system_prompt,
+        PromptSection(encode_for_prompt(data.resume_data), priority=2),
+        PromptSection(data.job_description, priority=1),
+    )
     job_context = f"Job Title: {data.job_title}\nCompany: {data.company_name}\n" if data.job_title or data.company_name else ""
     
     user_prompt = f"""
     Job Description:
-    {data.job_description}
+    {job_description}
     
     {job_context}
-    Current Resume Data (JSON):
-    {resume_json}
-    
-    Analyze this job description and tailor the resume to match it. Return the complete
-    tailored resume data along with analysis metrics.
+    Current Resume Data ({COMPACT_FORMAT_NOTE}):
+    {resume_text}
     """
     
     try:
-        response = create_chat_completion_with_auto_fallback(
+        result_data = await create_json_completion(
+            schema=JobDescriptionAnalyzerOutput,
+            defaults={"match_score": 0, "tailored_resume": data.resume_data},
+            endpoint="analyze-job-and-tailor",
+            hedge=True,
             model=MODEL_NAME,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
             response_format={"type": "json_object"},
+            cache=True,
             temperature=0.3,
             extra_headers={
                 "HTTP-Referer": "https://antigravity.dev",
@@ -1324,16 +2210,6 @@ def analyze_and_tailor_resume(data: JobDescriptionAnalyzerInput) -> JobDescripti
             }
         )
         
-        content = response.choices[0].message.content
-        
-        # Try to extract JSON if wrapped in markdown code blocks
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0].strip()
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0].strip()
-        
-        result_data = json.loads(content)
-        
         return JobDescriptionAnalyzerOutput(
             match_score=float(result_data.get("match_score", 0)),
             matched_keywords=result_data.get("matched_keywords", []),
@@ -1354,12 +2230,7 @@ def analyze_and_tailor_resume(data: JobDescriptionAnalyzerInput) -> JobDescripti
 # NEW QUICK WIN FEATURES
 # ============================================
 
-def quantify_achievement(data: AchievementQuantifierInput) -> AchievementQuantifierOutput:
-    """
-    AI suggests ways to add metrics and quantification to vague achievements.
-    Helps users make their achievements more impactful and measurable.
-    """
-    system_prompt = """
+QUANTIFY_ACHIEVEMENT_PROMPT = prompt_registry.register("quantify-achievement", "1", """
     You are an expert Resume Writer specialized in quantifying achievements.
     Your goal is to help users add measurable metrics to vague achievements.
     
@@ -1389,7 +2260,18 @@ def quantify_achievement(data: AchievementQuantifierInput) -> AchievementQuantif
             "scale": ["5x", "10x", "doubled"]
         }
     }
+
+    Provide 3-5 different quantified versions with various metric types.
+    Be creative but realistic - suggest metrics that make sense for the achievement type.
+    Include explanations and confidence levels for each suggestion.
+    """)
+
+async def quantify_achievement(data: AchievementQuantifierInput) -> AchievementQuantifierOutput:
+    """
+    AI suggests ways to add metrics and quantification to vague achievements.
+    Helps users make their achievements more impactful and measurable.
     """
+    system_prompt = QUANTIFY_ACHIEVEMENT_PROMPT.content
     
     context_parts = []
     if data.role_title:
@@ -1407,14 +2289,14 @@ def quantify_achievement(data: AchievementQuantifierInput) -> AchievementQuantif
     
     Context:
     {context_text}
-    
-    Provide 3-5 different quantified versions with various metric types.
-    Be creative but realistic - suggest metrics that make sense for the achievement type.
-    Include explanations and confidence levels for each suggestion.
     """
     
     try:
-        response = create_chat_completion_with_auto_fallback(
+        result_data = await create_json_completion(
+            schema=AchievementQuantifierOutput,
+            defaults={"original_achievement": data.achievement_text},
+            endpoint="quantify-achievement",
+            priority="interactive",
             model=MODEL_NAME,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -1428,9 +2310,6 @@ def quantify_achievement(data: AchievementQuantifierInput) -> AchievementQuantif
             }
         )
         
-        content = response.choices[0].message.content
-        result_data = json.loads(content)
-        
         suggestions = [
             QuantifiedSuggestion(**s) for s in result_data.get("quantified_suggestions", [])
         ]
@@ -1445,12 +2324,7 @@ def quantify_achievement(data: AchievementQuantifierInput) -> AchievementQuantif
         print(f"Error quantifying achievement: {e}")
         raise
 
-def generate_summary_variations(data: SummaryVariationsInput) -> SummaryVariationsOutput:
-    """
-    Generates multiple resume summary variations (10+ options) with different styles.
-    Users can choose the best fit for their needs.
-    """
-    system_prompt = """
+SUMMARY_VARIATIONS_PROMPT = prompt_registry.register("summary-variations", "1", """
     You are an expert Resume Writer. Generate multiple professional summary variations.
     
     Create diverse summaries with different:
@@ -1478,9 +2352,23 @@ def generate_summary_variations(data: SummaryVariationsInput) -> SummaryVariatio
     }
     
     Generate at least 10 variations covering different styles and approaches.
+
+    Generate the requested number of unique, professional summary variations.
+    Ensure variety in style, length, and approach.
+    Make each one compelling and ATS-optimized.
+    """)
+
+async def generate_summary_variations(data: SummaryVariationsInput) -> SummaryVariationsOutput:
+    """
+    Generates multiple resume summary variations (10+ options) with different styles.
+    Users can choose the best fit for their needs.
     """
+    system_prompt = SUMMARY_VARIATIONS_PROMPT.content
     
-    resume_json = json.dumps(data.resume_data, indent=2)
+    [resume_text] = fit_prompt(
+        "summary-variations", system_prompt,
+        PromptSection(encode_for_prompt(data.resume_data), priority=1),
+    )
     style_prefs = ", ".join(data.style_preferences) if data.style_preferences else "diverse styles"
     
     user_prompt = f"""
@@ -1488,16 +2376,16 @@ def generate_summary_variations(data: SummaryVariationsInput) -> SummaryVariatio
     Number of Variations Needed: {data.number_of_variations}
     Style Preferences: {style_prefs}
     
-    Resume Data:
-    {resume_json}
-    
-    Generate {data.number_of_variations} unique, professional summary variations.
-    Ensure variety in style, length, and approach.
-    Make each one compelling and ATS-optimized.
+    Resume Data ({COMPACT_FORMAT_NOTE}):
+    {resume_text}
     """
     
     try:
-        response = create_chat_completion_with_auto_fallback(
+        result_data = await create_json_completion(
+            schema=SummaryVariationsOutput,
+            defaults={"recommended_variation": 0},
+            endpoint="summary-variations",
+            priority="batch",
             model=MODEL_NAME,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -1511,130 +2399,147 @@ def generate_summary_variations(data: SummaryVariationsInput) -> SummaryVariatio
             }
         )
         
-        content = response.choices[0].message.content
-        result_data = json.loads(content)
-        
         variations = [
             SummaryVariation(**v) for v in result_data.get("variations", [])
         ]
+        variations, positions = drop_near_duplicates(
+            variations, [v.summary_text for v in variations], "summary-variations"
+        )
+        recommended = result_data.get("recommended_variation", 0)
+        if isinstance(recommended, int) and 0 <= recommended < len(positions):
+            recommended = positions[recommended]
         
         return SummaryVariationsOutput(
             variations=variations,
-            recommended_variation=result_data.get("recommended_variation", 0),
+            recommended_variation=recommended,
             selection_guide=result_data.get("selection_guide", {})
         )
     except Exception as e:
         print(f"Error generating summary variations: {e}")
         raise
 
-def expand_keyword_synonyms(data: KeywordSynonymExpanderInput) -> KeywordSynonymExpanderOutput:
-    """
-    Suggests alternative keywords and synonyms to improve ATS matching
-    without keyword stuffing. Helps diversify keyword usage naturally.
-    """
-    system_prompt = """
+EXPAND_KEYWORDS_PROMPT = prompt_registry.register("expand-keywords", "2", """
     You are an expert ATS (Applicant Tracking System) optimizer.
-    Your goal is to suggest keyword synonyms and alternatives that improve ATS matching
-    while maintaining natural, readable resume text.
+    You are given a list of resume keywords. For each one, write a short "context" note
+    (one or two sentences) on when each of its synonyms fits best on a resume, e.g. which
+    suits strategic vs hands-on work, or which wording ATS filters and recruiters expect.
     
-    Analyze the resume and job description (if provided) to:
-    1. Identify important keywords
-    2. Suggest relevant synonyms and alternative phrasings
-    3. Provide context for when to use each synonym
-    4. Avoid keyword stuffing - suggest natural integration
+    Keywords marked [needs synonyms] also need 3-6 ATS-friendly synonyms or alternative
+    phrasings in "synonyms". For the other keywords the synonyms are listed for reference;
+    return "synonyms" as an empty list for them.
     
-    Return JSON with:
+    Notes must hold for any resume, not just one person's, and keep the text natural:
+    never suggest keyword stuffing. Return every keyword you were given, spelled as given.
+""", schema="""
     {
         "keyword_synonyms": [
             {
-                "original_keyword": "manage",
-                "synonyms": ["oversee", "lead", "coordinate", "direct", "supervise"],
-                "context": "Use 'oversee' for strategic roles, 'coordinate' for cross-functional work",
-                "ats_impact": "high"
+                "original_keyword": "managed",
+                "synonyms": [],
+                "context": "Use 'oversaw' for strategic ownership, 'coordinated' for cross-functional work"
             }
-        ],
-        "suggested_replacements": {
-            "manage": ["oversee", "lead"],
-            "create": ["develop", "build", "design"]
-        },
-        "keyword_density_analysis": {
-            "overused_keywords": ["keyword1", "keyword2"],
-            "underused_keywords": ["keyword3"],
-            "optimal_density": "good" or "too_high" or "too_low"
-        },
-        "recommendations": ["rec1", "rec2"]
+        ]
     }
+""")
+
+async def expand_keyword_synonyms(data: KeywordSynonymExpanderInput) -> KeywordSynonymExpanderOutput:
     """
-    
-    jd_text = f"\n\nJob Description:\n{data.job_description}" if data.job_description else ""
-    stuffing_note = "Avoid keyword stuffing - suggest natural alternatives" if data.avoid_keyword_stuffing else ""
-    
-    user_prompt = f"""
-    Resume Text:
-    {data.resume_text}
-    {jd_text}
-    
-    Target Role: {data.target_role}
-    
-    {stuffing_note}
-    
-    Analyze keywords and suggest:
-    1. Synonyms for overused keywords
-    2. Alternative phrasings that are ATS-friendly
-    3. Missing keywords from job description (if provided)
-    4. Natural ways to integrate keywords
-    
-    Focus on keywords that will improve ATS matching while keeping text natural.
-    """
-    
-    try:
-        response = create_chat_completion_with_auto_fallback(
-            model=MODEL_NAME,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.6,
-            extra_headers={
-                "HTTP-Referer": "https://antigravity.dev",
-                "X-Title": "AI Resume Builder",
-            }
-        )
-        
-        content = response.choices[0].message.content
-        result_data = json.loads(content)
-        
-        # Ensure ats_impact is present for each keyword synonym
-        keyword_synonyms_data = result_data.get("keyword_synonyms", [])
-        for ks in keyword_synonyms_data:
-            if "ats_impact" not in ks:
-                ks["ats_impact"] = "medium"  # Default to medium if not provided
-        
-        keyword_synonyms = [
-            KeywordSynonym(**ks) for ks in keyword_synonyms_data
-        ]
-        
-        return KeywordSynonymExpanderOutput(
-            keyword_synonyms=keyword_synonyms,
-            suggested_replacements=result_data.get("suggested_replacements", {}),
-            keyword_density_analysis=result_data.get("keyword_density_analysis", {}),
-            recommendations=result_data.get("recommendations", [])
+    Suggests alternative keywords and synonyms to improve ATS matching
+    without keyword stuffing. Helps diversify keyword usage naturally.
+
+    Keywords, synonyms and density analysis come from the local synonym graph
+    (services/synonym_graph.py). The LLM is only asked, in one batched call, for synonyms of
+    terms the graph doesn't know and for context notes not learned yet. Its answers are
+    kept for this client, and learned into the shared graph once answers for other clients
+    agree (synonym_votes), so common terms soon never need a call.
+    """
+    synonym_graph.expire_learned()
+    expansion = expand_keywords_locally(
+        synonym_graph, data.resume_text, data.job_description, data.avoid_keyword_stuffing
+    )
+    synonyms = dict(expansion.synonyms)
+    contexts = dict(expansion.contexts)
+    client_id = current_client_id.get()
+    for term in expansion.keywords:
+        own_synonyms, own_context = synonym_votes.own(term, client_id)
+        if term not in synonyms and own_synonyms:
+            synonyms[term] = own_synonyms
+        if term not in contexts and own_context:
+            contexts[term] = own_context
+    pending = [t for t in expansion.keywords if t not in synonyms or t not in contexts]
+    
+    if pending:
+        system_prompt = EXPAND_KEYWORDS_PROMPT.content
+        lines = []
+        for term in pending:
+            if term in synonyms:
+                lines.append(f"- {term} (synonyms: {', '.join(synonyms[term])})")
+            else:
+                lines.append(f"- {term} [needs synonyms]")
+        user_prompt = "Keywords:\n" + "\n".join(lines)
+        try:
+            result_data = await create_json_completion(
+                schema=KeywordSynonymBatch,
+                endpoint="expand-keywords",
+                model=MODEL_NAME,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                response_format={"type": "json_object"},
+                temperature=0.6,
+                extra_headers={
+                    "HTTP-Referer": "https://antigravity.dev",
+                    "X-Title": "AI Resume Builder",
+                }
+            )
+            asked = {t.lower(): t for t in pending}
+            for ks in result_data.get("keyword_synonyms", []):
+                term = asked.get(str(ks.get("original_keyword", "")).lower())
+                if term is None:
+                    continue
+                new_synonyms = [s for s in ks.get("synonyms", []) if isinstance(s, str) and s.strip()]
+                context = ks.get("context") or None
+                if term not in synonyms and new_synonyms:
+                    synonyms[term] = new_synonyms
+                if context:
+                    contexts[term] = context
+                agreed, agreed_context = synonym_votes.vote(term, new_synonyms, context, client_id)
+                if agreed or agreed_context:
+                    synonym_graph.learn(term, agreed, agreed_context)
+                    await asyncio.to_thread(
+                        learned_synonyms.save, term, synonym_graph.learned(term), synonym_graph.context(term)
+                    )
+        except Exception as e:
+            # The graph already answered most of the request (rate limits and deadlines
+            # included); serve it with template notes instead of failing
+            synonym_graph_stats.llm_failures += 1
+            print(f"⚠ Keyword context notes unavailable ({e}), serving synonym graph results only")
+    synonym_graph_stats.record(len(expansion.keywords), len(pending))
+    
+    keyword_synonyms = [
+        KeywordSynonym(
+            original_keyword=term,
+            synonyms=synonyms[term],
+            context=contexts.get(term) or f"Alternatives to '{term}'; prefer the wording the job description uses.",
+            ats_impact=expansion.ats_impact.get(term, "medium"),
         )
-    except Exception as e:
-        print(f"Error expanding keyword synonyms: {e}")
-        raise
+        for term in expansion.keywords
+        if synonyms.get(term)
+    ]
+    
+    return KeywordSynonymExpanderOutput(
+        keyword_synonyms=keyword_synonyms,
+        suggested_replacements=expansion.suggested_replacements,
+        keyword_density_analysis=expansion.keyword_density_analysis,
+        recommendations=expansion.recommendations
+    )
 
 # ============================================
 # HIGH-IMPACT FEATURES
 # ============================================
 
-def generate_multi_resume_portfolio(data: MultiResumePortfolioInput) -> MultiResumePortfolioOutput:
-    """
-    Automatically creates multiple resume versions (technical, executive, creative, etc.)
-    from one master resume. Maintains consistency while adapting to different needs.
-    """
-    system_prompt = """
+MULTI_RESUME_PORTFOLIO_PROMPT = prompt_registry.register("multi-resume-portfolio", "1", """
     You are an expert Resume Writer specialized in creating multiple resume variations.
     
     Your task is to generate different versions of a resume, each optimized for:
@@ -1674,7 +2579,36 @@ def generate_multi_resume_portfolio(data: MultiResumePortfolioInput) -> MultiRes
             "unique_elements": {"technical": ["Extended project section"], "executive": ["Leadership metrics"]}
         }
     }
+
+    Requirements:
+    1. Maintain consistency in factual information (dates, companies, roles)
+    2. Adapt style, emphasis, and organization for each version type
+    3. Each version should be complete and ready to use
+    4. Clearly document what makes each version unique
+    5. Ensure all versions are professional and ATS-friendly where appropriate
+    6. Each version's resume_data is a JSON object using the master resume's field names
+    
+    Generate diverse versions that serve different purposes in the job search process.
+    """)
+
+def portfolio_version_text(version: ResumeVersion) -> str:
+    """
+    What sets a portfolio version apart: its name, target, style, summary, section order and
+    key changes. The shared body (experience, education) is left out, because legitimately
+    different versions repeat most of it.
+    """
+    data = version.resume_data if isinstance(version.resume_data, dict) else {}
+    return "\n".join([
+        version.version_name, version.target_role or "", version.industry or "", version.style,
+        str(data.get("summary") or ""), " ".join(data), *version.key_changes,
+    ])
+
+async def generate_multi_resume_portfolio(data: MultiResumePortfolioInput) -> MultiResumePortfolioOutput:
+    """
+    Automatically creates multiple resume versions (technical, executive, creative, etc.)
+    from one master resume. Maintains consistency while adapting to different needs.
     """
+    system_prompt = MULTI_RESUME_PORTFOLIO_PROMPT.content
     
     # Build context for variations needed
     roles_text = f"\nTarget Roles: {', '.join(data.target_roles)}" if data.target_roles else ""
@@ -1686,9 +2620,13 @@ def generate_multi_resume_portfolio(data: MultiResumePortfolioInput) -> MultiRes
         "technical", "executive", "creative", "ats-optimized", "achievement-focused"
     ]
     
+    [master_resume_text] = fit_prompt(
+        "multi-resume-portfolio", system_prompt,
+        PromptSection(encode_for_prompt(data.master_resume_data), priority=1),
+    )
     user_prompt = f"""
-    Master Resume Data:
-    {json.dumps(data.master_resume_data, indent=2)}
+    Master Resume Data ({COMPACT_FORMAT_NOTE}):
+    {master_resume_text}
     
     Generate {data.number_of_versions} different resume versions.
     {roles_text}
@@ -1696,19 +2634,14 @@ def generate_multi_resume_portfolio(data: MultiResumePortfolioInput) -> MultiRes
     {styles_text}
     
     Styles to include: {', '.join(default_styles[:data.number_of_versions])}
-    
-    Requirements:
-    1. Maintain consistency in factual information (dates, companies, roles)
-    2. Adapt style, emphasis, and organization for each version type
-    3. Each version should be complete and ready to use
-    4. Clearly document what makes each version unique
-    5. Ensure all versions are professional and ATS-friendly where appropriate
-    
-    Generate diverse versions that serve different purposes in the job search process.
     """
     
     try:
-        response = create_chat_completion_with_auto_fallback(
+        result_data = await create_json_completion(
+            schema=MultiResumePortfolioOutput,
+            defaults={"master_resume": data.master_resume_data},
+            endpoint="multi-resume-portfolio",
+            priority="batch",
             model=MODEL_NAME,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -1722,29 +2655,27 @@ def generate_multi_resume_portfolio(data: MultiResumePortfolioInput) -> MultiRes
             }
         )
         
-        content = response.choices[0].message.content
-        result_data = json.loads(content)
-        
         versions = [
             ResumeVersion(**v) for v in result_data.get("versions", [])
         ]
+        generated = len(versions)
+        versions, _ = drop_near_duplicates(
+            versions, [portfolio_version_text(v) for v in versions], "multi-resume-portfolio",
+            NEAR_DUPLICATE_PORTFOLIO_THRESHOLD,
+        )
         
         return MultiResumePortfolioOutput(
             master_resume=data.master_resume_data,
             versions=versions,
             usage_guide=result_data.get("usage_guide", {}),
-            differences_summary=result_data.get("differences_summary", {})
+            differences_summary=result_data.get("differences_summary", {}),
+            duplicate_versions_dropped=generated - len(versions)
         )
     except Exception as e:
         print(f"Error generating multi-resume portfolio: {e}")
         raise
 
-def analyze_skill_gaps_with_learning_paths(data: SkillGapAnalyzerInput) -> SkillGapAnalyzerOutput:
-    """
-    Identifies skill gaps for target roles and generates personalized learning paths
-    with courses, certifications, and resources. Provides actionable career development guidance.
-    """
-    system_prompt = """
+ANALYZE_SKILL_GAPS_PROMPT = prompt_registry.register("analyze-skill-gaps", "1", """
     You are an expert Career Development Advisor and Skills Analyst.
     Your goal is to analyze skill gaps and provide actionable learning paths.
     
@@ -1802,19 +2733,7 @@ def analyze_skill_gaps_with_learning_paths(data: SkillGapAnalyzerInput) -> Skill
     - Books and tutorials
     - Practice projects
     - Free and paid options
-    """
-    
-    jd_text = f"\n\nJob Description:\n{data.job_description}" if data.job_description else ""
-    current_skills_text = f"\n\nCurrent Skills (provided): {', '.join(data.current_skills)}" if data.current_skills else ""
-    
-    user_prompt = f"""
-    Resume Text:
-    {data.resume_text}
-    {jd_text}
-    {current_skills_text}
-    
-    Target Role: {data.target_role}
-    
+
     Analyze skill gaps and provide:
     1. Comprehensive list of required skills for this role
     2. Identify gaps (missing skills) and level gaps (insufficient proficiency)
@@ -1825,10 +2744,42 @@ def analyze_skill_gaps_with_learning_paths(data: SkillGapAnalyzerInput) -> Skill
     
     Include realistic learning resources with durations, costs, and providers.
     Focus on actionable, high-quality resources that will actually help close the gaps.
+    """)
+
+async def analyze_skill_gaps_with_learning_paths(data: SkillGapAnalyzerInput) -> SkillGapAnalyzerOutput:
+    """
+    Identifies skill gaps for target roles and generates personalized learning paths
+    with courses, certifications, and resources. Provides actionable career development guidance.
+    """
+    system_prompt = ANALYZE_SKILL_GAPS_PROMPT.content
+    
+    resume_text, job_description = fit_prompt(
+        "analyze-skill-gaps", system_prompt,
+        PromptSection(data.resume_text, priority=2),
+        PromptSection(data.job_description or "", priority=1),
+    )
+    jd_text = f"\n\nJob Description:\n{job_description}" if data.job_description else ""
+    # Skills found in the resume by the taxonomy are certain; the model only adds what it infers
+    detected_skills = [m.skill for m in extract_skills(data.resume_text)]
+    current_skills_text = f"\n\nCurrent Skills (provided): {', '.join(data.current_skills)}" if data.current_skills else ""
+    if detected_skills:
+        current_skills_text += f"\n\nCurrent Skills (found in resume): {', '.join(detected_skills)}"
+    
+    user_prompt = f"""
+    Resume Text:
+    {resume_text}
+    {jd_text}
+    {current_skills_text}
+    
+    Target Role: {data.target_role}
     """
     
     try:
-        response = create_chat_completion_with_auto_fallback(
+        result_data = await create_json_completion(
+            schema=SkillGapAnalyzerOutput,
+            defaults={"overall_readiness_score": 0, "timeline_estimate": "Unknown"},
+            endpoint="analyze-skill-gaps",
+            priority="batch",
             model=MODEL_NAME,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -1842,9 +2793,6 @@ def analyze_skill_gaps_with_learning_paths(data: SkillGapAnalyzerInput) -> Skill
             }
         )
         
-        content = response.choices[0].message.content
-        result_data = json.loads(content)
-        
         required_skills = [
             RequiredSkill(**rs) for rs in result_data.get("required_skills", [])
         ]
@@ -1855,8 +2803,12 @@ def analyze_skill_gaps_with_learning_paths(data: SkillGapAnalyzerInput) -> Skill
                 LearningPath(**lp) for lp in result_data.get("learning_paths", [])
             ]
         
+        current_skills = {}
+        for skill in (data.current_skills or []) + detected_skills + result_data.get("current_skills", []):
+            current_skills.setdefault(skill.lower(), skill)
+        
         return SkillGapAnalyzerOutput(
-            current_skills=result_data.get("current_skills", []),
+            current_skills=list(current_skills.values()),
             required_skills=required_skills,
             skill_gaps=result_data.get("skill_gaps", []),
             skill_level_gaps=result_data.get("skill_level_gaps", {}),
@@ -1870,14 +2822,7 @@ def analyze_skill_gaps_with_learning_paths(data: SkillGapAnalyzerInput) -> Skill
         print(f"Error analyzing skill gaps: {e}")
         raise
 
-def analyze_career_trends(data: CareerTrendAnalyzerInput) -> CareerTrendAnalyzerOutput:
-    """
-    Analyzes industry trends and predicts which skills/roles will be in demand.
-    Provides proactive career guidance based on market trends and suggests resume updates.
-    """
-    from datetime import datetime
-    
-    system_prompt = """
+ANALYZE_CAREER_TRENDS_PROMPT = prompt_registry.register("analyze-career-trends", "1", """
     You are an expert Career Market Analyst and Industry Trend Predictor.
     Your goal is to analyze current job market trends and predict future demand for skills and roles.
     
@@ -1933,12 +2878,35 @@ def analyze_career_trends(data: CareerTrendAnalyzerInput) -> CareerTrendAnalyzer
     
     Provide realistic, data-driven predictions based on current market trends.
     Focus on actionable insights that help users future-proof their careers.
+
+    Analyze career trends and provide:
+    1. Skill trends - which skills are growing/declining in demand
+    2. Role trends - which roles are hot/declining
+    3. Resume recommendations - how to future-proof the resume
+    4. Market insights - general trends affecting the industry
+    5. Action plan - specific steps to stay competitive
+    
+    Base predictions on realistic market analysis and current industry trends.
+    Provide actionable recommendations that help the user prepare for future job market changes.
+    """)
+
+async def analyze_career_trends(data: CareerTrendAnalyzerInput) -> CareerTrendAnalyzerOutput:
+    """
+    Analyzes industry trends and predicts which skills/roles will be in demand.
+    Provides proactive career guidance based on market trends and suggests resume updates.
     """
+    from datetime import datetime
+    
+    system_prompt = ANALYZE_CAREER_TRENDS_PROMPT.content
     
     industry_text = f"\nIndustry: {data.industry}" if data.industry else ""
     exp_text = f"\nYears of Experience: {data.years_of_experience}" if data.years_of_experience else ""
     target_roles_text = f"\nTarget Roles: {', '.join(data.target_roles)}" if data.target_roles else ""
     
+    [resume_text] = fit_prompt(
+        "analyze-career-trends", system_prompt,
+        PromptSection(data.resume_text, priority=1),
+    )
     user_prompt = f"""
     Current Role: {data.current_role}
     {industry_text}
@@ -1947,21 +2915,20 @@ def analyze_career_trends(data: CareerTrendAnalyzerInput) -> CareerTrendAnalyzer
     Prediction Period: Next {data.prediction_months} months
     
     Resume:
-    {data.resume_text}
-    
-    Analyze career trends and provide:
-    1. Skill trends - which skills are growing/declining in demand
-    2. Role trends - which roles are hot/declining
-    3. Resume recommendations - how to future-proof the resume
-    4. Market insights - general trends affecting the industry
-    5. Action plan - specific steps to stay competitive
-    
-    Base predictions on realistic market analysis and current industry trends.
-    Provide actionable recommendations that help the user prepare for future job market changes.
+    {resume_text}
     """
     
     try:
-        response = create_chat_completion_with_auto_fallback(
+        result_data = await create_json_completion(
+            schema=CareerTrendAnalyzerOutput,
+            defaults={
+                "industry": data.industry or "General",
+                "analysis_date": datetime.now().strftime("%Y-%m-%d"),
+                "prediction_period": f"Next {data.prediction_months} months",
+                "future_proof_score": 50,
+            },
+            endpoint="analyze-career-trends",
+            priority="batch",
             model=MODEL_NAME,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -1975,9 +2942,6 @@ def analyze_career_trends(data: CareerTrendAnalyzerInput) -> CareerTrendAnalyzer
             }
         )
         
-        content = response.choices[0].message.content
-        result_data = json.loads(content)
-        
         # Parse nested structures
         skill_trends = [
             SkillTrend(**st) for st in result_data.get("skill_trends", [])
@@ -2011,14 +2975,7 @@ def analyze_career_trends(data: CareerTrendAnalyzerInput) -> CareerTrendAnalyzer
         print(f"Error analyzing career trends: {e}")
         raise
 
-def simulate_salary_negotiation(data: SalaryNegotiationInput) -> SalaryNegotiationOutput:
-    """
-    Simulates salary negotiation conversations to help users prepare.
-    Generates realistic negotiation scenarios and provides practice conversations.
-    """
-    from datetime import datetime
-    
-    system_prompt = """
+SALARY_NEGOTIATION_PROMPT = prompt_registry.register("salary-negotiation", "1", """
     You are an expert Salary Negotiation Coach and Career Advisor.
     Your goal is to help candidates practice salary negotiations through realistic simulations.
     
@@ -2068,7 +3025,27 @@ def simulate_salary_negotiation(data: SalaryNegotiationInput) -> SalaryNegotiati
     }
     
     Make conversations realistic and educational. Provide actionable advice.
+
+    Generate a realistic salary negotiation simulation:
+    1. Create a conversation flow (5-8 exchanges) between recruiter and candidate
+    2. Include multiple negotiation scripts for different scenarios
+    3. Provide market-based salary benchmarks for this role
+    4. Offer negotiation tips and strategies
+    5. Highlight common mistakes to avoid
+    6. Suggest power phrases that strengthen negotiation position
+    
+    Make the conversation realistic - include pushback, counter-offers, and resolution.
+    Base salary suggestions on realistic market data for the role and experience level.
+    """)
+
+async def simulate_salary_negotiation(data: SalaryNegotiationInput) -> SalaryNegotiationOutput:
+    """
+    Simulates salary negotiation conversations to help users prepare.
+    Generates realistic negotiation scenarios and provides practice conversations.
     """
+    from datetime import datetime
+    
+    system_prompt = SALARY_NEGOTIATION_PROMPT.content
     
     context_parts = []
     if data.current_salary:
@@ -2085,7 +3062,11 @@ def simulate_salary_negotiation(data: SalaryNegotiationInput) -> SalaryNegotiati
         context_parts.append(f"Scenario: {data.negotiation_scenario}")
     
     context_text = "\n".join(context_parts) if context_parts else "General negotiation scenario"
-    jd_text = f"\n\nJob Description:\n{data.job_description}" if data.job_description else ""
+    [job_description] = fit_prompt(
+        "salary-negotiation", system_prompt,
+        PromptSection(data.job_description or "", priority=1),
+    )
+    jd_text = f"\n\nJob Description:\n{job_description}" if data.job_description else ""
     
     user_prompt = f"""
     Target Role: {data.target_role}
@@ -2094,21 +3075,13 @@ def simulate_salary_negotiation(data: SalaryNegotiationInput) -> SalaryNegotiati
     
     Resume:
     {data.resume_text[:1000]}...
-    
-    Generate a realistic salary negotiation simulation:
-    1. Create a conversation flow (5-8 exchanges) between recruiter and candidate
-    2. Include multiple negotiation scripts for different scenarios
-    3. Provide market-based salary benchmarks for this role
-    4. Offer negotiation tips and strategies
-    5. Highlight common mistakes to avoid
-    6. Suggest power phrases that strengthen negotiation position
-    
-    Make the conversation realistic - include pushback, counter-offers, and resolution.
-    Base salary suggestions on realistic market data for the role and experience level.
     """
     
     try:
-        response = create_chat_completion_with_auto_fallback(
+        result_data = await create_json_completion(
+            schema=SalaryNegotiationOutput,
+            endpoint="salary-negotiation",
+            priority="batch",
             model=MODEL_NAME,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -2122,9 +3095,6 @@ def simulate_salary_negotiation(data: SalaryNegotiationInput) -> SalaryNegotiati
             }
         )
         
-        content = response.choices[0].message.content
-        result_data = json.loads(content)
-        
         # Parse nested structures
         conversation = [
             NegotiationMessage(**msg) for msg in result_data.get("negotiation_conversation", [])
@@ -0,0 +1,95 @@
+# backend/services/disconnect.py
+import time
+import asyncio
+from typing import Awaitable, Dict
+from fastapi import HTTPException, Request
+from services.latency_tracker import llm_latency_tracker
+
+# Non-standard status (nginx convention) logged for requests the client abandoned
+CLIENT_CLOSED_REQUEST = 499
+
+class _EndpointCounters:
+    def __init__(self):
+        self.requests = 0
+        self.disconnects = 0
+        self.seconds_in_flight = 0.0
+        self.estimated_seconds_saved = 0.0
+
+class DisconnectStats:
+    """
+    Per-endpoint counters for requests cancelled because the client went away.
+
+    estimated_seconds_saved is the endpoint's median upstream latency minus the time the
+    request had already run, i.e. the generation we didn't wait for (and didn't pay for).
+    """
+
+    def __init__(self):
+        self._endpoints: Dict[str, _EndpointCounters] = {}
+
+    def _counters(self, endpoint: str) -> _EndpointCounters:
+        counters = self._endpoints.get(endpoint)
+        if counters is None:
+            counters = _EndpointCounters()
+            self._endpoints[endpoint] = counters
+        return counters
+
+    def record_request(self, endpoint: str) -> None:
+        self._counters(endpoint).requests += 1
+
+    def record_disconnect(self, endpoint: str, elapsed: float) -> None:
+        counters = self._counters(endpoint)
+        counters.disconnects += 1
+        counters.seconds_in_flight += elapsed
+        p50 = llm_latency_tracker.percentile(endpoint, 50)
+        if p50 is not None:
+            counters.estimated_seconds_saved += max(0.0, p50 - elapsed)
+
+    def stats(self) -> dict:
+        return {
+            endpoint: {
+                "requests": c.requests,
+                "disconnects": c.disconnects,
+                "disconnect_rate": round(c.disconnects / c.requests, 4) if c.requests else 0.0,
+                "seconds_in_flight_at_disconnect": round(c.seconds_in_flight, 2),
+                "estimated_seconds_saved": round(c.estimated_seconds_saved, 2),
+            }
+            for endpoint, c in self._endpoints.items()
+        }
+
+disconnect_stats = DisconnectStats()
+
+async def wait_for_disconnect(request: Request) -> None:
+    """
+    Return once the client has closed the connection.
+    Route handlers run after the body has been read, so the next ASGI message is the disconnect.
+    """
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+async def run_until_disconnected(request: Request, endpoint: str, work: Awaitable):
+    """
+    Await `work`, cancelling it if the client disconnects first.
+
+    Cancellation propagates through the whole LLM dispatch path: pending retries, backoff
+    sleeps, hedges and fallbacks stop, the scheduler slot is released and the upstream HTTP
+    request is closed. A coalesced call keeps running while other callers still wait on it.
+    """
+    disconnect_stats.record_request(endpoint)
+    started = time.monotonic()
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.ensure_future(wait_for_disconnect(request))
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        if task.done():
+            return task.result()
+        task.cancel()
+        elapsed = time.monotonic() - started
+        disconnect_stats.record_disconnect(endpoint, elapsed)
+        print(f"✂ Client disconnected from {endpoint} after {elapsed:.1f}s, cancelled upstream work")
+        raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="Client closed request")
+    finally:
+        watcher.cancel()
+        if not task.done():
+            task.cancel()
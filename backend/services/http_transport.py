@@ -0,0 +1,176 @@
+# backend/services/http_transport.py
+import os
+import time
+import asyncio
+import importlib.util
+from typing import Optional
+import httpx
+from services.latency_tracker import LatencyTracker
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+# HTTP/2 needs the optional h2 package; without it httpx silently can't negotiate h2
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Connection-level phases reported by httpcore's trace hook that we time
+TRACED_PHASES = {
+    "connection.connect_tcp": "connect_tcp",
+    "connection.start_tls": "start_tls",
+}
+
+def capped_timeout(timeout, remaining: float) -> httpx.Timeout:
+    """
+    The per-phase timeout with every phase capped at the remaining request budget, so a
+    deadline shortens slow reads without lifting the fail-fast connect and pool limits.
+    `timeout` is an httpx.Timeout, a number of seconds, or None for no limit.
+    """
+    if not isinstance(timeout, httpx.Timeout):
+        timeout = httpx.Timeout(timeout)
+    remaining = max(0.1, remaining)
+
+    def cap(seconds: Optional[float]) -> float:
+        return remaining if seconds is None else min(seconds, remaining)
+
+    return httpx.Timeout(
+        connect=cap(timeout.connect),
+        read=cap(timeout.read),
+        write=cap(timeout.write),
+        pool=cap(timeout.pool),
+    )
+
+class PooledTransport:
+    """
+    Process-wide HTTP connection pool for upstream LLM calls.
+
+    Every upstream request shares one keep-alive pool with explicit limits, so TCP and TLS
+    setup is paid once per connection instead of showing up in request latency. With HTTP/2
+    concurrent completions multiplex over a single connection. Timeouts are set per phase:
+    connect and pool waits fail fast, reads allow for slow generations.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 120,
+        connect_timeout: float = 5,
+        read_timeout: float = 120,
+        write_timeout: float = 30,
+        pool_timeout: float = 10,
+        http2: bool = True,
+    ):
+        if http2 and not HTTP2_AVAILABLE:
+            print("⚠ HTTP/2 requested for upstream calls but the h2 package is not installed, using HTTP/1.1")
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(
+            connect=connect_timeout,
+            read=read_timeout,
+            write=write_timeout,
+            pool=pool_timeout,
+        )
+        self.requests = 0
+        self.connections_opened = 0
+        self.warmed_up_at: Optional[float] = None
+        self.phase_times = LatencyTracker(window_size=200, min_samples=1)
+        self.async_client = httpx.AsyncClient(
+            http2=self.http2,
+            follow_redirects=True,
+            limits=self.limits,
+            timeout=self.timeout,
+            event_hooks={"request": [self._on_request]},
+        )
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        self.requests += 1
+        request.extensions["trace"] = self._make_trace()
+
+    def _make_trace(self):
+        started = {}
+
+        async def trace(event: str, info: dict) -> None:
+            name, _, stage = event.rpartition(".")
+            phase = TRACED_PHASES.get(name)
+            if phase is None:
+                return
+            if stage == "started":
+                started[phase] = time.monotonic()
+            elif stage == "complete" and phase in started:
+                self.phase_times.record(phase, time.monotonic() - started.pop(phase))
+                if phase == "connect_tcp":
+                    self.connections_opened += 1
+
+        return trace
+
+    async def warm_up(self, url: str = OPENROUTER_BASE_URL, connections: int = 1) -> None:
+        """
+        Open connections to the upstream ahead of the first real request.
+
+        Any response, even an error status, leaves a TLS-established connection in the pool.
+        Over HTTP/2 one connection is enough; over HTTP/1.1 each concurrent probe opens its own.
+        """
+        started = time.monotonic()
+        results = await asyncio.gather(
+            *(self.async_client.head(url) for _ in range(max(1, connections))),
+            return_exceptions=True,
+        )
+        errors = [r for r in results if isinstance(r, Exception)]
+        if errors:
+            print(f"⚠ Upstream connection warm-up failed: {errors[0]}")
+            return
+        self.warmed_up_at = time.time()
+        print(f"✓ Warmed up {len(results)} upstream connection(s) in {time.monotonic() - started:.2f}s")
+
+    async def aclose(self) -> None:
+        await self.async_client.aclose()
+
+    def stats(self) -> dict:
+        # httpx doesn't expose pool state publicly; read it from the underlying httpcore pool
+        pool = getattr(getattr(self.async_client, "_transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+        infos = [connection.info() for connection in connections]
+        phases = self.phase_times.stats()
+        return {
+            "http2_enabled": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry_seconds": self.limits.keepalive_expiry,
+            "timeouts_seconds": {
+                "connect": self.timeout.connect,
+                "read": self.timeout.read,
+                "write": self.timeout.write,
+                "pool": self.timeout.pool,
+            },
+            "connections": len(connections),
+            "active_connections": sum(1 for c in connections if not c.is_idle()),
+            "idle_connections": sum(1 for c in connections if c.is_idle()),
+            "http2_connections": sum(1 for info in infos if "HTTP/2" in info),
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "requests_per_connection": round(self.requests / self.connections_opened, 2) if self.connections_opened else None,
+            "connect_seconds": phases.get("connect_tcp"),
+            "tls_seconds": phases.get("start_tls"),
+            "warmed_up": self.warmed_up_at is not None,
+        }
+
+def _env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() not in ("0", "false", "no")
+
+# Process-wide pool for OpenRouter, configured through OPENROUTER_HTTP_* environment variables
+OPENROUTER_WARMUP_ENABLED = _env_flag("OPENROUTER_HTTP_WARMUP", "true")
+OPENROUTER_WARMUP_CONNECTIONS = int(os.getenv("OPENROUTER_HTTP_WARMUP_CONNECTIONS", "1"))
+
+openrouter_transport = PooledTransport(
+    max_connections=int(os.getenv("OPENROUTER_HTTP_MAX_CONNECTIONS", "100")),
+    max_keepalive_connections=int(os.getenv("OPENROUTER_HTTP_MAX_KEEPALIVE", "20")),
+    keepalive_expiry=float(os.getenv("OPENROUTER_HTTP_KEEPALIVE_EXPIRY_SECONDS", "120")),
+    connect_timeout=float(os.getenv("OPENROUTER_HTTP_CONNECT_TIMEOUT", "5")),
+    read_timeout=float(os.getenv("OPENROUTER_HTTP_READ_TIMEOUT", "120")),
+    write_timeout=float(os.getenv("OPENROUTER_HTTP_WRITE_TIMEOUT", "30")),
+    pool_timeout=float(os.getenv("OPENROUTER_HTTP_POOL_TIMEOUT", "10")),
+    http2=_env_flag("OPENROUTER_HTTP2", "true"),
+)
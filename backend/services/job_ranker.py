@@ -0,0 +1,154 @@
+# backend/services/job_ranker.py
+from collections import Counter
+from typing import Dict, List, NamedTuple, Tuple
+import numpy as np
+from scipy import sparse
+from services.keyword_matcher import KNOWN_SKILLS, SKILL_SYNONYMS, STOP_WORDS, canonical, listed_skills, tokenize
+
+MAX_BATCH_JOBS = 1000
+
+# BM25 term-frequency saturation and length normalisation
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Known skills count this much more than plain words, in both similarity and coverage
+SKILL_BOOST = 3.0
+# match_score = 100 * (SIMILARITY_WEIGHT * cosine similarity + COVERAGE_WEIGHT * keyword coverage)
+SIMILARITY_WEIGHT = 0.4
+COVERAGE_WEIGHT = 0.6
+KEYWORDS_PER_JOB = 15
+
+# Multi-word skills and aliases, keyed by their first word, longest first
+_PHRASES: Dict[str, List[Tuple[str, ...]]] = {}
+for _phrase in sorted({p for p in list(KNOWN_SKILLS) + list(SKILL_SYNONYMS) if " " in p}, key=lambda p: -len(p.split())):
+    _words = tuple(_phrase.split())
+    _PHRASES.setdefault(_words[0], []).append(_words)
+
+class RankedJob(NamedTuple):
+    index: int  # Position in the input list
+    match_score: int
+    similarity: float
+    keyword_coverage: float
+    matched_keywords: List[str]
+    missing_keywords: List[str]
+    skill_gaps: List[str]
+
+def _match_phrase(tokens: List[str], i: int) -> Tuple[str, ...]:
+    for words in _PHRASES.get(tokens[i], ()):
+        if tuple(tokens[i:i + len(words)]) == words:
+            return words
+    return ()
+
+def analyze_terms(text: str) -> List[str]:
+    """
+    Index terms of a document: canonical skills (multi-word ones kept whole, aliases mapped)
+    and content words, in order, then the skills only named inside skill lists ("Python,
+    Go"). Cheaper than keyword_matcher.term_set because only words that can start a known
+    phrase look ahead.
+    """
+    tokens = tokenize(text)
+    terms = []
+    i = 0
+    while i < len(tokens):
+        phrase = _match_phrase(tokens, i)
+        if phrase:
+            terms.append(canonical(" ".join(phrase)))
+            i += len(phrase)
+            continue
+        term = canonical(tokens[i])
+        i += 1
+        if term in KNOWN_SKILLS or (term not in STOP_WORDS and len(term) > 1 and any(c.isalpha() for c in term)):
+            terms.append(term)
+    terms.extend(listed_skills(text))
+    return terms
+
+def _term_matrix(docs: List[List[str]]) -> Tuple[sparse.csr_matrix, List[str]]:
+    vocabulary: Dict[str, int] = {}
+    indptr = [0]
+    indices: List[int] = []
+    counts: List[int] = []
+    for terms in docs:
+        for term, count in Counter(terms).items():
+            indices.append(vocabulary.setdefault(term, len(vocabulary)))
+            counts.append(count)
+        indptr.append(len(indices))
+    matrix = sparse.csr_matrix(
+        (np.array(counts, dtype=np.float64), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+        shape=(len(docs), len(vocabulary)),
+    )
+    return matrix, list(vocabulary)
+
+def _bm25_weights(counts: sparse.csr_matrix, term_boost: np.ndarray) -> sparse.csr_matrix:
+    """
+    BM25 term weights per document: saturated, length-normalised term frequency times IDF
+    (and the skill boost).
+    """
+    doc_lengths = np.asarray(counts.sum(axis=1)).ravel()
+    avg_length = doc_lengths.mean() or 1.0
+    row_lengths = np.repeat(doc_lengths, np.diff(counts.indptr))
+    tf = counts.data
+    saturated = tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * row_lengths / avg_length))
+
+    n_docs = counts.shape[0]
+    df = np.bincount(counts.indices, minlength=counts.shape[1])
+    idf = np.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+    weights = counts.copy()
+    weights.data = saturated * (idf * term_boost)[counts.indices]
+    return weights
+
+def _row_normalize(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1 / norms) @ matrix
+
+def rank_jobs(resume_text: str, job_descriptions: List[str], keywords_per_job: int = KEYWORDS_PER_JOB) -> List[RankedJob]:
+    """
+    Score one resume against many job descriptions in one vectorised pass and return them
+    best first.
+
+    The resume and the JDs are indexed together into a sparse term matrix with BM25 weights.
+    Similarity is the cosine between the resume's row and each JD's row; keyword coverage
+    is the weighted share of a JD's terms the resume contains (a sparse mat-vec with the
+    resume's term indicator). Each JD's top terms give its matched/missing keyword lists.
+    """
+    if not job_descriptions:
+        return []
+    docs = [analyze_terms(resume_text)] + [analyze_terms(jd) for jd in job_descriptions]
+    counts, vocabulary = _term_matrix(docs)
+    term_boost = np.array([SKILL_BOOST if term in KNOWN_SKILLS else 1.0 for term in vocabulary])
+    is_skill = term_boost > 1.0
+    weights = _bm25_weights(counts, term_boost)
+
+    normalized = _row_normalize(weights)
+    resume_vector = normalized[0].T
+    jobs = normalized[1:]
+    similarity = np.asarray((jobs @ resume_vector).todense()).ravel()
+
+    job_weights = weights[1:]
+    in_resume = np.zeros(len(vocabulary))
+    in_resume[counts[0].indices] = 1.0
+    totals = np.asarray(job_weights.sum(axis=1)).ravel()
+    covered = job_weights @ in_resume
+    coverage = np.divide(covered, totals, out=np.zeros_like(covered), where=totals > 0)
+
+    scores = 100 * (SIMILARITY_WEIGHT * similarity + COVERAGE_WEIGHT * coverage)
+    order = np.argsort(-scores, kind="stable")
+
+    ranked = []
+    for row in order:
+        start, end = job_weights.indptr[row], job_weights.indptr[row + 1]
+        row_terms = job_weights.indices[start:end]
+        row_weights = job_weights.data[start:end]
+        top = row_terms[np.argsort(-row_weights, kind="stable")[:keywords_per_job]]
+        matched = [vocabulary[t] for t in top if in_resume[t]]
+        missing = [vocabulary[t] for t in top if not in_resume[t]]
+        ranked.append(RankedJob(
+            index=int(row),
+            match_score=int(round(scores[row])),
+            similarity=round(float(similarity[row]), 4),
+            keyword_coverage=round(float(coverage[row]), 4),
+            matched_keywords=matched,
+            missing_keywords=missing,
+            skill_gaps=[vocabulary[t] for t in top if is_skill[t] and not in_resume[t]],
+        ))
+    return ranked
@@ -0,0 +1,326 @@
+# backend/services/json_repair.py
+import json
+import re
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple, Type, Union, get_args, get_origin
+from pydantic import BaseModel, ValidationError
+
+_CLOSERS = {"{": "}", "[": "]"}
+_FENCE = re.compile(r"```[a-zA-Z]*\s*\n?")
+_NUMBER = re.compile(r"-?\d+(\.\d+)?")
+
+class JSONRepairError(ValueError):
+    """
+    Model output that can't be turned into the expected JSON, even after repair.
+    """
+
+class JSONSchemaMismatch(JSONRepairError):
+    """
+    The output is JSON, but even after coercion it doesn't validate against the schema.
+    """
+
+def strip_code_fences(text: str) -> str:
+    """
+    The body of the first ``` / ```json block if the text has one (an unterminated block
+    runs to the end), otherwise the text unchanged.
+    """
+    match = _FENCE.search(text)
+    if not match:
+        return text
+    end = text.find("```", match.end())
+    return text[match.end():end if end != -1 else len(text)]
+
+class IncrementalJSONParser:
+    """
+    Tracks the structure of a JSON document that arrives in chunks (strings, escapes and
+    open containers), so that at any point the text seen so far can be closed into a
+    parseable document without rescanning it.
+
+    Leading prose and code fences before the first { or [ are skipped, and anything after
+    the top-level value is complete is ignored.
+    """
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._length = 0
+        self._started = False
+        self._complete = False
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        # Position and open containers at the last top-of-container comma or opener, where
+        # the document can be cut if the value after it is incomplete
+        self._safe_point: Tuple[int, List[str]] = (0, [])
+
+    @property
+    def complete(self) -> bool:
+        return self._complete
+
+    @property
+    def depth(self) -> int:
+        """
+        Containers open at the current position (1 inside the top-level object).
+        """
+        return len(self._stack)
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def feed(self, chunk: str) -> None:
+        if self._complete:
+            return
+        kept = []
+        for ch in chunk:
+            if not self._started:
+                if ch not in "{[":
+                    continue
+                self._started = True
+            kept.append(ch)
+            position = self._length + len(kept)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._stack.append(ch)
+                self._safe_point = (position, list(self._stack))
+            elif ch in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if not self._stack:
+                    self._complete = True
+                    break
+            elif ch == ",":
+                self._safe_point = (position - 1, list(self._stack))
+        self._parts.append("".join(kept))
+        self._length += len(kept)
+
+    def _close(self, text: str, stack: List[str]) -> str:
+        return text + "".join(_CLOSERS[c] for c in reversed(stack))
+
+    def candidates(self) -> List[str]:
+        """
+        Closed versions of the text so far, most complete first.
+        """
+        text = self.text
+        if not self._started:
+            return []
+        if self._complete:
+            return [text]
+        head = text
+        if self._in_string:
+            # Drop a dangling backslash so the closing quote isn't escaped
+            head = head[:-1] if self._escape else head
+            head += '"'
+        head = head.rstrip()
+        if head.endswith(","):
+            head = head[:-1]
+        elif head.endswith(":"):
+            head += " null"
+        cut, stack = self._safe_point
+        return [self._close(head, self._stack), self._close(text[:cut].rstrip().rstrip(","), stack)]
+
+    def snapshot(self) -> Optional[Any]:
+        """
+        Best-effort parse of the document so far, or None if nothing parseable has arrived.
+        """
+        for candidate in self.candidates():
+            try:
+                return json.loads(_remove_trailing_commas(candidate))
+            except json.JSONDecodeError:
+                continue
+        return None
+
+def _remove_trailing_commas(text: str) -> str:
+    if "," not in text:
+        return text
+    out = []
+    in_string = escape = False
+    for ch in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "}]":
+            # Drop a comma (and the whitespace after it) right before a closer
+            i = len(out) - 1
+            while i >= 0 and out[i].isspace():
+                i -= 1
+            if i >= 0 and out[i] == ",":
+                del out[i:]
+        out.append(ch)
+    return "".join(out)
+
+def parse_json_output(text: str, parser: Optional[IncrementalJSONParser] = None) -> Tuple[Any, bool]:
+    """
+    Parse model output as JSON, repairing it when needed: code fences and surrounding prose
+    are stripped, trailing commas removed and truncated output closed (an unfinished trailing
+    value is dropped). Returns (value, repaired) or raises JSONRepairError.
+
+    Streaming callers pass the parser they fed while the text arrived, so repair doesn't
+    rescan the output.
+    """
+    if not text or not text.strip():
+        raise JSONRepairError("empty response")
+    try:
+        return json.loads(text), False
+    except json.JSONDecodeError:
+        pass
+    if parser is None:
+        parser = IncrementalJSONParser()
+        parser.feed(strip_code_fences(text))
+    value = parser.snapshot()
+    if value is None:
+        raise JSONRepairError(f"no JSON object found in response: {text[:200]!r}")
+    return value, True
+
+def _unwrap_optional(annotation) -> Tuple[Any, bool]:
+    if get_origin(annotation) is Union:
+        args = [a for a in get_args(annotation) if a is not type(None)]
+        if len(args) == 1:
+            return args[0], True
+    return annotation, False
+
+def _is_model(annotation) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+def _coerce_value(value: Any, annotation) -> Any:
+    annotation, _ = _unwrap_optional(annotation)
+    origin = get_origin(annotation)
+    if origin in (list, List):
+        if isinstance(value, str):
+            # Stringified arrays: '["a", "b"]', or a single item
+            try:
+                parsed = json.loads(value)
+                value = parsed if isinstance(parsed, list) else [value]
+            except json.JSONDecodeError:
+                value = [value] if value.strip() else []
+        elif isinstance(value, dict):
+            value = [value]
+        if isinstance(value, list):
+            (item_type,) = get_args(annotation) or (Any,)
+            return [_coerce_value(v, item_type) for v in value]
+        return value
+    if annotation is dict or origin in (dict, Dict):
+        if isinstance(value, str):
+            try:
+                parsed = json.loads(value)
+                return parsed if isinstance(parsed, dict) else value
+            except json.JSONDecodeError:
+                return value
+        return value
+    if _is_model(annotation):
+        return coerce_to_schema(value, annotation) if isinstance(value, dict) else value
+    if annotation in (int, float) and isinstance(value, str):
+        # "75%", "8/10", "~120" -> the leading number
+        match = _NUMBER.search(value)
+        if match:
+            number = float(match.group())
+            return int(round(number)) if annotation is int else number
+    if annotation is int and isinstance(value, float):
+        return int(round(value))
+    if annotation is str and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return value
+
+def coerce_to_schema(data: dict, schema: Type[BaseModel]) -> dict:
+    """
+    Nudge a parsed response towards `schema`: stringified arrays/objects are parsed, single
+    items wrapped in lists, numeric strings turned into numbers, and missing list, dict and
+    optional fields filled with empty values. Nested models are coerced recursively.
+    Missing required scalars are left missing so validation can reject the response.
+    """
+    coerced = dict(data)
+    for name, field in schema.model_fields.items():
+        annotation, optional = _unwrap_optional(field.annotation)
+        value = coerced.get(name)
+        if value is None:
+            if not field.is_required():
+                continue
+            if get_origin(annotation) in (list, List):
+                coerced[name] = []
+            elif annotation is dict or get_origin(annotation) in (dict, Dict):
+                coerced[name] = {}
+            elif optional:
+                coerced[name] = None
+            continue
+        coerced[name] = _coerce_value(value, field.annotation)
+    return coerced
+
+def parse_model_output(
+    text: str,
+    schema: Optional[Type[BaseModel]] = None,
+    defaults: Optional[dict] = None,
+    parser: Optional[IncrementalJSONParser] = None,
+) -> Tuple[dict, bool]:
+    """
+    Parse, repair and coerce a JSON-mode completion, then validate it against `schema`.
+
+    `defaults` are fields the caller supplies itself (e.g. echoed inputs) and are only used
+    for validation. Returns (data, repaired); raises JSONRepairError when the response can't
+    be repaired into something the schema accepts.
+    """
+    data, repaired = parse_json_output(text, parser)
+    if not isinstance(data, dict):
+        raise JSONSchemaMismatch(f"expected a JSON object, got {type(data).__name__}")
+    if schema is None:
+        return data, repaired
+    coerced = coerce_to_schema(data, schema)
+    try:
+        schema.model_validate({**(defaults or {}), **coerced})
+    except ValidationError as e:
+        # Malformed optional fields are dropped rather than costing a retry
+        invalid = {err["loc"][0] for err in e.errors() if err["loc"]}
+        optional = {name for name in invalid if name in schema.model_fields and not schema.model_fields[name].is_required()}
+        if not optional or optional != invalid:
+            raise JSONSchemaMismatch(f"response does not match {schema.__name__}: {e.errors()[:3]}") from e
+        for name in optional:
+            coerced.pop(name, None)
+    return coerced, repaired or coerced != data
+
+class JSONRepairStats:
+    """
+    Per-endpoint outcomes of parsing JSON-mode completions: clean, repaired, unrepairable
+    (retried or failed), and upstream calls per successful response.
+    """
+
+    def __init__(self):
+        self._endpoints = defaultdict(lambda: {"upstream_calls": 0, "successes": 0, "clean": 0, "repaired": 0, "unrepairable": 0, "fallbacks": 0})
+
+    def record_call(self, endpoint: str) -> None:
+        self._endpoints[endpoint]["upstream_calls"] += 1
+
+    def record_parse(self, endpoint: str, repaired: bool) -> None:
+        counters = self._endpoints[endpoint]
+        counters["successes"] += 1
+        counters["repaired" if repaired else "clean"] += 1
+
+    def record_unrepairable(self, endpoint: str) -> None:
+        self._endpoints[endpoint]["unrepairable"] += 1
+
+    def record_fallback(self, endpoint: str) -> None:
+        counters = self._endpoints[endpoint]
+        counters["successes"] += 1
+        counters["fallbacks"] += 1
+
+    def stats(self) -> dict:
+        return {
+            endpoint: {
+                **c,
+                "upstream_calls_per_success": round(c["upstream_calls"] / c["successes"], 3) if c["successes"] else None,
+            }
+            for endpoint, c in self._endpoints.items()
+        }
+
+json_repair_stats = JSONRepairStats()
@@ -0,0 +1,218 @@
+# backend/services/keyword_matcher.py
+import math
+import re
+from collections import Counter
+from typing import Dict, List, NamedTuple, Set, Tuple
+from services.skill_taxonomy import normalize, skill_taxonomy
+
+# Common English function words plus job-posting boilerplate that never makes a useful keyword
+STOP_WORDS = frozenset("""
+a about above across after again against all almost also am among an and any are as at be because been
+before being below between both but by can could did do does doing down during each either else etc ever
+every few for from further had has have having he her here hers herself him himself his how however i if
+in into is it its itself just least less like may me might more most much must my myself near need needs
+no nor not of off often on once one only or other others our ours ourselves out over own per please
+rather same shall she should since so some such than that the their theirs them themselves then there
+these they this those though through thus to too under until up upon us very via was we well were what
+when where whether which while who whom whose why will with within without would yet you your yours
+yourself yourselves
+ability able across added advantage applicant applicants apply based best bonus candidate candidates
+closely company day days degree demonstrated desired duties equivalent excellent experience experienced
+familiarity familiar field good great help ideal ideally including job join knowledge looking new
+opportunity plus position preferred proven qualifications related required requirements responsibilities
+responsible role seeking skills solid strong successful team teams understanding using work working
+year years
+build building create creating deliver delivering design designing develop developing drive driving
+ensure manage managing nice provide providing support supporting
+""".split())
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+# Sentence and list boundaries: n-grams never span these
+_BOUNDARY = re.compile(r"[\n;:•·()\[\]|!?]|[.,](?=\s|$)")
+MAX_NGRAM = 3
+
+# Weights: known skills dominate, then phrases, then plain words; terms on requirement
+# lines count extra
+SKILL_WEIGHT = 3.0
+PHRASE_WEIGHT = 1.5
+WORD_WEIGHT = 1.0
+REQUIRED_LINE_BOOST = 1.5
+_REQUIRED_LINE = re.compile(r"\b(require[ds]?|must|minimum|essential|mandatory|need to have)\b", re.I)
+MAX_KEYWORDS = 40
+
+class KeywordMatch(NamedTuple):
+    match_score: int
+    matched_keywords: List[str]
+    missing_keywords: List[str]
+    skill_gaps: List[str]
+    weights: Dict[str, float]
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased tokens that keep tech spellings intact (c++, c#, node.js, ci/cd, scikit-learn).
+    """
+    return [t.rstrip(".-/") for t in _TOKEN.findall(text.lower())]
+
+def _segments(text: str) -> List[List[str]]:
+    return [tokens for tokens in (tokenize(part) for part in _BOUNDARY.split(text)) if tokens]
+
+def _skill_tables() -> Tuple[Dict[str, str], Set[str], Dict[str, str]]:
+    """
+    Alias -> canonical term, the canonical terms, and list-only name -> canonical term, all
+    from the skill taxonomy. A skill's canonical term is its first pattern that survives
+    tokenizing unchanged (".net" doesn't: it would map every "net"), so list-only names like
+    "go" or "react" never become terms on their own and "golang" / "react.js" stand in.
+    """
+    synonyms: Dict[str, str] = {}
+    known: Set[str] = set()
+    listed: Dict[str, str] = {}
+    for name, patterns in skill_taxonomy.aliases().items():
+        terms = [p for p in patterns if " ".join(tokenize(p)) == p]
+        if not terms:
+            continue
+        known.add(terms[0])
+        synonyms.update((alias, terms[0]) for alias in terms[1:])
+        if normalize(name) not in patterns:
+            listed[normalize(name)] = terms[0]
+    return synonyms, known, listed
+
+# Alias -> canonical skill, built from data/skill_taxonomy.json. Matching happens on
+# canonical forms, so "k8s" in a resume covers "Kubernetes" in a job description.
+# KNOWN_SKILLS are the canonical skills recognised as "hard" skills (they become skill_gaps
+# when missing).
+SKILL_SYNONYMS, KNOWN_SKILLS, _LISTED_NAMES = _skill_tables()
+_NAME_OF_LISTED = {term: name for name, term in _LISTED_NAMES.items()}
+
+def canonical(term: str) -> str:
+    return SKILL_SYNONYMS.get(term, term)
+
+def listed_skills(text: str) -> List[str]:
+    """
+    Canonical terms of skills whose names are everyday words ("Go", "Swift") that `text`
+    names inside a list of other skills, where the taxonomy counts them.
+    """
+    found = []
+    for match in skill_taxonomy.extract(text):
+        found.extend(_LISTED_NAMES[t] for t in match.matched_terms if t in _LISTED_NAMES)
+    return list(dict.fromkeys(found))
+
+def _ngrams(tokens: List[str], max_n: int = MAX_NGRAM):
+    for n in range(1, max_n + 1):
+        for i in range(len(tokens) - n + 1):
+            yield " ".join(tokens[i:i + n])
+
+def term_set(text: str) -> Set[str]:
+    """
+    Every canonicalised 1..MAX_NGRAM-gram of `text`, for membership tests.
+    """
+    terms = set(listed_skills(text))
+    for tokens in _segments(text):
+        terms.update(canonical(g) for g in _ngrams(tokens))
+    return terms
+
+_HAS_LETTER = re.compile(r"[a-z]")
+
+def _is_candidate(gram: str) -> bool:
+    words = gram.split()
+    if words[0] in STOP_WORDS or words[-1] in STOP_WORDS:
+        return False
+    if len(words) == 1:
+        return len(gram) > 1 and bool(_HAS_LETTER.search(gram))
+    return all(_HAS_LETTER.search(w) for w in words)
+
+def extract_keywords(job_description: str, limit: int = MAX_KEYWORDS) -> Dict[str, float]:
+    """
+    Weighted keywords of a job description: known skills (via aliases, or listed alongside
+    other skills) at any n-gram length, repeated multi-word phrases, and content words that
+    repeat or sit on a requirement line. Words that only occur inside a selected phrase are
+    folded into it.
+    """
+    counts: Counter = Counter()
+    required: Set[str] = set()
+    words_of: Dict[str, Set[str]] = {}
+    for line in job_description.splitlines():
+        is_required = bool(_REQUIRED_LINE.search(line))
+        for term in listed_skills(line):
+            counts[term] += 1
+            # The bare name ("go") then folds into the skill like a word inside a phrase
+            words_of.setdefault(term, set()).update(term.split() + [_NAME_OF_LISTED[term]])
+            if is_required:
+                required.add(term)
+        for tokens in _segments(line):
+            for gram in _ngrams(tokens):
+                term = canonical(gram)
+                if term in KNOWN_SKILLS or _is_candidate(gram):
+                    counts[term] += 1
+                    words_of.setdefault(term, set()).update(gram.split())
+                    if is_required:
+                        required.add(term)
+
+    weights: Dict[str, float] = {}
+    for term, count in counts.items():
+        n = len(term.split())
+        if term in KNOWN_SKILLS:
+            base = SKILL_WEIGHT
+        elif n > 1:
+            if count < 2:
+                continue
+            base = PHRASE_WEIGHT
+        else:
+            if count < 2 and term not in required:
+                continue
+            base = WORD_WEIGHT
+        weight = base * (1 + math.log(count))
+        if term in required:
+            weight *= REQUIRED_LINE_BOOST
+        weights[term] = weight
+
+    # Drop words whose every occurrence is inside a kept phrase ("learning" under "machine
+    # learning", "lang" under "go lang" -> golang)
+    phrases = [t for t in weights if len(words_of[t]) > 1]
+    for term in [t for t in weights if " " not in t and t not in KNOWN_SKILLS]:
+        inside = sum(counts[p] for p in phrases if term in words_of[p])
+        if inside >= counts[term]:
+            del weights[term]
+
+    top = sorted(weights.items(), key=lambda kv: (-kv[1], kv[0]))[:limit]
+    return dict(top)
+
+def match_keywords(resume_text: str, job_description: str) -> KeywordMatch:
+    """
+    Deterministic ATS-style keyword match of a resume against a job description.
+    match_score is the weighted share (0-100) of the JD's keywords found in the resume.
+    """
+    weights = extract_keywords(job_description)
+    resume_terms = term_set(resume_text)
+    matched = [t for t in weights if t in resume_terms]
+    missing = [t for t in weights if t not in resume_terms]
+    total = sum(weights.values())
+    score = round(100 * sum(weights[t] for t in matched) / total) if total else 0
+    return KeywordMatch(
+        match_score=score,
+        matched_keywords=matched,
+        missing_keywords=missing,
+        skill_gaps=[t for t in missing if t in KNOWN_SKILLS],
+        weights=weights,
+    )
+
+def local_recommendations(match: KeywordMatch, limit: int = 5) -> List[str]:
+    """
+    Templated recommendations from the keyword gaps, for the LLM-free fast mode.
+    """
+    recommendations = []
+    if match.skill_gaps:
+        recommendations.append(
+            f"If you have experience with {', '.join(match.skill_gaps[:5])}, add it to your skills and describe where you used it."
+        )
+    other_missing = [t for t in match.missing_keywords if t not in match.skill_gaps]
+    if other_missing:
+        recommendations.append(
+            f"Mirror the job description's wording where it applies to you, e.g. {', '.join(other_missing[:5])}."
+        )
+    if match.matched_keywords:
+        recommendations.append(
+            f"Move your strongest matches ({', '.join(match.matched_keywords[:3])}) into your summary and most recent role."
+        )
+    if match.match_score < 50:
+        recommendations.append("Tailor your summary and recent bullet points to this role; fewer than half of its key terms appear in your resume.")
+    return recommendations[:limit]
@@ -0,0 +1,44 @@
+# backend/services/latency_tracker.py
+import math
+from collections import defaultdict, deque
+from typing import Optional
+
+class LatencyTracker:
+    """
+    Rolling window of successful upstream latencies per endpoint.
+    Used to derive per-endpoint percentiles such as the hedging threshold.
+    """
+
+    def __init__(self, window_size: int = 200, min_samples: int = 20):
+        self.window_size = window_size
+        self.min_samples = min_samples
+        self._samples = defaultdict(lambda: deque(maxlen=self.window_size))
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        self._samples[endpoint].append(seconds)
+
+    def percentile(self, endpoint: str, pct: float) -> Optional[float]:
+        """
+        Nearest-rank percentile, or None until min_samples have been recorded.
+        """
+        samples = self._samples.get(endpoint)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+        return ordered[rank]
+
+    def stats(self) -> dict:
+        result = {}
+        for endpoint, samples in self._samples.items():
+            ordered = sorted(samples)
+            result[endpoint] = {
+                "samples": len(ordered),
+                "p50": round(ordered[len(ordered) // 2], 3),
+                "p95": round(ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)], 3),
+                "max": round(ordered[-1], 3),
+            }
+        return result
+
+# Process-wide tracker for LLM calls
+llm_latency_tracker = LatencyTracker()
@@ -0,0 +1,182 @@
+# backend/services/llm_cache.py
+import os
+import json
+import time
+import asyncio
+import hashlib
+import sqlite3
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from openai.types.chat import ChatCompletion
+
+def make_cache_key(model: str, messages: list, temperature=None, response_format=None, max_tokens=None, endpoint: str = "") -> str:
+    """
+    Build a content-addressed key for an LLM request.
+    Identical (model, messages, temperature, response_format, max_tokens, endpoint) tuples
+    always hash to the same key. max_tokens is part of it so a short completion budget's
+    (possibly truncated) answer is never served to a caller with a larger one.
+    """
+    payload = json.dumps(
+        {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "response_format": response_format,
+            "max_tokens": max_tokens,
+            "endpoint": endpoint,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class LLMResponseCache:
+    """
+    Two-tier cache for chat completions.
+
+    - Memory tier: LRU bounded by max_entries, entries expire after ttl_seconds
+    - Disk tier (optional): SQLite file that survives restarts, same TTL
+
+    Disk hits are promoted into the memory tier. The disk tier is only touched from one
+    dedicated worker thread, so lookups never block the event loop on disk I/O; expired
+    rows are purged at startup and whenever a response is written.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 3600, db_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self._memory = OrderedDict()  # key -> (expires_at, ChatCompletion)
+        self._db = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.purged = 0
+
+        if db_path:
+            try:
+                self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS llm_cache ("
+                    "key TEXT PRIMARY KEY, expires_at REAL NOT NULL, response TEXT NOT NULL)"
+                )
+                self._db.execute("CREATE INDEX IF NOT EXISTS llm_cache_expires_at ON llm_cache (expires_at)")
+                self._purge_expired()
+            except sqlite3.Error as e:
+                print(f"⚠ LLM disk cache disabled, could not open {db_path}: {e}")
+                self._db = None
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm-cache-db")
+
+    async def _run_db(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def get(self, key: str) -> Optional[ChatCompletion]:
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, response = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return response
+            del self._memory[key]
+
+        if self._db is not None:
+            try:
+                row = await self._run_db(self._read_row, key, now)
+                if row is not None:
+                    expires_at, raw = row
+                    response = ChatCompletion.model_validate_json(raw)
+                    self._store_in_memory(key, response, expires_at)
+                    self.disk_hits += 1
+                    return response
+            except (sqlite3.Error, ValueError) as e:
+                print(f"⚠ LLM disk cache read failed: {e}")
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, response: ChatCompletion) -> None:
+        expires_at = time.time() + self.ttl_seconds
+        self._store_in_memory(key, response, expires_at)
+        if self._db is not None:
+            try:
+                await self._run_db(self._write_row, key, expires_at, response.model_dump_json())
+            except sqlite3.Error as e:
+                print(f"⚠ LLM disk cache write failed: {e}")
+
+    async def discard(self, key: str) -> None:
+        self._memory.pop(key, None)
+        if self._db is not None:
+            try:
+                await self._run_db(self._delete_row, key)
+            except sqlite3.Error as e:
+                print(f"⚠ LLM disk cache delete failed: {e}")
+
+    async def clear(self) -> None:
+        self._memory.clear()
+        if self._db is not None:
+            await self._run_db(self._db.execute, "DELETE FROM llm_cache")
+
+    # Disk tier, run on the cache's worker thread
+
+    def _read_row(self, key: str, now: float):
+        row = self._db.execute("SELECT expires_at, response FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is not None and row[0] <= now:
+            self._delete_row(key)
+            return None
+        return row
+
+    def _write_row(self, key: str, expires_at: float, raw: str) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, expires_at, response) VALUES (?, ?, ?)",
+            (key, expires_at, raw),
+        )
+        self._purge_expired()
+
+    def _delete_row(self, key: str) -> None:
+        self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+
+    def _purge_expired(self) -> None:
+        self.purged += self._db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def _store_in_memory(self, key: str, response: ChatCompletion, expires_at: float) -> None:
+        self._memory[key] = (expires_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "memory_entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "disk_enabled": self._db is not None,
+            "disk_rows_purged": self.purged,
+        }
+
+# Process-wide cache, configured from the environment:
+# LLM_CACHE_ENABLED (default true), LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS,
+# LLM_CACHE_DB_PATH (set to a file path to enable the on-disk tier)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+
+response_cache = LLMResponseCache(
+    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512")),
+    ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", "3600")),
+    db_path=os.getenv("LLM_CACHE_DB_PATH") or None,
+)
@@ -0,0 +1,197 @@
+# backend/services/model_health.py
+import os
+import time
+from typing import Dict, List, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class ModelCircuit:
+    """
+    Circuit breaker state for a single model.
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.cooldown = 0.0
+        self.open_count = 0
+        self.probe_id = 0  # Request holding the half-open probe, 0 if none
+        self.successes = 0
+        self.failures = 0
+        self.rate_limits = 0
+        self.avg_latency: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def reopens_at(self) -> float:
+        return self.opened_at + self.cooldown
+
+class ModelHealthRegistry:
+    """
+    Process-wide health tracker for upstream models.
+
+    A model's circuit opens after rate_limit_threshold consecutive 429s or
+    failure_threshold consecutive errors, and the model is skipped for a cooldown
+    (at least the provider's Retry-After). Once the cooldown passes the circuit is half-open:
+    a single probe request is let through, closing the circuit on success or reopening it
+    with a doubled cooldown on failure.
+
+    Requests call begin_request when they pick a model (before queueing for a slot), which
+    claims the probe of a half-open circuit, and pass the id they got back to
+    record_success/record_failure/cancel_request. Only the holder releases a probe.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        rate_limit_threshold: int = 1,
+        cooldown_seconds: float = 30,
+        max_cooldown_seconds: float = 600,
+    ):
+        self.failure_threshold = failure_threshold
+        self.rate_limit_threshold = rate_limit_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.max_cooldown_seconds = max_cooldown_seconds
+        self._circuits: Dict[str, ModelCircuit] = {}
+        self._next_probe_id = 0
+
+    def _circuit(self, model: str) -> ModelCircuit:
+        circuit = self._circuits.get(model)
+        if circuit is None:
+            circuit = ModelCircuit(model)
+            self._circuits[model] = circuit
+        return circuit
+
+    def _refresh(self, circuit: ModelCircuit, now: float) -> None:
+        if circuit.state == OPEN and now >= circuit.reopens_at():
+            circuit.state = HALF_OPEN
+            circuit.probe_id = 0
+
+    def is_available(self, model: str) -> bool:
+        circuit = self._circuit(model)
+        self._refresh(circuit, time.time())
+        if circuit.state == OPEN:
+            return False
+        if circuit.state == HALF_OPEN:
+            return not circuit.probe_id
+        return True
+
+    def available_models(self, models: List[str]) -> List[str]:
+        """
+        Order models by current health and drop the ones whose circuit is open.
+
+        Models with sub-threshold recent failures sink below healthy ones; otherwise the
+        configured priority is kept. Half-open models keep their priority so the next request
+        probes them instead of leaving traffic on a fallback forever. If every model is open,
+        the one that reopens soonest is returned so the request still gets a chance.
+        """
+        now = time.time()
+        for model in models:
+            self._refresh(self._circuit(model), now)
+
+        ordered = sorted(
+            models,
+            key=lambda m: (
+                0 if self._circuit(m).state == HALF_OPEN else self._circuit(m).consecutive_failures,
+                models.index(m),
+            ),
+        )
+        available = [m for m in ordered if self.is_available(m)]
+        if available:
+            return available
+        return [min(models, key=lambda m: self._circuit(m).reopens_at())]
+
+    def begin_request(self, model: str) -> Optional[int]:
+        """
+        Admit a request to `model`. Returns the probe id if the request is now the half-open
+        circuit's probe, 0 for an ordinary request, or None if another request already holds
+        the probe. An open circuit still admits requests (ordinary ones), since callers only
+        pick an open model when every model is open.
+        """
+        circuit = self._circuit(model)
+        self._refresh(circuit, time.time())
+        if circuit.state != HALF_OPEN:
+            return 0
+        if circuit.probe_id:
+            return None
+        self._next_probe_id += 1
+        circuit.probe_id = self._next_probe_id
+        return circuit.probe_id
+
+    def _release_probe(self, circuit: ModelCircuit, probe: int) -> None:
+        if probe and circuit.probe_id == probe:
+            circuit.probe_id = 0
+
+    def cancel_request(self, model: str, probe: int = 0) -> None:
+        # A cancelled probe (e.g. a hedging loser) tells us nothing; let another request probe
+        self._release_probe(self._circuit(model), probe)
+
+    def record_success(self, model: str, latency: Optional[float] = None) -> None:
+        circuit = self._circuit(model)
+        if circuit.state != CLOSED:
+            print(f"✓ Circuit closed for {model}")
+        circuit.state = CLOSED
+        circuit.consecutive_failures = 0
+        circuit.open_count = 0
+        circuit.probe_id = 0
+        circuit.successes += 1
+        if latency is not None:
+            circuit.avg_latency = latency if circuit.avg_latency is None else 0.8 * circuit.avg_latency + 0.2 * latency
+
+    def record_failure(self, model: str, rate_limited: bool = False, retry_after: Optional[float] = None, error: str = "", probe: int = 0) -> None:
+        circuit = self._circuit(model)
+        circuit.failures += 1
+        circuit.consecutive_failures += 1
+        self._release_probe(circuit, probe)
+        circuit.last_error = error[:200] if error else None
+        if rate_limited:
+            circuit.rate_limits += 1
+
+        threshold = self.rate_limit_threshold if rate_limited else self.failure_threshold
+        if circuit.state == HALF_OPEN or circuit.consecutive_failures >= threshold:
+            self._open(circuit, retry_after)
+
+    def _open(self, circuit: ModelCircuit, retry_after: Optional[float]) -> None:
+        # Back off harder each time the same model fails again right after a probe
+        cooldown = min(self.max_cooldown_seconds, self.cooldown_seconds * (2 ** circuit.open_count))
+        if retry_after is not None:
+            cooldown = min(self.max_cooldown_seconds, max(cooldown, retry_after))
+        circuit.state = OPEN
+        circuit.opened_at = time.time()
+        circuit.cooldown = cooldown
+        circuit.open_count += 1
+        print(f"⚠ Circuit opened for {circuit.model} for {cooldown:.0f}s")
+
+    def reset(self, model: Optional[str] = None) -> None:
+        if model is None:
+            self._circuits.clear()
+        else:
+            self._circuits.pop(model, None)
+
+    def snapshot(self) -> dict:
+        now = time.time()
+        result = {}
+        for model, circuit in self._circuits.items():
+            self._refresh(circuit, now)
+            result[model] = {
+                "state": circuit.state,
+                "consecutive_failures": circuit.consecutive_failures,
+                "successes": circuit.successes,
+                "failures": circuit.failures,
+                "rate_limits": circuit.rate_limits,
+                "reopens_in_seconds": round(max(0.0, circuit.reopens_at() - now), 1) if circuit.state == OPEN else 0,
+                "avg_latency_seconds": round(circuit.avg_latency, 3) if circuit.avg_latency is not None else None,
+                "last_error": circuit.last_error,
+            }
+        return result
+
+# Process-wide registry, tunable through MODEL_CIRCUIT_* environment variables
+model_health_registry = ModelHealthRegistry(
+    failure_threshold=int(os.getenv("MODEL_CIRCUIT_FAILURE_THRESHOLD", "3")),
+    rate_limit_threshold=int(os.getenv("MODEL_CIRCUIT_RATE_LIMIT_THRESHOLD", "1")),
+    cooldown_seconds=float(os.getenv("MODEL_CIRCUIT_COOLDOWN_SECONDS", "30")),
+    max_cooldown_seconds=float(os.getenv("MODEL_CIRCUIT_MAX_COOLDOWN_SECONDS", "600")),
+)
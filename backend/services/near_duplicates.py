@@ -0,0 +1,309 @@
+# backend/services/near_duplicates.py
+import os
+import time
+import zlib
+import hashlib
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterator, List, NamedTuple, Optional, Set, Tuple
+import numpy as np
+from services.keyword_matcher import MAX_NGRAM, STOP_WORDS, canonical, term_set, tokenize
+
+# 128 MinHash values split into 32 LSH bands of 4 rows: two texts share a band bucket with
+# probability 1 - (1 - J^4)^32, over 0.999 from Jaccard 0.7 up and about 0.05 at 0.2
+# (unrelated resumes), so near-duplicates are found without comparing against everything
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 32
+SHINGLE_SIZE = 2
+
+# Universal hashing h(x) = (a * x + b) mod p over 32-bit shingle hashes; a, b < 2^31 keeps
+# a * x + b inside uint64
+_PRIME = np.uint64(4294967311)  # smallest prime above 2^32
+_rng = np.random.default_rng(20240611)  # fixed seed: signatures must be stable across processes
+_A = _rng.integers(1, 2 ** 31, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, 2 ** 31, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_EMPTY_SIGNATURE = np.full(NUM_PERMUTATIONS, np.iinfo(np.uint64).max, dtype=np.uint64)
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> List[str]:
+    """
+    Overlapping word n-grams of the tokenized text (the whole text when it is shorter
+    than one shingle), so reordered or reworded passages still share most shingles.
+    """
+    tokens = tokenize(text)
+    if len(tokens) <= size:
+        return [" ".join(tokens)] if tokens else []
+    return [" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)]
+
+def minhash_signature(text: str) -> np.ndarray:
+    """
+    NUM_PERMUTATIONS minimum hash values over the text's shingles. The share of positions
+    where two signatures agree estimates the Jaccard similarity of their shingle sets.
+    """
+    hashes = np.array(list({zlib.crc32(s.encode("utf-8")) for s in shingles(text)}), dtype=np.uint64)
+    if not len(hashes):
+        return _EMPTY_SIGNATURE.copy()
+    permuted = (_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME
+    return permuted.min(axis=1)
+
+def signature_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.count_nonzero(a == b)) / len(a)
+
+def _band_keys(signature: np.ndarray, bands: int = LSH_BANDS) -> List[bytes]:
+    return [band.tobytes() for band in np.split(signature, bands)]
+
+class MinHashLSH:
+    """
+    Locality-sensitive hash index over MinHash signatures. Each signature is split into
+    bands and filed under one bucket per band; a query only compares against entries
+    that share at least one bucket, so lookups cost the same however many entries are
+    stored. Candidates are then checked against `threshold` on the full signature.
+    """
+
+    def __init__(self, threshold: float = 0.7, bands: int = LSH_BANDS):
+        if NUM_PERMUTATIONS % bands:
+            raise ValueError(f"{NUM_PERMUTATIONS} permutations can't be split into {bands} bands")
+        self.threshold = threshold
+        self.bands = bands
+        self._buckets: Dict[Tuple[int, bytes], List[Hashable]] = {}
+        self._signatures: Dict[Hashable, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._signatures
+
+    def add(self, key: Hashable, signature: np.ndarray) -> None:
+        if key in self._signatures:
+            self.remove(key)
+        self._signatures[key] = signature
+        for band, band_key in enumerate(_band_keys(signature, self.bands)):
+            self._buckets.setdefault((band, band_key), []).append(key)
+
+    def remove(self, key: Hashable) -> None:
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for band, band_key in enumerate(_band_keys(signature, self.bands)):
+            bucket = self._buckets.get((band, band_key))
+            if bucket is not None:
+                bucket.remove(key)
+                if not bucket:
+                    del self._buckets[(band, band_key)]
+
+    def query(self, signature: np.ndarray, threshold: Optional[float] = None) -> List[Tuple[Hashable, float]]:
+        """
+        (key, estimated similarity) of stored entries at or above the threshold, most
+        similar first.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        candidates = {}
+        for band, band_key in enumerate(_band_keys(signature, self.bands)):
+            for key in self._buckets.get((band, band_key), ()):
+                candidates[key] = None
+        matches = []
+        for key in candidates:
+            similarity = signature_similarity(signature, self._signatures[key])
+            if similarity >= threshold:
+                matches.append((key, similarity))
+        matches.sort(key=lambda m: -m[1])
+        return matches
+
+def dedupe(texts: List[str], threshold: float = 0.7) -> List[int]:
+    """
+    For each text, the index of the earlier text it near-duplicates, or its own index if
+    it is the first of its kind. Keep the items where representative[i] == i.
+    """
+    index = MinHashLSH(threshold)
+    representative = []
+    for i, text in enumerate(texts):
+        signature = minhash_signature(text)
+        matches = index.query(signature)
+        if matches:
+            representative.append(matches[0][0])
+        else:
+            index.add(i, signature)
+            representative.append(i)
+    return representative
+
+def scope_key(*parts) -> str:
+    """
+    Stable key for the inputs, other than the analysed text, that a cached result depends on.
+    """
+    return hashlib.sha256("\x1f".join("" if p is None else str(p) for p in parts).encode("utf-8")).hexdigest()[:16]
+
+# Words in a row that make a changed line count as quoted by an analysis
+QUOTE_WORDS = 4
+
+class ReusedResult(NamedTuple):
+    result: dict
+    similarity: float
+    age_seconds: float
+    text: str  # The text the result was computed for
+
+def _strings(value) -> Iterator[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _strings(item)
+
+def changed_lines(old_text: str, new_text: str) -> List[str]:
+    """
+    Lines only one of the two texts has (case and spacing ignored): the edited lines, in
+    both their old and new wording.
+    """
+    def lines(text: str) -> Set[str]:
+        return {" ".join(line.lower().split()) for line in text.splitlines() if line.strip()}
+    return sorted(lines(old_text) ^ lines(new_text))
+
+def edit_touches_result(old_text: str, new_text: str, result: dict) -> bool:
+    """
+    Whether editing `old_text` into `new_text` changed something `result` (an analysis of
+    `old_text`) talks about: a line it quotes (QUOTE_WORDS words in a row), or a term it
+    lists, like a missing skill the new version now has.
+    """
+    quoted: Set[Tuple[str, ...]] = set()
+    terms: Set[str] = set()
+    for string in _strings(result):
+        tokens = tokenize(string)
+        if 0 < len(tokens) <= MAX_NGRAM:
+            term = canonical(" ".join(tokens))
+            if term not in STOP_WORDS:
+                terms.add(term)
+        quoted.update(tuple(tokens[i:i + QUOTE_WORDS]) for i in range(len(tokens) - QUOTE_WORDS + 1))
+    for line in changed_lines(old_text, new_text):
+        tokens = tokenize(line)
+        if any(tuple(tokens[i:i + QUOTE_WORDS]) in quoted for i in range(len(tokens) - QUOTE_WORDS + 1)):
+            return True
+        if terms & term_set(line):
+            return True
+    return False
+
+class NearDuplicateResultCache:
+    """
+    Analysis results keyed by the text they were computed for, looked up by similarity
+    rather than equality: a resume version that differs from an earlier one by a reworded
+    bullet or a fixed typo gets the earlier analysis instead of a new LLM call.
+
+    Each entry also carries a scope (endpoint plus the other inputs, e.g. target role and
+    job description), and only entries in the same scope are reused. Entries are held in
+    memory, LRU-bounded by max_entries and expiring after ttl_seconds.
+    """
+
+    def __init__(self, threshold: float = 0.9, max_entries: int = 2048, ttl_seconds: float = 3600, enabled: bool = True):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._indexes: Dict[Tuple[str, str], MinHashLSH] = {}  # (endpoint, scope) -> index
+        self._entries: "OrderedDict[Tuple[str, str, int], Tuple[float, str, dict]]" = OrderedDict()
+        self._next_id = 0
+        self.lookups: Dict[str, int] = {}
+        self.hits: Dict[str, int] = {}
+        self.rejected: Dict[str, int] = {}
+        self.evictions = 0
+
+    def lookup(
+        self, endpoint: str, scope: str, text: str, accept: Optional[Callable[[str, dict], bool]] = None
+    ) -> Optional[ReusedResult]:
+        """
+        A stored result for a text near-identical to `text` in the same scope. `accept(stored
+        text, result)` can turn a candidate down, e.g. when the edit touches what it says.
+        """
+        if not self.enabled:
+            return None
+        self.lookups[endpoint] = self.lookups.get(endpoint, 0) + 1
+        index = self._indexes.get((endpoint, scope))
+        if index is None:
+            return None
+        now = time.time()
+        for key, similarity in index.query(minhash_signature(text)):
+            stored_at, stored_text, result = self._entries[key]
+            if now - stored_at > self.ttl_seconds:
+                self._drop(key)
+                continue
+            if accept is not None and not accept(stored_text, result):
+                self.rejected[endpoint] = self.rejected.get(endpoint, 0) + 1
+                continue
+            self._entries.move_to_end(key)
+            self.hits[endpoint] = self.hits.get(endpoint, 0) + 1
+            return ReusedResult(result, similarity, now - stored_at, stored_text)
+        return None
+
+    def store(self, endpoint: str, scope: str, text: str, result: dict) -> None:
+        if not self.enabled:
+            return
+        key = (endpoint, scope, self._next_id)
+        self._next_id += 1
+        self._entries[key] = (time.time(), text, result)
+        index = self._indexes.get((endpoint, scope))
+        if index is None:
+            index = self._indexes[(endpoint, scope)] = MinHashLSH(self.threshold)
+        index.add(key, minhash_signature(text))
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self, endpoint: str, scope: str, text: str) -> int:
+        """
+        Forget the results stored for texts near-identical to `text`, e.g. when the caller
+        asked for a fresh analysis. Returns how many were dropped.
+        """
+        index = self._indexes.get((endpoint, scope))
+        if index is None:
+            return 0
+        matches = index.query(minhash_signature(text))
+        for key, _ in matches:
+            self._drop(key)
+        return len(matches)
+
+    def _drop(self, key: Tuple[str, str, int]) -> None:
+        self._entries.pop(key, None)
+        index = self._indexes.get(key[:2])
+        if index is not None:
+            index.remove(key)
+            if not len(index):
+                del self._indexes[key[:2]]
+
+    def clear(self) -> None:
+        self._indexes.clear()
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = sum(self.lookups.values())
+        hits = sum(self.hits.values())
+        return {
+            "enabled": self.enabled,
+            "threshold": self.threshold,
+            "lookups": lookups,
+            "hits": hits,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "rejected": sum(self.rejected.values()),
+            "by_endpoint": {
+                endpoint: {"lookups": n, "hits": self.hits.get(endpoint, 0), "rejected": self.rejected.get(endpoint, 0)}
+                for endpoint, n in self.lookups.items()
+            },
+            "entries": len(self._entries),
+            "scopes": len(self._indexes),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "evictions": self.evictions,
+        }
+
+# Process-wide reuse cache, configured from the environment:
+# NEAR_DUPLICATE_REUSE_ENABLED (default true), NEAR_DUPLICATE_REUSE_THRESHOLD (estimated
+# Jaccard similarity of word bigrams, default 0.9), NEAR_DUPLICATE_MAX_ENTRIES,
+# NEAR_DUPLICATE_TTL_SECONDS; NEAR_DUPLICATE_DEDUPE_THRESHOLD applies to generated summary
+# variations, NEAR_DUPLICATE_PORTFOLIO_THRESHOLD to what sets portfolio versions apart
+NEAR_DUPLICATE_DEDUPE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_DEDUPE_THRESHOLD", "0.7"))
+NEAR_DUPLICATE_PORTFOLIO_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_PORTFOLIO_THRESHOLD", "0.9"))
+
+analysis_reuse_cache = NearDuplicateResultCache(
+    threshold=float(os.getenv("NEAR_DUPLICATE_REUSE_THRESHOLD", "0.9")),
+    max_entries=int(os.getenv("NEAR_DUPLICATE_MAX_ENTRIES", "2048")),
+    ttl_seconds=float(os.getenv("NEAR_DUPLICATE_TTL_SECONDS", "3600")),
+    enabled=os.getenv("NEAR_DUPLICATE_REUSE_ENABLED", "true").lower() not in ("0", "false", "no"),
+)
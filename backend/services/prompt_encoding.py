@@ -0,0 +1,89 @@
+# backend/services/prompt_encoding.py
+from typing import Any, List
+from pydantic import BaseModel
+
+# Shown next to encoded data so the model reads the layout right and answers with the same keys
+COMPACT_FORMAT_NOTE = "one `key: value` per line, nesting by indentation, `-` starts a list item"
+
+def _is_empty(value: Any) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return not value.strip()
+    if isinstance(value, dict):
+        return all(_is_empty(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return all(_is_empty(v) for v in value)
+    return False
+
+def _scalar(value: Any) -> str:
+    if isinstance(value, bool):
+        return "yes" if value else "no"
+    return str(value).strip()
+
+def _is_scalar_list(value: Any) -> bool:
+    return isinstance(value, (list, tuple)) and not any(isinstance(v, (dict, list, tuple)) for v in value)
+
+def _inline_list(items: list) -> str:
+    texts = [_scalar(v) for v in items if not _is_empty(v)]
+    # Commas are the cheapest separator unless an item contains one itself
+    separator = "; " if any("," in t for t in texts) else ", "
+    return separator.join(texts)
+
+def _text_lines(prefix: str, text: str, pad: str) -> List[str]:
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    return [prefix + lines[0]] + [pad + "  " + line for line in lines[1:]]
+
+def _encode_dict(data: dict, pad: str) -> List[str]:
+    lines = []
+    for key, value in data.items():
+        if _is_empty(value):
+            continue
+        if isinstance(value, dict):
+            lines.append(f"{pad}{key}:")
+            lines.extend(_encode_dict(value, pad + "  "))
+        elif isinstance(value, (list, tuple)):
+            if _is_scalar_list(value):
+                lines.append(f"{pad}{key}: {_inline_list(value)}")
+            else:
+                lines.append(f"{pad}{key}:")
+                lines.extend(_encode_list(value, pad + "  "))
+        else:
+            lines.extend(_text_lines(f"{pad}{key}: ", _scalar(value), pad))
+    return lines
+
+def _encode_list(items: list, pad: str) -> List[str]:
+    lines = []
+    for item in items:
+        if _is_empty(item):
+            continue
+        if isinstance(item, dict):
+            # The item's first field shares the "- " line; the rest are indented under it
+            item_lines = _encode_dict(item, pad + "  ")
+            lines.append(pad + "- " + item_lines[0][len(pad) + 2:])
+            lines.extend(item_lines[1:])
+        elif _is_scalar_list(item):
+            lines.append(f"{pad}- {_inline_list(item)}")
+        elif isinstance(item, (list, tuple)):
+            lines.append(f"{pad}-")
+            lines.extend(_encode_list(item, pad + "  "))
+        else:
+            lines.extend(_text_lines(f"{pad}- ", _scalar(item), pad))
+    return lines
+
+def encode_for_prompt(data: Any) -> str:
+    """
+    Compact, line-oriented rendering of resume-shaped data (ResumeInput/ResumeOutput models or
+    plain dicts) for LLM prompts.
+
+    Empty fields are dropped, keys are written once per value without quotes or braces, scalar
+    lists are comma-joined and nesting is shown by two-space indentation. Key names are kept
+    so the model can still return the same structure as JSON.
+    """
+    if isinstance(data, BaseModel):
+        data = data.model_dump(mode="json")
+    if isinstance(data, dict):
+        return "\n".join(_encode_dict(data, ""))
+    if isinstance(data, (list, tuple)):
+        return "\n".join(_encode_list(list(data), ""))
+    return _scalar(data)
@@ -0,0 +1,63 @@
+# backend/services/prompt_registry.py
+import textwrap
+from collections import defaultdict
+from typing import Dict, NamedTuple, Optional
+
+class PromptTemplate(NamedTuple):
+    """
+    The static part of an endpoint's prompt: instructions plus the JSON schema example.
+
+    It is sent first as the system message and never contains per-request data, so every
+    request to the endpoint shares the same prefix and providers with prompt caching can
+    reuse it. Per-request content always goes in the user message after it.
+    """
+    endpoint: str
+    version: str
+    content: str
+
+class PromptRegistry:
+    """
+    Versioned static prompts per endpoint, plus cached-token accounting from the `usage` block
+    of responses (OpenAI-style `prompt_tokens_details.cached_tokens`, as relayed by OpenRouter).
+    """
+
+    def __init__(self):
+        self._prompts: Dict[str, PromptTemplate] = {}
+        self._usage = defaultdict(lambda: {"requests": 0, "prompt_tokens": 0, "cached_tokens": 0, "requests_with_cache_hit": 0})
+
+    def register(self, endpoint: str, version: str, instructions: str, schema: Optional[str] = None) -> PromptTemplate:
+        content = textwrap.dedent(instructions).strip()
+        if schema:
+            content += "\n\nReturn as JSON with this structure:\n" + textwrap.dedent(schema).strip()
+        prompt = PromptTemplate(endpoint, version, content)
+        self._prompts[endpoint] = prompt
+        return prompt
+
+    def get(self, endpoint: str) -> PromptTemplate:
+        return self._prompts[endpoint]
+
+    def record_usage(self, endpoint: str, usage) -> None:
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None) or 0
+        stats = self._usage[endpoint]
+        stats["requests"] += 1
+        stats["prompt_tokens"] += getattr(usage, "prompt_tokens", None) or 0
+        stats["cached_tokens"] += cached
+        if cached:
+            stats["requests_with_cache_hit"] += 1
+
+    def stats(self) -> dict:
+        result = {}
+        for endpoint, prompt in self._prompts.items():
+            usage = self._usage.get(endpoint, {"requests": 0, "prompt_tokens": 0, "cached_tokens": 0, "requests_with_cache_hit": 0})
+            result[endpoint] = {
+                "version": prompt.version,
+                "static_prefix_chars": len(prompt.content),
+                **usage,
+                "cached_token_ratio": round(usage["cached_tokens"] / usage["prompt_tokens"], 4) if usage["prompt_tokens"] else 0.0,
+            }
+        return result
+
+prompt_registry = PromptRegistry()
@@ -0,0 +1,89 @@
+# backend/services/request_context.py
+import os
+import time
+import hashlib
+from contextvars import ContextVar
+from typing import Optional
+
+# Identity of the client on whose behalf LLM work is being done, used for fair queuing
+current_client_id: ContextVar[Optional[str]] = ContextVar("current_client_id", default=None)
+
+# Absolute time.monotonic() deadline requested by the caller through X-Request-Timeout, if any
+current_deadline: ContextVar[Optional[float]] = ContextVar("current_deadline", default=None)
+
+# Reverse proxies in front of the app that append to X-Forwarded-For (1 behind Vercel or
+# Railway, 0 when clients connect directly). The client IP is the entry that many hops from
+# the right; entries further left are whatever the client sent and can't be trusted.
+TRUSTED_PROXY_HOPS = max(0, int(os.getenv("TRUSTED_PROXY_HOPS", "1")))
+
+# Peers (e.g. the frontend's server) allowed to name the end user with X-Client-Id; from
+# anyone else the header is ignored so callers can't pick or rotate their identity
+TRUSTED_CLIENT_ID_PROXIES = frozenset(
+    ip.strip() for ip in os.getenv("TRUSTED_CLIENT_ID_PROXIES", "").split(",") if ip.strip()
+)
+
+# Upper bound for a client-requested budget so a header can't hold upstream slots indefinitely
+MAX_REQUEST_TIMEOUT_SECONDS = float(os.getenv("LLM_MAX_REQUEST_TIMEOUT_SECONDS", "300"))
+
+def resolve_client_ip(headers: dict, client_host: Optional[str]) -> str:
+    """
+    The caller's IP: the X-Forwarded-For entry added by the outermost trusted proxy, or the
+    socket peer when there is no proxy (or the header is shorter than the proxy chain).
+    """
+    forwarded = [hop.strip() for hop in headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    if TRUSTED_PROXY_HOPS and len(forwarded) >= TRUSTED_PROXY_HOPS:
+        return forwarded[-TRUSTED_PROXY_HOPS]
+    return client_host or "unknown"
+
+def resolve_client_id(headers: dict, client_host: Optional[str]) -> str:
+    """
+    Pick a stable identity for the caller from what it can't choose freely: a hash of the
+    Authorization header (so tokens never end up in logs or metrics), then the client IP.
+    X-Client-Id is only honoured from TRUSTED_CLIENT_ID_PROXIES, which vouch for the end user.
+    """
+    client_id = headers.get("x-client-id")
+    if client_id and client_host in TRUSTED_CLIENT_ID_PROXIES:
+        return "client:" + client_id[:128]
+    auth = headers.get("authorization")
+    if auth:
+        return "auth:" + hashlib.sha256(auth.encode("utf-8")).hexdigest()[:16]
+    return "ip:" + resolve_client_ip(headers, client_host)
+
+def resolve_deadline(headers: dict) -> Optional[float]:
+    """
+    Turn an X-Request-Timeout header (seconds) into an absolute monotonic deadline.
+    Missing or malformed values return None so the endpoint's default budget applies.
+    """
+    raw = headers.get("x-request-timeout")
+    if not raw:
+        return None
+    try:
+        seconds = float(raw)
+    except ValueError:
+        return None
+    if seconds <= 0:
+        return None
+    return time.monotonic() + min(seconds, MAX_REQUEST_TIMEOUT_SECONDS)
+
+class RequestContextMiddleware:
+    """
+    ASGI middleware that binds per-request context (client identity, deadline) to contextvars so the
+    LLM dispatch layer can read it without threading it through every service function.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        client = scope.get("client")
+        token = current_client_id.set(resolve_client_id(headers, client[0] if client else None))
+        deadline_token = current_deadline.set(resolve_deadline(headers))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_deadline.reset(deadline_token)
+            current_client_id.reset(token)
@@ -0,0 +1,240 @@
+# backend/services/resume_analytics.py
+import re
+from typing import Dict, List, NamedTuple, Optional
+from services.keyword_matcher import KNOWN_SKILLS, canonical, term_set, tokenize
+
+# Terms recruiters and ATS filters expect for common role families. A target role is matched
+# to the families whose trigger words it contains; its own title words are always included.
+ROLE_TERMS: Dict[str, List[str]] = {
+    "engineer developer programmer software backend frontend fullstack full-stack": [
+        "python", "javascript", "typescript", "java", "sql", "git", "rest api", "microservices",
+        "docker", "kubernetes", "aws", "ci/cd", "unit testing", "system design", "agile",
+    ],
+    "frontend front-end ui web": [
+        "javascript", "typescript", "react.js", "html", "css", "redux", "webpack", "accessibility",
+        "responsive design", "user interface",
+    ],
+    "data analyst analytics bi": [
+        "sql", "python", "microsoft excel", "tableau", "power bi", "data analysis",
+        "data visualization", "statistics", "dashboards", "a/b testing",
+    ],
+    "data scientist machine learning ml ai": [
+        "python", "machine learning", "deep learning", "statistics", "pandas", "numpy",
+        "scikit-learn", "pytorch", "tensorflow", "sql", "natural language processing",
+    ],
+    "devops sre platform infrastructure cloud": [
+        "aws", "azure", "google cloud", "kubernetes", "docker", "terraform", "ci/cd", "linux",
+        "monitoring", "infrastructure as code", "site reliability engineering",
+    ],
+    "product manager owner": [
+        "product management", "roadmap", "stakeholder management", "agile", "scrum",
+        "user research", "a/b testing", "metrics", "go-to-market", "prioritization",
+    ],
+    "project program manager coordinator": [
+        "project management", "agile", "scrum", "stakeholder management", "budget", "risk management",
+        "jira", "timeline", "cross-functional",
+    ],
+    "designer ux ui design": [
+        "figma", "user experience", "user interface", "prototyping", "wireframes", "user research",
+        "design systems", "usability testing", "accessibility",
+    ],
+    "marketing growth seo content": [
+        "seo", "content strategy", "google analytics", "campaigns", "social media", "email marketing",
+        "hubspot", "conversion", "a/b testing", "brand",
+    ],
+    "sales account business development": [
+        "salesforce", "pipeline", "quota", "negotiation", "crm", "lead generation", "account management",
+        "revenue", "prospecting",
+    ],
+}
+GENERIC_TERMS = ["leadership", "communication", "collaboration", "problem solving", "results"]
+
+SECTION_HEADINGS = {
+    "summary": r"summary|profile|objective|about me",
+    "experience": r"experience|employment|work history|professional background",
+    "education": r"education|academic",
+    "skills": r"skills|technologies|technical skills|competencies|tools",
+    "projects": r"projects|portfolio",
+    "certifications": r"certifications?|licenses?|courses",
+}
+# Words of content at which a section counts as complete
+SECTION_EXPECTED_WORDS = {"summary": 40, "experience": 150, "education": 12, "skills": 10, "projects": 40, "certifications": 5}
+_HEADING = re.compile(
+    r"^\s*(?:#+\s*)?(" + "|".join(f"(?P<{name}>{pattern})" for name, pattern in SECTION_HEADINGS.items()) + r")\s*:?\s*$",
+    re.I | re.M,
+)
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")
+_PHONE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+_LINKEDIN = re.compile(r"linkedin\.com/", re.I)
+
+_WORD = re.compile(r"[A-Za-z]+(?:['’][A-Za-z]+)?|\d+(?:[.,]\d+)*%?")
+_SENTENCE_END = re.compile(r"[.!?]+(?=\s|$)|\n+")
+_VOWEL_GROUPS = re.compile(r"[aeiouy]+")
+_QUANTIFIED = re.compile(r"\d|%|\$")
+_BULLET = re.compile(r"^\s*(?:[-•*▪◦]|\d+[.)])\s+", re.M)
+
+ACTION_VERBS = frozenset("""
+accelerated achieved administered analyzed architected automated boosted built championed coached
+collaborated completed conceived consolidated coordinated created cut decreased delivered deployed
+designed developed directed drove eliminated enabled engineered established exceeded executed expanded
+generated grew guided implemented improved increased initiated innovated integrated introduced launched
+led managed mentored migrated modernized negotiated optimized orchestrated organized oversaw owned
+pioneered planned produced reduced redesigned refactored resolved restructured revamped saved scaled
+secured shipped simplified spearheaded standardized streamlined strengthened supervised trained
+transformed unified upgraded won wrote
+""".split())
+
+class ResumeMetrics(NamedTuple):
+    ats_score: int
+    word_count: int
+    readability_score: int
+    keyword_density: Dict[str, float]
+    sections_completeness: Dict[str, int]
+    role_terms_found: List[str]
+    role_terms_missing: List[str]
+
+def words(text: str) -> List[str]:
+    return _WORD.findall(text)
+
+def count_syllables(word: str) -> int:
+    word = word.lower()
+    if not word.isalpha():
+        return 1
+    count = len(_VOWEL_GROUPS.findall(word))
+    if word.endswith("e") and not word.endswith(("le", "ee")) and count > 1:
+        count -= 1
+    return max(1, count)
+
+def flesch_reading_ease(text: str) -> int:
+    """
+    Flesch reading ease (0-100, higher is easier). Line breaks end sentences, so each
+    bullet point counts as one.
+    """
+    sentences = [s for s in _SENTENCE_END.split(text) if words(s)]
+    all_words = words(text)
+    if not sentences or not all_words:
+        return 0
+    syllables = sum(count_syllables(w) for w in all_words)
+    score = 206.835 - 1.015 * (len(all_words) / len(sentences)) - 84.6 * (syllables / len(all_words))
+    return int(round(min(100, max(0, score))))
+
+def role_terms(target_role: str) -> List[str]:
+    """
+    The expected-keyword list for a target role: terms of every matching role family, the
+    known skills named in the role title itself, and a few generic soft skills.
+    """
+    role_words = set(tokenize(target_role))
+    terms: List[str] = []
+    for triggers, family_terms in ROLE_TERMS.items():
+        if role_words & set(triggers.split()):
+            terms.extend(family_terms)
+    terms.extend(t for t in term_set(target_role) if t in KNOWN_SKILLS)
+    terms.extend(GENERIC_TERMS)
+    return list(dict.fromkeys(terms))
+
+def keyword_density(text: str, terms: List[str]) -> Dict[str, float]:
+    """
+    Occurrences of each term per 100 words of the resume (aliases count towards their
+    canonical term), highest first.
+    """
+    word_count = len(words(text)) or 1
+    counts: Dict[str, int] = {}
+    for line in text.splitlines():
+        tokens = [canonical(t) for t in tokenize(line)]
+        for term in terms:
+            target = canonical(term).split()
+            n = len(target)
+            occurrences = sum(1 for i in range(len(tokens) - n + 1) if tokens[i:i + n] == target)
+            if occurrences:
+                counts[term] = counts.get(term, 0) + occurrences
+    # Multi-word aliases ("amazon web services") only canonicalise as n-grams
+    present = term_set(text)
+    for term in terms:
+        if term not in counts and canonical(term) in present:
+            counts[term] = 1
+    density = {term: round(100 * n / word_count, 2) for term, n in counts.items()}
+    return dict(sorted(density.items(), key=lambda kv: -kv[1]))
+
+def split_sections(text: str) -> Dict[str, str]:
+    """
+    Section name -> body text, from heading lines like "EXPERIENCE" or "Skills:".
+    """
+    sections: Dict[str, str] = {}
+    matches = list(_HEADING.finditer(text))
+    for i, match in enumerate(matches):
+        name = next(n for n in SECTION_HEADINGS if match.group(n))
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        sections[name] = sections.get(name, "") + text[match.end():end]
+    return sections
+
+def sections_completeness(text: str, sections: Optional[Dict[str, str]] = None) -> Dict[str, int]:
+    """
+    0-100 per section: 0 when missing, otherwise 50 plus up to 50 for the amount of content.
+    Contact info scores email, phone and LinkedIn presence.
+    """
+    sections = split_sections(text) if sections is None else sections
+    completeness = {
+        "contact": 40 * bool(_EMAIL.search(text)) + 30 * bool(_PHONE.search(text)) + 30 * bool(_LINKEDIN.search(text)),
+    }
+    for name, expected in SECTION_EXPECTED_WORDS.items():
+        body = sections.get(name)
+        if body is None:
+            completeness[name] = 0
+        else:
+            completeness[name] = min(100, 50 + int(50 * len(words(body)) / expected))
+    return completeness
+
+def _bullet_lines(text: str) -> List[str]:
+    bullets = [line for line in text.splitlines() if _BULLET.match(line)]
+    return bullets or [line for line in text.splitlines() if len(words(line)) >= 6]
+
+def _starts_with_action_verb(line: str) -> bool:
+    first = words(_BULLET.sub("", line))[:1]
+    return bool(first) and first[0].lower() in ACTION_VERBS
+
+def _band_score(value: float, low: float, high: float, floor: float, ceiling: float) -> float:
+    """
+    1.0 inside [low, high], falling linearly to 0 at floor / ceiling.
+    """
+    if low <= value <= high:
+        return 1.0
+    if value < low:
+        return max(0.0, (value - floor) / (low - floor))
+    return max(0.0, (ceiling - value) / (ceiling - high))
+
+def analyze_resume_text(resume_text: str, target_role: str) -> ResumeMetrics:
+    """
+    Exact, deterministic resume metrics, plus an ATS score built from them: section
+    completeness 30%, role keyword coverage 30%, quantified bullets 10%, action verbs 10%,
+    length 10% and readability 10%.
+    """
+    word_list = words(resume_text)
+    word_count = len(word_list)
+    readability = flesch_reading_ease(resume_text)
+    terms = role_terms(target_role)
+    density = keyword_density(resume_text, terms)
+    completeness = sections_completeness(resume_text)
+
+    bullets = _bullet_lines(resume_text)
+    quantified = sum(1 for b in bullets if _QUANTIFIED.search(b)) / len(bullets) if bullets else 0.0
+    action = sum(1 for b in bullets if _starts_with_action_verb(b)) / len(bullets) if bullets else 0.0
+    coverage = len(density) / len(terms) if terms else 0.0
+    core_sections = ("contact", "summary", "experience", "education", "skills")
+
+    ats = (
+        30 * sum(completeness[s] for s in core_sections) / (100 * len(core_sections))
+        + 30 * min(1.0, coverage * 1.5)  # nobody lists every term; two thirds counts as full
+        + 10 * min(1.0, quantified * 2)
+        + 10 * min(1.0, action * 1.5)
+        + 10 * _band_score(word_count, 350, 900, 100, 1600)
+        + 10 * _band_score(readability, 30, 65, 0, 90)
+    )
+    return ResumeMetrics(
+        ats_score=int(round(ats)),
+        word_count=word_count,
+        readability_score=readability,
+        keyword_density=density,
+        sections_completeness=completeness,
+        role_terms_found=list(density),
+        role_terms_missing=[t for t in terms if t not in density],
+    )
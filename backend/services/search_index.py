@@ -0,0 +1,440 @@
+# backend/services/search_index.py
+import os
+import json
+import asyncio
+import math
+import struct
+from array import array
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+from services.job_ranker import analyze_terms
+from services.keyword_matcher import KNOWN_SKILLS
+
+# SEARCH_INDEX_DIR: where the index lives (one directory per process; don't share it
+# between workers). SEARCH_INDEX_COMPACT_AFTER: logged updates before they are folded
+# into the segment file.
+SEARCH_INDEX_DIR = os.getenv("SEARCH_INDEX_DIR") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "search_index"
+)
+SEARCH_INDEX_COMPACT_AFTER = int(os.getenv("SEARCH_INDEX_COMPACT_AFTER", "2000"))
+
+# Term frequencies are weighted by the field they occur in (a simple BM25F)
+FIELD_WEIGHTS = {"skills": 3.0, "titles": 2.0, "bullets": 1.0}
+BM25_K1 = 1.2
+BM25_B = 0.75
+QUERY_SKILL_BOOST = 2.0
+MAX_QUERY_TERMS = 64
+
+# segment.bin: header padded to 32 bytes, then term_start u64[terms + 1], doc_length
+# f32[docs], posting_docs u32[postings], posting_tf f32[postings], then UTF-8 JSON metadata
+# (terms, resume ids, user ids, titles). Postings of a term are sorted by doc id.
+_MAGIC = b"RIDX"
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sHHIIQI")  # magic, format version, reserved, docs, terms, postings, metadata bytes
+_HEADER_SIZE = 32
+_SEGMENT_FILE = "segment.bin"
+_LOG_FILE = "updates.log"
+
+class SearchHit(NamedTuple):
+    resume_id: str
+    user_id: Optional[str]
+    title: str
+    score: float
+    matched_terms: List[str]
+
+def _strings(value) -> List[str]:
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, list):
+        return [v for item in value for v in _strings(item)]
+    return []
+
+def resume_fields(content: dict) -> Dict[str, List[str]]:
+    """
+    The searchable text of a saved resume (the `content` JSON of the resumes table):
+    skills, titles (target role and job titles) and bullet text.
+    """
+    experience = [e for e in content.get("experience") or [] if isinstance(e, dict)]
+    projects = [p for p in content.get("projects") or [] if isinstance(p, dict)]
+    bullets = _strings(content.get("summary"))
+    for e in experience:
+        bullets += _strings(e.get("bullet_points")) or _strings(e.get("description"))
+    bullets += [d for p in projects for d in _strings(p.get("description"))]
+    return {
+        "skills": _strings(content.get("skills")) + _strings(content.get("soft_skills")) + _strings(content.get("certifications")),
+        "titles": _strings(content.get("target_role")) + [t for e in experience for t in _strings(e.get("title"))],
+        "bullets": bullets,
+    }
+
+def document_terms(content: dict) -> Dict[str, float]:
+    """
+    Field-weighted term frequencies of a saved resume.
+    """
+    weighted: Dict[str, float] = {}
+    for field, texts in resume_fields(content).items():
+        weight = FIELD_WEIGHTS[field]
+        for text in texts:
+            for term in analyze_terms(text):
+                weighted[term] = weighted.get(term, 0.0) + weight
+    return weighted
+
+class ResumeSearchIndex:
+    """
+    Incremental inverted index over saved resumes, ranked with BM25.
+
+    The bulk of the postings sits in an immutable, memory-mapped segment file of flat
+    arrays. Updates since the last compaction live in small in-memory postings arrays and
+    are appended to an update log, so a save costs one log line instead of a rebuild and a
+    restart replays the log. An updated resume gets a new doc id and its old one is marked
+    dead; compaction drops dead docs and rewrites the segment once the log grows past
+    `compact_after` entries.
+
+    Request handlers use the *_async methods: updates wait on a lock while a compaction is
+    running, and the segment is written in a worker thread, so searches keep being served
+    from the old segment meanwhile. The plain methods are for scripts without an event loop.
+    """
+
+    def __init__(self, directory: str, compact_after: int = SEARCH_INDEX_COMPACT_AFTER):
+        self.directory = directory
+        self.compact_after = compact_after
+        self._reset()
+        self.last_compaction: Optional[float] = None
+        self.enabled = True
+        self._lock = asyncio.Lock()
+        self._compaction: Optional[asyncio.Task] = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            self._load_segment()
+            self._replay_log()
+        except (OSError, ValueError) as e:
+            print(f"⚠ Resume search index disabled, could not load {directory}: {e}")
+            self._reset()
+            self.enabled = False
+
+    def _reset(self) -> None:
+        # Segment (memory-mapped) postings: term -> (start, end) into the posting arrays
+        self._segment_terms: Dict[str, Tuple[int, int]] = {}
+        self._segment_docs = np.zeros(0, dtype=np.uint32)
+        self._segment_tf = np.zeros(0, dtype=np.float32)
+        self._segment_size = 0
+        # Postings added since the segment was written
+        self._delta: Dict[str, Tuple[array, array]] = {}
+        self._delta_postings = 0
+        # Per doc id
+        self._resume_ids: List[Optional[str]] = []
+        self._user_ids: List[Optional[str]] = []
+        self._titles: List[str] = []
+        self._lengths = array("f")
+        self._live = bytearray()
+        self._doc_of: Dict[str, int] = {}  # resume id -> live doc id
+        self._live_length = 0.0
+        self._log_entries = 0
+
+    # ---- Persistence ----
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _load_segment(self) -> None:
+        path = self._path(_SEGMENT_FILE)
+        if not os.path.exists(path):
+            return
+        raw = np.memmap(path, dtype=np.uint8, mode="r")
+        if len(raw) < _HEADER_SIZE:
+            raise ValueError(f"{_SEGMENT_FILE} is truncated")
+        magic, version, _, docs, terms, postings, metadata_size = _HEADER.unpack(bytes(raw[:_HEADER.size]))
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            raise ValueError(f"{_SEGMENT_FILE} is not a version {_FORMAT_VERSION} resume index segment")
+        offset = _HEADER_SIZE
+
+        def view(dtype, count: int) -> np.ndarray:
+            nonlocal offset
+            size = np.dtype(dtype).itemsize * count
+            if offset + size > len(raw):
+                raise ValueError(f"{_SEGMENT_FILE} is truncated")
+            arr = raw[offset:offset + size].view(np.dtype(dtype).newbyteorder("<"))
+            offset += size
+            return arr
+
+        term_start = view(np.uint64, terms + 1)
+        lengths = view(np.float32, docs)
+        self._segment_docs = view(np.uint32, postings)
+        self._segment_tf = view(np.float32, postings)
+        metadata = json.loads(bytes(raw[offset:offset + metadata_size]).decode("utf-8"))
+
+        self._segment_terms = {
+            term: (int(term_start[i]), int(term_start[i + 1])) for i, term in enumerate(metadata["terms"])
+        }
+        self._segment_size = docs
+        self._resume_ids = metadata["resume_ids"]
+        self._user_ids = metadata["user_ids"]
+        self._titles = metadata["titles"]
+        self._lengths = array("f")
+        self._lengths.frombytes(lengths.astype(np.float32).tobytes())
+        self._live = bytearray(b"\x01" * docs)
+        self._doc_of = {rid: i for i, rid in enumerate(self._resume_ids)}
+        self._live_length = float(lengths.sum(dtype=np.float64))
+        self.last_compaction = os.path.getmtime(path)
+
+    def _replay_log(self) -> None:
+        path = self._path(_LOG_FILE)
+        if not os.path.exists(path):
+            return
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A write cut short by a crash; everything before it is intact
+                    break
+                self._apply(entry)
+                self._log_entries += 1
+
+    def _append_log(self, entry: dict) -> None:
+        with open(self._path(_LOG_FILE), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._log_entries += 1
+
+    # ---- Updates ----
+
+    def _apply(self, entry: dict) -> None:
+        self._remove(entry["id"])
+        if entry["op"] == "upsert":
+            self._add(entry["id"], entry.get("user_id"), entry.get("title") or "", entry["terms"])
+
+    def _remove(self, resume_id: str) -> None:
+        doc = self._doc_of.pop(resume_id, None)
+        if doc is not None and self._live[doc]:
+            self._live[doc] = 0
+            self._live_length -= self._lengths[doc]
+
+    def _add(self, resume_id: str, user_id: Optional[str], title: str, terms: Dict[str, float]) -> None:
+        doc = len(self._resume_ids)
+        self._resume_ids.append(resume_id)
+        self._user_ids.append(user_id)
+        self._titles.append(title)
+        length = float(sum(terms.values()))
+        self._lengths.append(length)
+        self._live.append(1)
+        self._doc_of[resume_id] = doc
+        self._live_length += length
+        for term, tf in terms.items():
+            postings = self._delta.get(term)
+            if postings is None:
+                postings = self._delta[term] = (array("I"), array("f"))
+            postings[0].append(doc)
+            postings[1].append(tf)
+        self._delta_postings += len(terms)
+
+    def _record(self, entry: dict) -> None:
+        self._apply(entry)
+        self._append_log(entry)
+
+    @property
+    def compaction_due(self) -> bool:
+        return self._log_entries >= self.compact_after
+
+    def upsert(self, resume_id: str, title: str, content: dict, user_id: Optional[str] = None) -> None:
+        self._record({"op": "upsert", "id": resume_id, "user_id": user_id, "title": title, "terms": document_terms(content)})
+        if self.compaction_due:
+            self.compact()
+
+    def delete(self, resume_id: str) -> bool:
+        if resume_id not in self._doc_of:
+            return False
+        self._record({"op": "delete", "id": resume_id})
+        if self.compaction_due:
+            self.compact()
+        return True
+
+    async def upsert_async(self, resume_id: str, title: str, content: dict, user_id: Optional[str] = None) -> None:
+        entry = {"op": "upsert", "id": resume_id, "user_id": user_id, "title": title, "terms": document_terms(content)}
+        async with self._lock:
+            self._record(entry)
+        self._schedule_compaction()
+
+    async def delete_async(self, resume_id: str) -> bool:
+        async with self._lock:
+            if resume_id not in self._doc_of:
+                return False
+            self._record({"op": "delete", "id": resume_id})
+        self._schedule_compaction()
+        return True
+
+    def _schedule_compaction(self) -> None:
+        # In the background, so the update that crosses the threshold isn't the one that waits
+        if self.compaction_due and (self._compaction is None or self._compaction.done()):
+            self._compaction = asyncio.create_task(self._background_compaction())
+
+    async def _background_compaction(self) -> None:
+        try:
+            await self.compact_async()
+        except OSError as e:
+            print(f"⚠ Resume search index compaction failed, updates stay in the log: {e}")
+
+    def _postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        docs, tfs = [], []
+        span = self._segment_terms.get(term)
+        if span is not None:
+            docs.append(self._segment_docs[span[0]:span[1]])
+            tfs.append(self._segment_tf[span[0]:span[1]])
+        delta = self._delta.get(term)
+        if delta is not None:
+            docs.append(np.frombuffer(delta[0], dtype=np.uint32))
+            tfs.append(np.frombuffer(delta[1], dtype=np.float32))
+        if not docs:
+            return np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.float32)
+        if len(docs) == 1:
+            return docs[0], tfs[0]
+        return np.concatenate(docs), np.concatenate(tfs)
+
+    def compact(self) -> None:
+        """
+        Write every live doc into a new segment (renumbered densely, postings sorted by doc
+        id) and truncate the update log. The new file replaces the old one atomically; if
+        the process dies before the log is truncated, replaying it again is harmless.
+        """
+        self._install_segment(self._write_segment())
+
+    async def compact_async(self) -> None:
+        """
+        compact() without blocking the event loop: the segment is written in a worker thread
+        while updates wait on the lock, then swapped in.
+        """
+        async with self._lock:
+            if not self._log_entries:
+                return
+            tmp_path = await asyncio.to_thread(self._write_segment)
+            self._install_segment(tmp_path)
+
+    def _write_segment(self) -> str:
+        """
+        Write the live docs to a temporary segment file and return its path. Only reads the
+        index, so searches can run alongside it.
+        """
+        live = np.frombuffer(self._live, dtype=np.uint8).astype(bool)
+        remap = np.cumsum(live, dtype=np.int64) - 1
+        keep_docs = np.flatnonzero(live)
+
+        terms: List[str] = []
+        starts = [0]
+        doc_parts: List[np.ndarray] = []
+        tf_parts: List[np.ndarray] = []
+        for term in set(self._segment_terms) | set(self._delta):
+            docs, tfs = self._postings(term)
+            alive = live[docs]
+            if not alive.any():
+                continue
+            terms.append(term)
+            doc_parts.append(remap[docs[alive]].astype(np.uint32))
+            tf_parts.append(tfs[alive].astype(np.float32))
+            starts.append(starts[-1] + int(alive.sum()))
+
+        lengths = np.frombuffer(self._lengths, dtype=np.float32)[keep_docs]
+        metadata = json.dumps(
+            {
+                "terms": terms,
+                "resume_ids": [self._resume_ids[i] for i in keep_docs],
+                "user_ids": [self._user_ids[i] for i in keep_docs],
+                "titles": [self._titles[i] for i in keep_docs],
+            },
+            separators=(",", ":"),
+        ).encode("utf-8")
+        header = _HEADER.pack(_MAGIC, _FORMAT_VERSION, 0, len(keep_docs), len(terms), starts[-1], len(metadata))
+
+        path = self._path(_SEGMENT_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(header.ljust(_HEADER_SIZE, b"\0"))
+            f.write(np.asarray(starts, dtype="<u8").tobytes())
+            f.write(lengths.astype("<f4").tobytes())
+            for part in doc_parts:
+                f.write(part.astype("<u4").tobytes())
+            for part in tf_parts:
+                f.write(part.astype("<f4").tobytes())
+            f.write(metadata)
+            f.flush()
+            os.fsync(f.fileno())
+        return tmp_path
+
+    def _install_segment(self, tmp_path: str) -> None:
+        path = self._path(_SEGMENT_FILE)
+        self._reset()
+        os.replace(tmp_path, path)
+        open(self._path(_LOG_FILE), "w").close()
+        self._load_segment()
+
+    # ---- Queries ----
+
+    def search(self, query: str, limit: int = 20) -> List[SearchHit]:
+        """
+        Live resumes ranked by BM25 against the terms of `query` (typically a job
+        description). Query terms are weighted by log frequency, known skills extra.
+        """
+        counts = Counter(analyze_terms(query))
+        weights = {
+            term: (1 + math.log(count)) * (QUERY_SKILL_BOOST if term in KNOWN_SKILLS else 1.0)
+            for term, count in counts.items()
+        }
+        query_terms = sorted(weights, key=lambda t: -weights[t])[:MAX_QUERY_TERMS]
+        live_docs = len(self._doc_of)
+        if not query_terms or not live_docs:
+            return []
+
+        live = np.frombuffer(self._live, dtype=np.uint8).astype(bool)
+        lengths = np.frombuffer(self._lengths, dtype=np.float32)
+        avg_length = self._live_length / live_docs or 1.0
+        scores = np.zeros(len(live), dtype=np.float32)
+        matched: List[Tuple[str, np.ndarray]] = []
+        for term in query_terms:
+            docs, tfs = self._postings(term)
+            if not len(docs):
+                continue
+            alive = live[docs]
+            docs, tfs = docs[alive], tfs[alive]
+            df = len(docs)
+            if not df:
+                continue
+            idf = math.log(1 + (live_docs - df + 0.5) / (df + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[docs] / avg_length)
+            scores[docs] += weights[term] * idf * tfs * (BM25_K1 + 1) / (tfs + norm)
+            matched.append((term, docs))
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        top = candidates[np.argsort(-scores[candidates], kind="stable")]
+        hits = []
+        for doc in top:
+            hits.append(SearchHit(
+                resume_id=self._resume_ids[doc],
+                user_id=self._user_ids[doc],
+                title=self._titles[doc],
+                score=round(float(scores[doc]), 4),
+                matched_terms=[term for term, docs in matched if _contains(docs, doc)],
+            ))
+        return hits
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "directory": self.directory,
+            "resumes": len(self._doc_of),
+            "dead_docs": len(self._resume_ids) - len(self._doc_of),
+            "segment_docs": self._segment_size,
+            "segment_terms": len(self._segment_terms),
+            "segment_postings": len(self._segment_docs),
+            "delta_terms": len(self._delta),
+            "delta_postings": self._delta_postings,
+            "log_entries": self._log_entries,
+            "compact_after": self.compact_after,
+            "last_compaction": self.last_compaction,
+        }
+
+def _contains(sorted_docs: np.ndarray, doc: int) -> bool:
+    # Segment and delta postings are each sorted, and delta doc ids all come after the segment's
+    i = np.searchsorted(sorted_docs, doc)
+    return i < len(sorted_docs) and sorted_docs[i] == doc
+
+resume_search_index = ResumeSearchIndex(SEARCH_INDEX_DIR)
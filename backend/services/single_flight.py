@@ -0,0 +1,68 @@
+# backend/services/single_flight.py
+import asyncio
+from typing import Awaitable, Callable, Dict
+
+class _Call:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical requests into one upstream call.
+
+    The first caller for a key (the leader) starts the work as a task; callers that arrive
+    with the same key while it is in flight await that same task and get its result or
+    exception. The key is forgotten as soon as the task finishes, so later requests start
+    fresh (caching completed results is the job of the response cache).
+
+    Followers don't make a call of their own, so the work runs under the leader's request
+    context (deadline, client identity); a follower with a later deadline can still get the
+    leader's timeout.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable]):
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _t, k=key, c=call: self._forget(k, c))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            # Shield so one caller going away doesn't cancel the work for the others
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            # The last interested caller left: nobody needs the result anymore
+            if call.waiters == 1 and not call.task.done():
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Mark the exception as retrieved if every waiter was cancelled before it finished
+        if not call.task.cancelled():
+            call.task.exception()
+
+    def stats(self) -> dict:
+        total = self.leaders + self.coalesced
+        return {
+            "upstream_calls": self.leaders,
+            "coalesced_calls": self.coalesced,
+            "coalesced_rate": round(self.coalesced / total, 4) if total else 0.0,
+            "in_flight": len(self._calls),
+        }
+
+# Process-wide single-flight group for LLM requests
+llm_single_flight = SingleFlight()
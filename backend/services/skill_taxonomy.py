@@ -0,0 +1,342 @@
+# backend/services/skill_taxonomy.py
+import os
+import sys
+import re
+import json
+import struct
+import hashlib
+from array import array
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+TAXONOMY_PATH = os.path.join(DATA_DIR, "skill_taxonomy.json")
+ARTIFACT_PATH = os.path.join(DATA_DIR, "skill_taxonomy.bin")
+
+# Artifact layout: header, then little-endian arrays in this order:
+#   edge_start[nodes + 1], edge_chars[edges], edge_targets[edges]  (trie edges, CSR by node)
+#   fail[nodes], output[nodes], dict_link[nodes]                     (Aho-Corasick links)
+#   pattern_skill[patterns]
+# and finally UTF-8 JSON metadata (skill names, categories, pattern strings, list-only
+# pattern ids, source hash).
+_MAGIC = b"SKAC"
+_FORMAT_VERSION = 2
+_HEADER = struct.Struct("<4sHHIIII")  # magic, format version, reserved, nodes, edges, patterns, metadata bytes
+# What may separate two items of a skill list: "Python, Go", "C/C++", "Ruby and Rust"
+_LIST_GAP = re.compile(r"\s*(?:[,/|;·•&+]|,?\s*(?:and|or))\s*")
+
+class SkillMatch(NamedTuple):
+    skill: str
+    category: str
+    count: int
+    matched_terms: List[str]
+
+def normalize(text: str) -> str:
+    """
+    Lowercase and collapse whitespace, so "Machine\\n  Learning" matches "machine learning".
+    """
+    return " ".join(text.lower().split())
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum()
+
+def _u32(values) -> array:
+    arr = array("I", values)
+    assert arr.itemsize == 4
+    return arr
+
+def _i32(values) -> array:
+    arr = array("i", values)
+    assert arr.itemsize == 4
+    return arr
+
+class SkillTaxonomy:
+    """
+    Aho-Corasick automaton over every alias of every canonical skill, so extraction is a
+    single pass over the text whatever the size of the taxonomy.
+
+    The automaton is kept in flat arrays (trie edges in CSR form plus failure, output and
+    dictionary links) that are written to and read from the binary artifact as-is; only
+    the per-node edge dicts used while scanning are rebuilt on load.
+
+    List-only patterns are skill names that are also everyday words or first names ("Go",
+    "Swift", "Julia"): they only count inside a list that names another skill on its own.
+    """
+
+    def __init__(
+        self,
+        skills: List[str],
+        categories: List[str],
+        patterns: List[str],
+        pattern_skill: array,
+        edge_start: array,
+        edge_chars: array,
+        edge_targets: array,
+        fail: array,
+        output: array,
+        dict_link: array,
+        source_hash: Optional[str] = None,
+        list_only: Iterable[int] = (),
+    ):
+        self.skills = skills
+        self.categories = categories
+        self.patterns = patterns
+        self.source_hash = source_hash
+        self.list_only = frozenset(list_only)
+        self._pattern_skill = pattern_skill
+        self._edge_start = edge_start
+        self._edge_chars = edge_chars
+        self._edge_targets = edge_targets
+        self._fail = fail
+        self._output = output
+        self._dict_link = dict_link
+        self._goto: List[Dict[str, int]] = [
+            {chr(edge_chars[e]): edge_targets[e] for e in range(edge_start[n], edge_start[n + 1])}
+            for n in range(len(fail))
+        ]
+
+    @property
+    def node_count(self) -> int:
+        return len(self._fail)
+
+    def scan(self, text: str) -> List[Tuple[int, int, int]]:
+        """
+        (start, end, pattern id) of every alias occurrence in the normalized text that sits
+        on word boundaries, longest first among those starting at the same place, with
+        overlaps resolved leftmost-longest ("react native" is not also "react").
+        """
+        return self._scan_normalized(normalize(text))
+
+    def _scan_normalized(self, text: str) -> List[Tuple[int, int, int]]:
+        goto, fail, output, dict_link = self._goto, self._fail, self._output, self._dict_link
+        patterns = self.patterns
+        length = len(text)
+        hits = []
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            node = state if output[state] >= 0 else dict_link[state]
+            while node >= 0:
+                pattern_id = output[node]
+                end = i + 1
+                start = end - len(patterns[pattern_id])
+                if (start == 0 or not _is_word_char(text[start - 1])) and (end == length or not _is_word_char(text[end])):
+                    hits.append((start, end, pattern_id))
+                node = dict_link[node]
+
+        hits.sort(key=lambda h: (h[0], -h[1]))
+        selected = []
+        covered_until = 0
+        for start, end, pattern_id in hits:
+            if start >= covered_until:
+                selected.append((start, end, pattern_id))
+                covered_until = end
+        return selected
+
+    def extract(self, text: str) -> List[SkillMatch]:
+        """
+        Canonical skills mentioned in `text`, most mentioned first (ties in order of first
+        mention), with the aliases that matched.
+        """
+        counts: Dict[int, int] = {}
+        terms: Dict[int, List[str]] = {}
+        for pattern_id in self._accepted(normalize(text)):
+            skill_id = self._pattern_skill[pattern_id]
+            counts[skill_id] = counts.get(skill_id, 0) + 1
+            matched = terms.setdefault(skill_id, [])
+            if self.patterns[pattern_id] not in matched:
+                matched.append(self.patterns[pattern_id])
+        ordered = sorted(counts, key=lambda s: -counts[s])
+        return [SkillMatch(self.skills[s], self.categories[s], counts[s], terms[s]) for s in ordered]
+
+    def _accepted(self, text: str) -> List[int]:
+        """
+        Pattern ids of the hits in normalized `text`, minus list-only hits whose run of
+        list-separated hits has no other kind: "Python, Go and Rust" keeps all three, "ready
+        to go" and "Julia Ruby" keep none.
+        """
+        accepted: List[int] = []
+        run: List[int] = []
+        run_end = 0
+        for start, end, pattern_id in self._scan_normalized(text):
+            if run and not _LIST_GAP.fullmatch(text, run_end, start):
+                accepted.extend(self._settle(run))
+                run = []
+            run.append(pattern_id)
+            run_end = end
+        accepted.extend(self._settle(run))
+        return accepted
+
+    def _settle(self, run: List[int]) -> List[int]:
+        if all(p in self.list_only for p in run):
+            return []
+        return run
+
+    def aliases(self) -> Dict[str, List[str]]:
+        """
+        Canonical skill -> the patterns that match it on their own (normalized name first,
+        unless it's list-only). A skill with no such pattern maps to an empty list.
+        """
+        result: Dict[str, List[str]] = {name: [] for name in self.skills}
+        for pattern_id, pattern in enumerate(self.patterns):
+            if pattern_id not in self.list_only:
+                result[self.skills[self._pattern_skill[pattern_id]]].append(pattern)
+        return result
+
+    def to_bytes(self) -> bytes:
+        metadata = json.dumps(
+            {
+                "skills": self.skills, "categories": self.categories, "patterns": self.patterns,
+                "list_only": sorted(self.list_only), "source_sha256": self.source_hash,
+            },
+            separators=(",", ":"),
+        ).encode("utf-8")
+        arrays = [self._edge_start, self._edge_chars, self._edge_targets, self._fail, self._output, self._dict_link, self._pattern_skill]
+        body = []
+        for arr in arrays:
+            if sys.byteorder == "big":
+                arr = array(arr.typecode, arr)
+                arr.byteswap()
+            body.append(arr.tobytes())
+        header = _HEADER.pack(_MAGIC, _FORMAT_VERSION, 0, self.node_count, len(self._edge_chars), len(self.patterns), len(metadata))
+        return header + b"".join(body) + metadata
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SkillTaxonomy":
+        if len(data) < _HEADER.size:
+            raise ValueError("skill taxonomy artifact is truncated")
+        magic, version, _, nodes, edges, pattern_count, metadata_size = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            raise ValueError(f"not a version {_FORMAT_VERSION} skill taxonomy artifact")
+        offset = _HEADER.size
+
+        def read(typecode: str, count: int) -> array:
+            nonlocal offset
+            arr = array(typecode)
+            size = arr.itemsize * count
+            if offset + size > len(data):
+                raise ValueError("skill taxonomy artifact is truncated")
+            arr.frombytes(data[offset:offset + size])
+            if sys.byteorder == "big":
+                arr.byteswap()
+            offset += size
+            return arr
+
+        edge_start = read("I", nodes + 1)
+        edge_chars = read("I", edges)
+        edge_targets = read("I", edges)
+        fail = read("I", nodes)
+        output = read("i", nodes)
+        dict_link = read("i", nodes)
+        pattern_skill = read("I", pattern_count)
+        metadata = json.loads(data[offset:offset + metadata_size].decode("utf-8"))
+        return cls(
+            metadata["skills"], metadata["categories"], metadata["patterns"], pattern_skill,
+            edge_start, edge_chars, edge_targets, fail, output, dict_link, metadata.get("source_sha256"),
+            metadata.get("list_only", ()),
+        )
+
+def compile_taxonomy(taxonomy: dict, source_hash: Optional[str] = None) -> SkillTaxonomy:
+    """
+    Build the automaton from taxonomy JSON ({"skills": {name: {"category", "aliases",
+    "match_name"}}}). A skill's own name matches on its own unless match_name is false (for
+    names that are everyday words or first names, like "Go" or "Julia"); then it's list-only
+    and the aliases carry the skill in prose. An alias claimed by two skills is an error.
+    """
+    skills: List[str] = []
+    categories: List[str] = []
+    patterns: List[str] = []
+    pattern_skill: List[int] = []
+    list_only: List[int] = []
+    owner: Dict[str, int] = {}
+    for name, entry in taxonomy["skills"].items():
+        skill_id = len(skills)
+        skills.append(name)
+        categories.append(entry["category"])
+        match_name = entry.get("match_name", True)
+        terms = [(name, False)] if match_name else []
+        terms += [(alias, False) for alias in entry.get("aliases", [])]
+        if not match_name:
+            terms.append((name, True))
+        for term, is_list_only in terms:
+            pattern = normalize(term)
+            if pattern in owner:
+                if owner[pattern] != skill_id:
+                    raise ValueError(f"alias {term!r} of {name!r} already belongs to {skills[owner[pattern]]!r}")
+                continue
+            owner[pattern] = skill_id
+            if is_list_only:
+                list_only.append(len(patterns))
+            patterns.append(pattern)
+            pattern_skill.append(skill_id)
+
+    goto: List[Dict[str, int]] = [{}]
+    output = [-1]
+    for pattern_id, pattern in enumerate(patterns):
+        node = 0
+        for ch in pattern:
+            child = goto[node].get(ch)
+            if child is None:
+                child = len(goto)
+                goto.append({})
+                output.append(-1)
+                goto[node][ch] = child
+            node = child
+        output[node] = pattern_id
+
+    # Failure links point at the longest proper suffix that is also a trie path; dictionary
+    # links skip along them to the next node that ends a pattern
+    fail = [0] * len(goto)
+    dict_link = [-1] * len(goto)
+    queue = deque(goto[0].values())
+    while queue:
+        node = queue.popleft()
+        for ch, child in goto[node].items():
+            target = fail[node]
+            while target and ch not in goto[target]:
+                target = fail[target]
+            fail[child] = goto[target].get(ch, 0)
+            dict_link[child] = fail[child] if output[fail[child]] >= 0 else dict_link[fail[child]]
+            queue.append(child)
+
+    edge_start = [0]
+    edge_chars: List[int] = []
+    edge_targets: List[int] = []
+    for edges in goto:
+        for ch in sorted(edges):
+            edge_chars.append(ord(ch))
+            edge_targets.append(edges[ch])
+        edge_start.append(len(edge_chars))
+    return SkillTaxonomy(
+        skills, categories, patterns, _u32(pattern_skill),
+        _u32(edge_start), _u32(edge_chars), _u32(edge_targets), _u32(fail), _i32(output), _i32(dict_link), source_hash,
+        list_only,
+    )
+
+def file_sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def load_skill_taxonomy(artifact_path: str = ARTIFACT_PATH, source_path: str = TAXONOMY_PATH) -> SkillTaxonomy:
+    """
+    The precompiled artifact, unless it's missing, unreadable or was built from a different
+    version of the taxonomy JSON; then the JSON is compiled in memory instead.
+    """
+    source_hash = file_sha256(source_path) if os.path.exists(source_path) else None
+    try:
+        with open(artifact_path, "rb") as f:
+            taxonomy = SkillTaxonomy.from_bytes(f.read())
+        if source_hash is None or taxonomy.source_hash == source_hash:
+            return taxonomy
+        print(f"⚠ {os.path.basename(artifact_path)} is stale, compiling the skill taxonomy in memory (run scripts/build_skill_index.py)")
+    except (OSError, ValueError) as e:
+        print(f"⚠ Could not load {os.path.basename(artifact_path)} ({e}), compiling the skill taxonomy in memory")
+    with open(source_path, encoding="utf-8") as f:
+        return compile_taxonomy(json.load(f), source_hash)
+
+skill_taxonomy = load_skill_taxonomy()
+
+def extract_skills(text: str) -> List[SkillMatch]:
+    return skill_taxonomy.extract(text)
@@ -0,0 +1,144 @@
+# backend/services/streaming.py
+import json
+
+# Headers for event streams: no caching, and no proxy buffering (nginx/Railway/Vercel)
+STREAM_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+def format_sse(event: str, data) -> str:
+    """
+    Encode one Server-Sent Events message. `data` is JSON-encoded on a single line.
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def format_ndjson(event: str, data) -> str:
+    """
+    Encode one newline-delimited JSON message: {"event": ..., "data": ...}.
+    """
+    return json.dumps({"event": event, "data": data}, ensure_ascii=False) + "\n"
+
+_HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+_SIMPLE_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+class JSONStringFieldStreamer:
+    """
+    Incrementally extracts the value of one top-level string field from a JSON document
+    that arrives in arbitrary chunks, e.g. {"cover_letter": "Dear ...", ...}.
+
+    feed() returns the newly decoded characters of that field's value (escapes resolved,
+    including \\uXXXX sequences and surrogate pairs split across chunks), so the text can be
+    relayed while the rest of the object is still being generated. Malformed escapes (bad
+    hex digits, unpaired surrogates) are relayed as the literal text the model wrote; call
+    close() at the end of the stream to flush an escape cut off by truncation.
+    """
+
+    def __init__(self, field: str):
+        self.field = field
+        self.done = False
+        self._depth = 0
+        self._in_string = False
+        self._is_key = False
+        self._capturing = False
+        self._after_colon = False
+        self._key_chars = []
+        self._last_key = None
+        self._escape = None  # None, or the escape sequence collected so far (without the backslash)
+        self._high_surrogate = None  # (code, escape) of a \uD800-\uDBFF awaiting its low half
+
+    def feed(self, chunk: str) -> str:
+        out = []
+        for ch in chunk:
+            if self._in_string:
+                self._feed_string_char(ch, out)
+            elif ch == '"':
+                self._in_string = True
+                self._is_key = self._depth == 1 and not self._after_colon
+                self._capturing = (
+                    self._depth == 1 and self._after_colon and self._last_key == self.field and not self.done
+                )
+                self._key_chars = []
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+            elif ch == ":" and self._depth == 1:
+                self._after_colon = True
+            elif ch == "," and self._depth == 1:
+                self._after_colon = False
+        return "".join(out)
+
+    def close(self) -> str:
+        """
+        The text of an escape left incomplete when the stream ended, as written.
+        """
+        out = []
+        if self._in_string:
+            self._flush_pending(out)
+        return "".join(out)
+
+    def _emit(self, text: str, out: list) -> None:
+        if self._capturing:
+            out.append(text)
+        elif self._is_key:
+            self._key_chars.append(text)
+
+    def _flush_surrogate(self, out: list) -> None:
+        if self._high_surrogate is not None:
+            self._emit("\\" + self._high_surrogate[1], out)
+            self._high_surrogate = None
+
+    def _flush_pending(self, out: list) -> None:
+        self._flush_surrogate(out)
+        if self._escape is not None:
+            self._emit("\\" + self._escape, out)
+            self._escape = None
+
+    def _feed_string_char(self, ch: str, out: list) -> None:
+        if self._escape is not None:
+            if self._escape[:1] == "u":
+                if ch not in _HEX_DIGITS:
+                    # Not a \uXXXX escape after all: keep what was written, then reread ch
+                    self._flush_pending(out)
+                    self._feed_string_char(ch, out)
+                    return
+                self._escape += ch
+                if len(self._escape) == 5:
+                    self._finish_unicode_escape(out)
+                return
+            self._escape += ch
+            if self._escape == "u":
+                return
+            self._flush_surrogate(out)
+            self._emit(_SIMPLE_ESCAPES.get(self._escape, self._escape), out)
+            self._escape = None
+        elif ch == "\\":
+            self._escape = ""
+        else:
+            self._flush_surrogate(out)
+            if ch == '"':
+                self._in_string = False
+                if self._is_key:
+                    self._last_key = "".join(self._key_chars)
+                if self._capturing:
+                    self._capturing = False
+                    self.done = True
+            else:
+                self._emit(ch, out)
+
+    def _finish_unicode_escape(self, out: list) -> None:
+        escape, self._escape = self._escape, None
+        code = int(escape[1:], 16)
+        if 0xD800 <= code <= 0xDBFF:
+            self._flush_surrogate(out)
+            self._high_surrogate = (code, escape)
+            return
+        if 0xDC00 <= code <= 0xDFFF:
+            if self._high_surrogate is None:
+                self._emit("\\" + escape, out)  # Lone low surrogate
+                return
+            code = 0x10000 + ((self._high_surrogate[0] - 0xD800) << 10) + (code - 0xDC00)
+            self._high_surrogate = None
+        self._flush_surrogate(out)
+        self._emit(chr(code), out)
@@ -0,0 +1,448 @@
+# backend/services/synonym_graph.py
+import os
+import json
+import time
+import sqlite3
+from collections import Counter, OrderedDict, deque
+from typing import Deque, Dict, List, NamedTuple, Optional, Tuple
+from services.keyword_matcher import extract_keywords, term_set, tokenize
+from services.resume_analytics import words
+from services.skill_taxonomy import DATA_DIR, skill_taxonomy
+
+SYNONYM_GRAPH_PATH = os.path.join(DATA_DIR, "synonym_graph.json")
+
+MAX_EXPANDED_KEYWORDS = 10
+OVERUSED_MIN_COUNT = 3
+# Occurrences per 100 words above which a repeated term reads as stuffing
+OVERUSED_DENSITY = 2.0
+MAX_REPLACEMENTS = 3
+MAX_SYNONYMS = 6
+# An LLM-suggested synonym joins the shared graph once answers for this many different
+# clients suggested it; until then only the client it was suggested for sees it
+LEARNED_SYNONYM_MIN_AGREEMENT = max(1, int(os.getenv("LEARNED_SYNONYM_MIN_AGREEMENT", "2")))
+# Learned synonyms and context notes (and pending suggestions) are forgotten after this long
+LEARNED_SYNONYM_TTL_SECONDS = float(os.getenv("LEARNED_SYNONYM_TTL_DAYS", "30")) * 86400
+MAX_PENDING_SYNONYM_TERMS = 5000
+
+class SynonymGraph:
+    """
+    Synonym / related-term graph stored as groups of interchangeable terms: a term's
+    synonyms are the other members of every group it is in. One group per synonym set
+    keeps the bundled file small (no edge per pair), and terms are interned so each group
+    is a tuple of ints.
+
+    Groups come from data/synonym_graph.json (action verbs, role titles), the skill
+    taxonomy (tool aliases) and LLM answers learned at runtime.
+    """
+
+    def __init__(self):
+        self._terms: List[str] = []  # display form, by id
+        self._ids: Dict[str, int] = {}  # lowercased term -> id
+        self._groups: List[Tuple[int, ...]] = []
+        self._group_kinds: List[str] = []
+        self._membership: Dict[int, List[int]] = {}  # term id -> group ids
+        self._contexts: Dict[int, Tuple[str, float]] = {}  # term id -> (note, learned at)
+        self._learned: Deque[Tuple[float, int, Optional[int]]] = deque()  # (learned at, term id, group id)
+        self.max_words = 1
+
+    def _intern(self, term: str) -> int:
+        key = " ".join(tokenize(term))
+        term_id = self._ids.get(key)
+        if term_id is None:
+            term_id = len(self._terms)
+            self._terms.append(term.strip())
+            self._ids[key] = term_id
+            self.max_words = max(self.max_words, len(key.split()))
+        return term_id
+
+    def _id(self, term: str) -> Optional[int]:
+        return self._ids.get(" ".join(tokenize(term)))
+
+    def add_group(self, terms: List[str], kind: str) -> Optional[int]:
+        ids = tuple(dict.fromkeys(self._intern(t) for t in terms if tokenize(t)))
+        if len(ids) < 2:
+            return None
+        group_id = len(self._groups)
+        self._groups.append(ids)
+        self._group_kinds.append(kind)
+        for term_id in ids:
+            self._membership.setdefault(term_id, []).append(group_id)
+        return group_id
+
+    def _drop_group(self, group_id: int) -> None:
+        for term_id in self._groups[group_id]:
+            groups = self._membership[term_id]
+            groups.remove(group_id)
+            if not groups:
+                del self._membership[term_id]
+        self._groups[group_id] = ()
+
+    def __contains__(self, term: str) -> bool:
+        term_id = self._id(term)
+        return term_id is not None and term_id in self._membership
+
+    def kind(self, term: str) -> Optional[str]:
+        term_id = self._id(term)
+        groups = self._membership.get(term_id, []) if term_id is not None else []
+        return self._group_kinds[groups[0]] if groups else None
+
+    def synonyms(self, term: str) -> List[str]:
+        term_id = self._id(term)
+        if term_id is None:
+            return []
+        related = {}
+        for group_id in self._membership.get(term_id, []):
+            for other in self._groups[group_id]:
+                if other != term_id:
+                    related.setdefault(other, None)
+        return [self._terms[i] for i in related]
+
+    def context(self, term: str) -> Optional[str]:
+        term_id = self._id(term)
+        note = self._contexts.get(term_id) if term_id is not None else None
+        return note[0] if note else None
+
+    def learned(self, term: str) -> List[str]:
+        """
+        The synonyms of `term` that came from learned groups.
+        """
+        term_id = self._id(term)
+        related = {}
+        for group_id in self._membership.get(term_id, []) if term_id is not None else []:
+            if self._group_kinds[group_id] == "learned":
+                for other in self._groups[group_id]:
+                    if other != term_id:
+                        related.setdefault(other, None)
+        return [self._terms[i] for i in related]
+
+    def learn(self, term: str, synonyms: List[str], context: Optional[str] = None, learned_at: Optional[float] = None) -> None:
+        """
+        Add agreed LLM synonyms as a learned group and keep the context note, both until
+        expire_learned() drops them.
+        """
+        learned_at = time.time() if learned_at is None else learned_at
+        known = {s.lower() for s in self.synonyms(term)}
+        new = [s for s in synonyms if s.lower() not in known and s.lower() != term.lower()]
+        group_id = self.add_group([term] + new, "learned") if new else None
+        term_id = self._intern(term)
+        if context:
+            self._contexts[term_id] = (context, learned_at)
+        if group_id is not None or context:
+            self._learned.append((learned_at, term_id, group_id))
+
+    def expire_learned(self, max_age: float = LEARNED_SYNONYM_TTL_SECONDS, now: Optional[float] = None) -> int:
+        """
+        Forget learned groups and context notes older than `max_age` seconds. Returns how many
+        learned entries were dropped.
+        """
+        cutoff = (time.time() if now is None else now) - max_age
+        dropped = 0
+        while self._learned and self._learned[0][0] < cutoff:
+            _, term_id, group_id = self._learned.popleft()
+            if group_id is not None:
+                self._drop_group(group_id)
+            note = self._contexts.get(term_id)
+            if note and note[1] < cutoff:
+                del self._contexts[term_id]
+            dropped += 1
+        return dropped
+
+    def find_terms(self, text: str) -> Counter:
+        """
+        Occurrences of graph terms in `text` (lowercased keys), longest match first so
+        "rolled out" is not also counted as a bare word elsewhere in the phrase.
+        """
+        counts: Counter = Counter()
+        for line in text.splitlines():
+            tokens = tokenize(line)
+            i = 0
+            while i < len(tokens):
+                for n in range(min(self.max_words, len(tokens) - i), 0, -1):
+                    key = " ".join(tokens[i:i + n])
+                    term_id = self._ids.get(key)
+                    if term_id is not None and term_id in self._membership:
+                        counts[key] += 1
+                        i += n
+                        break
+                else:
+                    i += 1
+        return counts
+
+    def display(self, term: str) -> str:
+        term_id = self._id(term)
+        return self._terms[term_id] if term_id is not None else term
+
+    def stats(self) -> dict:
+        kinds = Counter(kind for group, kind in zip(self._groups, self._group_kinds) if group)
+        return {
+            "terms": len(self._membership),
+            "groups": sum(kinds.values()),
+            "groups_by_kind": dict(kinds),
+            "context_notes": len(self._contexts),
+        }
+
+class SynonymVotes:
+    """
+    LLM-suggested synonyms waiting to be learned. Each answer is a vote by the client it was
+    made for; a synonym is learned into the shared graph once `min_agreement` different
+    clients' answers suggested it, and a term's context note once that many clients got one.
+    So a single client, or a single odd answer, can't put words into everyone's results,
+    while the client itself gets its own pending answer back.
+
+    Votes older than `ttl` seconds are dropped; past `max_terms` terms, the least recently
+    voted term goes first.
+    """
+
+    def __init__(
+        self,
+        min_agreement: int = LEARNED_SYNONYM_MIN_AGREEMENT,
+        ttl: float = LEARNED_SYNONYM_TTL_SECONDS,
+        max_terms: int = MAX_PENDING_SYNONYM_TERMS,
+    ):
+        self.min_agreement = min_agreement
+        self.ttl = ttl
+        self.max_terms = max_terms
+        # term key -> voter -> (voted at, synonyms, context)
+        self._votes: "OrderedDict[str, Dict[str, Tuple[float, List[str], Optional[str]]]]" = OrderedDict()
+
+    @staticmethod
+    def _key(term: str) -> str:
+        return " ".join(tokenize(term))
+
+    def _live(self, term: str, now: float) -> Dict[str, Tuple[float, List[str], Optional[str]]]:
+        voters = self._votes.get(self._key(term), {})
+        for voter in [v for v, (voted_at, _, _) in voters.items() if voted_at < now - self.ttl]:
+            del voters[voter]
+        return voters
+
+    def vote(self, term: str, synonyms: List[str], context: Optional[str], voter: Optional[str], now: Optional[float] = None) -> Tuple[List[str], Optional[str]]:
+        """
+        Record `voter`'s answer for `term`. Returns the synonyms and context note that now
+        have enough agreement to be learned (and forgets the term's votes once they do).
+        """
+        now = time.time() if now is None else now
+        key = self._key(term)
+        voters = self._live(term, now)
+        voters[voter or "anonymous"] = (now, list(synonyms), context)
+        self._votes[key] = voters
+        self._votes.move_to_end(key)
+        while len(self._votes) > self.max_terms:
+            self._votes.popitem(last=False)
+
+        support: Dict[str, set] = {}
+        display: Dict[str, str] = {}
+        for name, (_, suggested, _) in voters.items():
+            for synonym in suggested:
+                synonym_key = self._key(synonym)
+                if synonym_key:
+                    support.setdefault(synonym_key, set()).add(name)
+                    display.setdefault(synonym_key, synonym.strip())
+        agreed = [display[k] for k, names in support.items() if len(names) >= self.min_agreement]
+        contexts = [c for _, _, c in sorted(voters.values(), key=lambda v: -v[0]) if c]
+        agreed_context = contexts[0] if len(contexts) >= self.min_agreement else None
+        if agreed_context:
+            del self._votes[key]
+        elif agreed:
+            agreed_keys = {self._key(s) for s in agreed}
+            for name, (voted_at, suggested, note) in list(voters.items()):
+                voters[name] = (voted_at, [s for s in suggested if self._key(s) not in agreed_keys], note)
+        return agreed, agreed_context
+
+    def own(self, term: str, voter: Optional[str], now: Optional[float] = None) -> Tuple[List[str], Optional[str]]:
+        """
+        The synonyms and context note `voter` was given for `term` that aren't learned yet.
+        """
+        voters = self._live(term, time.time() if now is None else now)
+        _, synonyms, context = voters.get(voter or "anonymous", (0.0, [], None))
+        return synonyms, context
+
+    def stats(self) -> dict:
+        return {"pending_terms": len(self._votes), "min_agreement": self.min_agreement}
+
+class LearnedSynonymStore:
+    """
+    Optional SQLite file holding the synonyms and context notes learned from the LLM,
+    replayed into the graph at startup (minus those past their TTL, which are deleted).
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path
+        self._db = None
+        if db_path:
+            try:
+                self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS learned_synonyms ("
+                    "term TEXT PRIMARY KEY, synonyms TEXT NOT NULL, context TEXT, updated_at REAL NOT NULL)"
+                )
+            except sqlite3.Error as e:
+                print(f"⚠ Learned synonym store disabled, could not open {db_path}: {e}")
+                self._db = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._db is not None
+
+    def load_into(self, graph: SynonymGraph, max_age: float = LEARNED_SYNONYM_TTL_SECONDS) -> int:
+        if self._db is None:
+            return 0
+        try:
+            self._db.execute("DELETE FROM learned_synonyms WHERE updated_at < ?", (time.time() - max_age,))
+            rows = self._db.execute("SELECT term, synonyms, context, updated_at FROM learned_synonyms ORDER BY updated_at").fetchall()
+        except sqlite3.Error as e:
+            print(f"⚠ Learned synonym store read failed: {e}")
+            return 0
+        for term, synonyms, context, updated_at in rows:
+            graph.learn(term, json.loads(synonyms), context, learned_at=updated_at)
+        return len(rows)
+
+    def save(self, term: str, synonyms: List[str], context: Optional[str]) -> None:
+        """
+        Replace the stored entry of `term`; blocking, so call it off the event loop.
+        """
+        if self._db is None:
+            return
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO learned_synonyms (term, synonyms, context, updated_at) VALUES (?, ?, ?, ?)",
+                (term.lower(), json.dumps(synonyms), context, time.time()),
+            )
+        except sqlite3.Error as e:
+            print(f"⚠ Learned synonym store write failed: {e}")
+
+def load_synonym_graph(path: str = SYNONYM_GRAPH_PATH) -> SynonymGraph:
+    graph = SynonymGraph()
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    for kind, groups in data["groups"].items():
+        for group in groups:
+            graph.add_group(group.split("|"), kind)
+    for name, patterns in skill_taxonomy.aliases().items():
+        graph.add_group([name] + patterns, "tools")
+    return graph
+
+class KeywordExpansion(NamedTuple):
+    keywords: List[str]  # Terms to expand, most important first
+    synonyms: Dict[str, List[str]]  # From the graph; terms it doesn't know are absent
+    contexts: Dict[str, str]  # Context notes learned earlier
+    ats_impact: Dict[str, str]
+    suggested_replacements: Dict[str, List[str]]
+    keyword_density_analysis: dict
+    recommendations: List[str]
+
+def expand_keywords_locally(
+    graph: SynonymGraph,
+    resume_text: str,
+    job_description: Optional[str] = None,
+    avoid_keyword_stuffing: bool = True,
+    limit: int = MAX_EXPANDED_KEYWORDS,
+) -> KeywordExpansion:
+    """
+    Everything /expand-keywords can answer without the LLM. Keywords are, in order: graph
+    terms the resume repeats, job description keywords the resume lacks, then the resume's
+    other graph terms by frequency.
+    """
+    counts = graph.find_terms(resume_text)
+    word_count = len(words(resume_text)) or 1
+    density = {term: round(100 * n / word_count, 2) for term, n in counts.items()}
+    overused = [t for t, n in counts.most_common() if n >= OVERUSED_MIN_COUNT or (n > 1 and density[t] >= OVERUSED_DENSITY)]
+
+    job_keywords: Dict[str, float] = extract_keywords(job_description) if job_description else {}
+    resume_terms = term_set(resume_text)
+    underused = [t for t in job_keywords if t not in resume_terms]
+
+    keywords = list(dict.fromkeys(overused + underused + [t for t, _ in counts.most_common()]))[:limit]
+    synonyms = {t: graph.synonyms(t)[:MAX_SYNONYMS] for t in keywords if t in graph}
+    contexts = {t: graph.context(t) for t in keywords if graph.context(t)}
+
+    ats_impact = {}
+    for term in keywords:
+        related = {term} | {s.lower() for s in synonyms.get(term, [])}
+        if related & set(job_keywords) or graph.kind(term) in ("tools", "roles"):
+            ats_impact[term] = "high"
+        elif graph.kind(term) == "action_verbs":
+            ats_impact[term] = "medium"
+        else:
+            ats_impact[term] = "low"
+
+    suggested_replacements = {}
+    for term in overused:
+        fresh = [s for s in synonyms.get(term, []) if s.lower() not in counts]
+        if fresh:
+            suggested_replacements[term] = fresh[:MAX_REPLACEMENTS]
+
+    if any(density[t] >= OVERUSED_DENSITY for t in overused):
+        optimal_density = "too_high"
+    elif job_keywords and len(underused) > len(job_keywords) / 2:
+        optimal_density = "too_low"
+    else:
+        optimal_density = "good"
+
+    recommendations = []
+    if overused:
+        recommendations.append(f"Vary your wording: {', '.join(overused[:3])} repeat often; rotate in the suggested alternatives.")
+    if underused:
+        recommendations.append(f"Work the job description's terms in where they are true for you: {', '.join(underused[:5])}.")
+    if avoid_keyword_stuffing and optimal_density == "too_high":
+        recommendations.append(f"Keep any single keyword under about {OVERUSED_DENSITY:g} mentions per 100 words; dense repetition reads as stuffing to recruiters.")
+    if not recommendations:
+        recommendations.append("Keyword usage looks balanced; mirror the exact wording of each job description you apply to.")
+
+    return KeywordExpansion(
+        keywords=keywords,
+        synonyms=synonyms,
+        contexts=contexts,
+        ats_impact=ats_impact,
+        suggested_replacements=suggested_replacements,
+        keyword_density_analysis={
+            "overused_keywords": overused,
+            "underused_keywords": underused[:limit],
+            "optimal_density": optimal_density,
+        },
+        recommendations=recommendations,
+    )
+
+class SynonymGraphStats:
+    """
+    How many /expand-keywords requests were answered from the graph alone, and how many
+    terms had to be sent to the LLM.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.local_only = 0
+        self.llm_calls = 0
+        self.terms_served = 0
+        self.terms_from_llm = 0
+        self.llm_failures = 0
+
+    def record(self, terms: int, llm_terms: int) -> None:
+        self.requests += 1
+        self.terms_served += terms
+        self.terms_from_llm += llm_terms
+        if llm_terms:
+            self.llm_calls += 1
+        else:
+            self.local_only += 1
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "local_only": self.local_only,
+            "llm_calls": self.llm_calls,
+            "llm_failures": self.llm_failures,
+            "terms_served": self.terms_served,
+            "terms_from_llm": self.terms_from_llm,
+            "local_term_ratio": round(1 - self.terms_from_llm / self.terms_served, 4) if self.terms_served else 0.0,
+            **synonym_graph.stats(),
+            **synonym_votes.stats(),
+            "learned_store_enabled": learned_synonyms.enabled,
+        }
+
+# SYNONYM_CACHE_DB_PATH (optional) persists LLM-supplied synonyms and context notes
+synonym_graph = load_synonym_graph()
+learned_synonyms = LearnedSynonymStore(os.getenv("SYNONYM_CACHE_DB_PATH") or None)
+learned_synonyms.load_into(synonym_graph)
+synonym_votes = SynonymVotes()
+synonym_graph_stats = SynonymGraphStats()
@@ -0,0 +1,231 @@
+# backend/services/token_budget.py
+import os
+import json
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+try:
+    import tiktoken
+except ImportError:  # optional: exact counts for OpenAI models, heuristics otherwise
+    tiktoken = None
+
+# Average characters per token by model family, for models without a local tokenizer
+CHARS_PER_TOKEN = {
+    "meta-llama/": 3.8,
+    "google/": 4.0,
+    "anthropic/": 3.5,
+    "openai/": 4.0,
+}
+DEFAULT_CHARS_PER_TOKEN = 3.5
+
+# Per-message framing overhead (role markers, separators) in chat formats
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Context windows of the models we route to. Free-tier endpoints are often served with a much
+# smaller window than the model supports, so unknown ":free" models get the conservative default.
+MODEL_CONTEXT_WINDOWS = {
+    "meta-llama/llama-3.2-3b-instruct:free": 8192,
+    "google/gemini-2.0-flash-exp:free": 32768,
+    "google/gemini-1.5-flash": 1000000,
+    "google/gemini-pro": 32768,
+    "openai/gpt-4o-mini": 128000,
+    "anthropic/claude-3.5-sonnet": 200000,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+TRUNCATION_MARKER = "\n[...truncated to fit the prompt budget]"
+
+def _encoding_for(model: str):
+    if tiktoken is None or not model.startswith("openai/"):
+        return None
+    try:
+        return tiktoken.encoding_for_model(model.split("/", 1)[1])
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+def count_tokens(text: str, model: str = "") -> int:
+    """
+    Token count of `text` for `model`: exact with tiktoken for OpenAI models when installed,
+    otherwise a per-family characters-per-token estimate.
+    """
+    if not text:
+        return 0
+    encoding = _encoding_for(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    ratio = next((r for prefix, r in CHARS_PER_TOKEN.items() if model.startswith(prefix)), DEFAULT_CHARS_PER_TOKEN)
+    return int(len(text) / ratio) + 1
+
+def count_message_tokens(messages: list, model: str = "") -> int:
+    return sum(count_tokens(str(m.get("content") or ""), model) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+def context_window(model: str) -> int:
+    return MODEL_CONTEXT_WINDOWS.get(model, DEFAULT_CONTEXT_WINDOW)
+
+class EndpointBudget(NamedTuple):
+    prompt_tokens: int
+    completion_tokens: int
+
+# Prompt and completion budgets per endpoint. Completion budgets cover the largest JSON each
+# endpoint is asked for; LLM_ENDPOINT_TOKEN_BUDGETS overrides them as JSON, e.g.
+# {"review": {"prompt_tokens": 8000, "completion_tokens": 3000}}
+DEFAULT_ENDPOINT_BUDGET = EndpointBudget(
+    prompt_tokens=int(os.getenv("LLM_DEFAULT_PROMPT_TOKENS", "6000")),
+    completion_tokens=int(os.getenv("LLM_DEFAULT_COMPLETION_TOKENS", "2048")),
+)
+ENDPOINT_TOKEN_BUDGETS: Dict[str, EndpointBudget] = {
+    "generate": EndpointBudget(6000, 3000),
+    "review": EndpointBudget(6000, 3000),
+    "rewrite-bullet": EndpointBudget(1500, 600),
+    "rewrite-bullets": EndpointBudget(3000, 2500),
+    "match-job-recommendations": EndpointBudget(5000, 600),
+    "analytics": EndpointBudget(6000, 300),
+    "expand-keywords": EndpointBudget(1500, 1200),
+    "quantify-achievement": EndpointBudget(1500, 1000),
+    "chat": EndpointBudget(4000, 1000),
+    "cover-letter": EndpointBudget(6000, 1500),
+    "resignation-letter": EndpointBudget(2000, 1000),
+    "interview-questions": EndpointBudget(6000, 4000),
+    "improve": EndpointBudget(6000, 3000),
+    "translate": EndpointBudget(6000, 6000),
+    "analyze-job-and-tailor": EndpointBudget(7000, 4000),
+    "multi-resume-portfolio": EndpointBudget(7000, 6000),
+    "analyze-skill-gaps": EndpointBudget(6000, 4000),
+    "analyze-career-trends": EndpointBudget(6000, 4000),
+    "salary-negotiation": EndpointBudget(5000, 3000),
+}
+
+def parse_budget_overrides(raw: str) -> Dict[str, EndpointBudget]:
+    """
+    Endpoint budgets from LLM_ENDPOINT_TOKEN_BUDGETS JSON; a missing value falls back to the
+    default budget. Malformed JSON is reported and ignored rather than failing startup.
+    """
+    try:
+        overrides = json.loads(raw or "{}")
+        return {
+            endpoint: EndpointBudget(
+                int(budget.get("prompt_tokens", DEFAULT_ENDPOINT_BUDGET.prompt_tokens)),
+                int(budget.get("completion_tokens", DEFAULT_ENDPOINT_BUDGET.completion_tokens)),
+            )
+            for endpoint, budget in overrides.items()
+        }
+    except (ValueError, TypeError, AttributeError) as e:
+        print(f"⚠ Ignoring LLM_ENDPOINT_TOKEN_BUDGETS, expected {{endpoint: {{prompt_tokens, completion_tokens}}}}: {e}")
+        return {}
+
+ENDPOINT_TOKEN_BUDGETS.update(parse_budget_overrides(os.getenv("LLM_ENDPOINT_TOKEN_BUDGETS", "")))
+
+def endpoint_budget(endpoint: str, models: Iterable[str]) -> EndpointBudget:
+    """
+    The endpoint's budget, shrunk so prompt + completion fits the smallest context window among
+    the models the request may be routed to.
+    """
+    budget = ENDPOINT_TOKEN_BUDGETS.get(endpoint, DEFAULT_ENDPOINT_BUDGET)
+    window = min((context_window(m) for m in models), default=DEFAULT_CONTEXT_WINDOW)
+    completion = min(budget.completion_tokens, window // 2)
+    return EndpointBudget(min(budget.prompt_tokens, window - completion), completion)
+
+class PromptSection(NamedTuple):
+    """
+    A variable-size piece of a prompt. When the prompt is over budget, sections with the
+    lowest priority are trimmed first.
+    """
+    text: str
+    priority: int = 1
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = "") -> str:
+    """
+    Keep the head of `text` within max_tokens, cutting at a line or sentence boundary.
+    """
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    if max_tokens <= count_tokens(TRUNCATION_MARKER, model):
+        return ""
+    # Start from a proportional cut, then shrink until the tokenizer agrees
+    keep = int(len(text) * max_tokens / count_tokens(text, model))
+    while keep > 0:
+        head = text[:keep]
+        boundary = max(head.rfind("\n"), head.rfind(". "))
+        if boundary > keep // 2:
+            head = head[:boundary + 1]
+        candidate = head.rstrip() + TRUNCATION_MARKER
+        if count_tokens(candidate, model) <= max_tokens:
+            return candidate
+        keep = int(keep * 0.9)
+    return ""
+
+def fit_sections(sections: List[PromptSection], budget_tokens: int, model: str = "") -> List[str]:
+    """
+    Trim sections, lowest priority first, until their total fits budget_tokens.
+    Returns the (possibly shortened) texts in the original order.
+    """
+    texts = [s.text or "" for s in sections]
+    sizes = [count_tokens(t, model) for t in texts]
+    overflow = sum(sizes) - budget_tokens
+    for i in sorted(range(len(sections)), key=lambda i: sections[i].priority):
+        if overflow <= 0:
+            break
+        target = max(0, sizes[i] - overflow)
+        texts[i] = truncate_to_tokens(texts[i], target, model)
+        new_size = count_tokens(texts[i], model)
+        overflow -= sizes[i] - new_size
+        sizes[i] = new_size
+    return texts
+
+def trim_history(messages: list, budget_tokens: int, model: str = "", keep_last: int = 1) -> list:
+    """
+    Drop the oldest conversation turns (never the system prompt or the last keep_last
+    messages) until the message list fits budget_tokens.
+    """
+    system = [m for m in messages if m.get("role") == "system"]
+    turns = [m for m in messages if m.get("role") != "system"]
+    while len(turns) > keep_last and count_message_tokens(system + turns, model) > budget_tokens:
+        turns.pop(0)
+    return system + turns
+
+# Histogram bucket upper bounds (tokens)
+TOKEN_BUCKETS = (128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+class TokenUsageTracker:
+    """
+    Per-endpoint histograms of prompt (tokens in) and completion (tokens out) sizes, plus
+    how often and by how much prompts had to be trimmed to fit their budget.
+    Uses the provider's reported usage when available, our estimate otherwise.
+    """
+
+    def __init__(self):
+        self._histograms = defaultdict(lambda: {"in": [0] * (len(TOKEN_BUCKETS) + 1), "out": [0] * (len(TOKEN_BUCKETS) + 1)})
+        self._totals = defaultdict(lambda: {"requests": 0, "tokens_in": 0, "tokens_out": 0, "truncated": 0, "tokens_trimmed": 0})
+
+    def record(self, endpoint: str, tokens_in: int, tokens_out: Optional[int]) -> None:
+        histogram = self._histograms[endpoint]
+        totals = self._totals[endpoint]
+        histogram["in"][bisect_left(TOKEN_BUCKETS, tokens_in)] += 1
+        totals["requests"] += 1
+        totals["tokens_in"] += tokens_in
+        if tokens_out is not None:
+            histogram["out"][bisect_left(TOKEN_BUCKETS, tokens_out)] += 1
+            totals["tokens_out"] += tokens_out
+
+    def record_truncation(self, endpoint: str, tokens_trimmed: int) -> None:
+        totals = self._totals[endpoint]
+        totals["truncated"] += 1
+        totals["tokens_trimmed"] += tokens_trimmed
+
+    def stats(self) -> dict:
+        labels = [f"<={b}" for b in TOKEN_BUCKETS] + [f">{TOKEN_BUCKETS[-1]}"]
+        result = {}
+        for endpoint, totals in self._totals.items():
+            histogram = self._histograms[endpoint]
+            requests = totals["requests"]
+            result[endpoint] = {
+                **totals,
+                "avg_tokens_in": round(totals["tokens_in"] / requests, 1) if requests else None,
+                "avg_tokens_out": round(totals["tokens_out"] / requests, 1) if requests else None,
+                "tokens_in_histogram": dict(zip(labels, histogram["in"])),
+                "tokens_out_histogram": dict(zip(labels, histogram["out"])),
+            }
+        return result
+
+token_usage_tracker = TokenUsageTracker()
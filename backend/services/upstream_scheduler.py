@@ -0,0 +1,279 @@
+# backend/services/upstream_scheduler.py
+import os
+import json
+import time
+import heapq
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from services.latency_tracker import LatencyTracker
+
+# Completion size assumed for rate accounting when a request doesn't set max_tokens
+DEFAULT_COMPLETION_TOKENS = 1000
+
+def estimate_request_tokens(messages: list, max_tokens: Optional[int] = None) -> int:
+    """
+    Rough token estimate for rate limiting: ~4 characters per token for the prompt plus the
+    completion budget. Actual usage is reconciled after the response arrives.
+    """
+    prompt_chars = sum(len(str(m.get("content") or "")) for m in messages)
+    return prompt_chars // 4 + (max_tokens or DEFAULT_COMPLETION_TOKENS)
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at rate_per_minute, holding at most one minute's worth.
+    """
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = rate_per_minute
+        self.tokens = rate_per_minute
+        self.refill_per_second = rate_per_minute / 60
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.refill_per_second)
+        self._updated = now
+
+    async def acquire(self, amount: float) -> None:
+        amount = min(amount, self.capacity)
+        while True:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+            await asyncio.sleep((amount - self.tokens) / self.refill_per_second)
+
+    def debit(self, amount: float) -> None:
+        # Used to reconcile estimates with real usage; may leave the bucket in debt
+        self._refill()
+        self.tokens -= amount
+
+# Priority classes, served strictly in this order when slots free up
+PRIORITY_CLASSES = ("interactive", "standard", "batch")
+DEFAULT_PRIORITY = "standard"
+
+class _Waiter:
+    def __init__(self, rank: int, tag: float, seq: int, priority: str, future: asyncio.Future):
+        self.rank = rank
+        self.tag = tag
+        self.seq = seq
+        self.priority = priority
+        self.future = future
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.rank, self.tag, self.seq) < (other.rank, other.tag, other.seq)
+
+class ModelLimiter:
+    """
+    Concurrency cap plus optional requests-per-minute and tokens-per-minute buckets for one model.
+
+    Requests over the limit queue instead of failing. Waiters are served by priority class
+    first. Within a class, weighted fair queuing (start-time virtual clock, cost = estimated
+    tokens) interleaves client identities, so one user's burst of large jobs can't push
+    everyone else to the back. Batch work may occupy at most batch_max_share of the slots and
+    never all of them, which keeps a slot free for interactive calls; with a single slot
+    (typical for free-tier models) batch work only starts when the model is idle.
+    """
+
+    def __init__(self, model: str, concurrency: int, rpm: float = 0, tpm: float = 0, batch_max_share: float = 0.5):
+        self.model = model
+        self.concurrency = concurrency
+        self.rpm = rpm
+        self.tpm = tpm
+        self.batch_slots = max(0, min(concurrency - 1, int(concurrency * batch_max_share)))
+        self.request_bucket = TokenBucket(rpm) if rpm > 0 else None
+        self.token_bucket = TokenBucket(tpm) if tpm > 0 else None
+        self.in_flight = 0
+        self.in_flight_by_class = {p: 0 for p in PRIORITY_CLASSES}
+        self.queued = 0
+        self.max_queue_depth = 0
+        self.completed = 0
+        self._waiters = []  # heap of _Waiter
+        self._seq = 0
+        self._virtual_time = {p: 0.0 for p in PRIORITY_CLASSES}
+        self._client_finish: Dict[tuple, float] = {}
+
+    def _can_start(self, priority: str) -> bool:
+        if self.in_flight >= self.concurrency:
+            return False
+        if priority != "batch":
+            return True
+        # Higher classes are dispatched first, so an idle model means nobody else is waiting
+        return self.in_flight_by_class["batch"] < self.batch_slots or self.in_flight == 0
+
+    def _start(self, priority: str) -> None:
+        self.in_flight += 1
+        self.in_flight_by_class[priority] += 1
+
+    def _fair_tag(self, priority: str, client_id: str, cost: int) -> float:
+        key = (priority, client_id)
+        start = max(self._virtual_time[priority], self._client_finish.get(key, 0.0))
+        finish = start + max(1, cost)
+        self._client_finish[key] = finish
+        return start
+
+    def _dispatch(self) -> None:
+        while self._waiters and self.in_flight < self.concurrency:
+            # Best waiter whose class may start now (batch may be at its share cap)
+            for waiter in sorted(self._waiters):
+                if self._can_start(waiter.priority):
+                    break
+            else:
+                return
+            self._waiters.remove(waiter)
+            heapq.heapify(self._waiters)
+            self._virtual_time[waiter.priority] = max(self._virtual_time[waiter.priority], waiter.tag)
+            self._start(waiter.priority)
+            waiter.future.set_result(None)
+        if not self._waiters:
+            # Nothing queued: forget finish tags that are already behind the clock
+            self._client_finish = {
+                k: v for k, v in self._client_finish.items() if v > self._virtual_time[k[0]]
+            }
+
+    async def _acquire_slot(self, priority: str, client_id: str, cost: int) -> None:
+        # Every request goes through the queue so a free slot always goes to the best waiter
+        self._seq += 1
+        waiter = _Waiter(
+            PRIORITY_CLASSES.index(priority),
+            self._fair_tag(priority, client_id, cost),
+            self._seq,
+            priority,
+            asyncio.get_running_loop().create_future(),
+        )
+        heapq.heappush(self._waiters, waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # The slot was granted just as we were cancelled; give it back
+                self.release(priority)
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+            raise
+
+    def release(self, priority: str = DEFAULT_PRIORITY) -> None:
+        self.in_flight -= 1
+        self.in_flight_by_class[priority] -= 1
+        self._dispatch()
+
+    async def acquire(self, estimated_tokens: int, priority: str = DEFAULT_PRIORITY, client_id: str = "anonymous") -> None:
+        await self._acquire_slot(priority, client_id, estimated_tokens)
+        try:
+            if self.request_bucket is not None:
+                await self.request_bucket.acquire(1)
+            if self.token_bucket is not None:
+                await self.token_bucket.acquire(estimated_tokens)
+        except BaseException:
+            self.release(priority)
+            raise
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        self.completed += 1
+        if self.token_bucket is not None and actual_tokens is not None:
+            self.token_bucket.debit(actual_tokens - min(estimated_tokens, self.token_bucket.capacity))
+
+class UpstreamScheduler:
+    """
+    Per-model admission control for upstream LLM calls.
+
+    Each model gets its own ModelLimiter. Limits come from the defaults, with ":free" models
+    capped at OpenRouter's free-tier request rate, and can be overridden per model.
+    """
+
+    def __init__(
+        self,
+        default_concurrency: int = 10,
+        default_rpm: float = 0,
+        default_tpm: float = 0,
+        free_model_rpm: float = 20,
+        batch_max_share: float = 0.5,
+        overrides: Optional[Dict[str, dict]] = None,
+    ):
+        self.default_concurrency = default_concurrency
+        self.default_rpm = default_rpm
+        self.default_tpm = default_tpm
+        self.free_model_rpm = free_model_rpm
+        self.batch_max_share = batch_max_share
+        self.overrides = overrides or {}
+        self._limiters: Dict[str, ModelLimiter] = {}
+        self.wait_times = LatencyTracker(window_size=500, min_samples=1)
+
+    def _limiter(self, model: str) -> ModelLimiter:
+        limiter = self._limiters.get(model)
+        if limiter is None:
+            limits = self.overrides.get(model, {})
+            rpm = self.free_model_rpm if model.endswith(":free") and self.free_model_rpm else self.default_rpm
+            limiter = ModelLimiter(
+                model,
+                concurrency=int(limits.get("concurrency", self.default_concurrency)),
+                rpm=float(limits.get("rpm", rpm)),
+                tpm=float(limits.get("tpm", self.default_tpm)),
+                batch_max_share=self.batch_max_share,
+            )
+            self._limiters[model] = limiter
+        return limiter
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        model: str,
+        estimated_tokens: int = 0,
+        priority: str = DEFAULT_PRIORITY,
+        client_id: Optional[str] = None,
+    ):
+        """
+        Wait for capacity on `model`, hold it for the duration of the block, then release it.
+        """
+        if priority not in PRIORITY_CLASSES:
+            priority = DEFAULT_PRIORITY
+        limiter = self._limiter(model)
+        started = time.monotonic()
+        limiter.queued += 1
+        limiter.max_queue_depth = max(limiter.max_queue_depth, limiter.queued)
+        try:
+            await limiter.acquire(estimated_tokens, priority, client_id or "anonymous")
+        finally:
+            limiter.queued -= 1
+        waited = time.monotonic() - started
+        self.wait_times.record(model, waited)
+        self.wait_times.record(f"priority:{priority}", waited)
+        try:
+            yield limiter
+        finally:
+            limiter.release(priority)
+
+    def stats(self) -> dict:
+        waits = self.wait_times.stats()
+        result = {}
+        for model, limiter in self._limiters.items():
+            result[model] = {
+                "concurrency_limit": limiter.concurrency,
+                "batch_slot_limit": limiter.batch_slots,
+                "rpm_limit": limiter.rpm or None,
+                "tpm_limit": limiter.tpm or None,
+                "in_flight": limiter.in_flight,
+                "in_flight_by_priority": dict(limiter.in_flight_by_class),
+                "queue_depth": limiter.queued,
+                "max_queue_depth": limiter.max_queue_depth,
+                "completed": limiter.completed,
+                "wait_seconds": waits.get(model),
+            }
+        result["wait_seconds_by_priority"] = {
+            p: waits.get(f"priority:{p}") for p in PRIORITY_CLASSES
+        }
+        return result
+
+# Process-wide scheduler. UPSTREAM_MODEL_LIMITS takes per-model overrides as JSON, e.g.
+# {"openai/gpt-4o-mini": {"concurrency": 20, "rpm": 500, "tpm": 200000}}
+upstream_scheduler = UpstreamScheduler(
+    default_concurrency=int(os.getenv("UPSTREAM_MAX_CONCURRENCY", "10")),
+    default_rpm=float(os.getenv("UPSTREAM_RPM", "0")),
+    default_tpm=float(os.getenv("UPSTREAM_TPM", "0")),
+    free_model_rpm=float(os.getenv("UPSTREAM_FREE_MODEL_RPM", "20")),
+    batch_max_share=float(os.getenv("UPSTREAM_BATCH_MAX_SHARE", "0.5")),
+    overrides=json.loads(os.getenv("UPSTREAM_MODEL_LIMITS") or "{}"),
+)
@@ -0,0 +1,77 @@
+# backend/tests/conftest.py
+import os
+import json
+import asyncio
+import tempfile
+import pytest
+
+# Settings read at import time. ai_service refuses to import without an API key; the tests
+# never reach the network, so any value will do
+os.environ.setdefault("OPENROUTER_API_KEY", "test-key")
+os.environ.setdefault("OPENROUTER_HTTP_WARMUP", "false")
+os.environ.setdefault("SEARCH_INDEX_DIR", tempfile.mkdtemp(prefix="search-index-"))
+
+class FakeStream:
+    def __init__(self, content: str):
+        self._pieces = [content[i:i + 7] for i in range(0, len(content), 7)]
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        from openai.types.chat import ChatCompletionChunk
+        for piece in self._pieces:
+            await asyncio.sleep(0)
+            yield ChatCompletionChunk.model_validate({
+                "id": "c", "object": "chat.completion.chunk", "created": 0, "model": "m",
+                "choices": [{"index": 0, "delta": {"content": piece}}],
+            })
+
+    async def close(self):
+        pass
+
+class FakeLLM:
+    """
+    Stands in for the OpenRouter client. `respond(kwargs)` returns the completion content (a
+    string, or a dict sent as JSON) or raises; every call's kwargs are kept in `calls`.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.respond = lambda kwargs: "{}"
+        self.chat = self
+        self.completions = self
+        self.timeout = None
+
+    async def create(self, **kwargs):
+        from openai.types.chat import ChatCompletion
+        self.calls.append(kwargs)
+        await asyncio.sleep(0)
+        content = self.respond(kwargs)
+        if not isinstance(content, str):
+            content = json.dumps(content)
+        if kwargs.get("stream"):
+            return FakeStream(content)
+        return ChatCompletion.model_validate({
+            "id": "c", "object": "chat.completion", "created": 0, "model": kwargs["model"],
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+        })
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """
+    ai_service wired to a FakeLLM, with fresh caches, circuits and scheduler so tests don't
+    see each other's calls.
+    """
+    from services import ai_service
+    from services.llm_cache import LLMResponseCache
+    from services.model_health import ModelHealthRegistry
+    from services.upstream_scheduler import UpstreamScheduler
+    from services.near_duplicates import NearDuplicateResultCache
+    llm = FakeLLM()
+    monkeypatch.setattr(ai_service, "client", llm)
+    monkeypatch.setattr(ai_service, "response_cache", LLMResponseCache())
+    monkeypatch.setattr(ai_service, "model_health_registry", ModelHealthRegistry())
+    monkeypatch.setattr(ai_service, "upstream_scheduler", UpstreamScheduler(free_model_rpm=0))
+    monkeypatch.setattr(ai_service, "analysis_reuse_cache", NearDuplicateResultCache())
+    return llm
@@ -0,0 +1,20 @@
+# backend/tests/test_admin_routes.py
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from routes import admin_routes
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+def test_admin_endpoints_are_disabled_without_a_key(client, monkeypatch):
+    monkeypatch.setattr(admin_routes, "ADMIN_API_KEY", "")
+    assert client.get("/api/admin/llm-cache").status_code == 503
+    assert client.delete("/api/admin/llm-cache", headers={"X-Admin-Key": ""}).status_code == 503
+
+def test_admin_endpoints_require_the_key(client, monkeypatch):
+    monkeypatch.setattr(admin_routes, "ADMIN_API_KEY", "secret")
+    assert client.delete("/api/admin/models").status_code == 401
+    assert client.post("/api/admin/search-index/compact", headers={"X-Admin-Key": "wrong"}).status_code == 401
+    assert client.get("/api/admin/models", headers={"X-Admin-Key": "secret"}).status_code == 200
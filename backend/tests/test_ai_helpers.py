@@ -0,0 +1,113 @@
+# backend/tests/test_ai_helpers.py
+import asyncio
+import time
+from types import SimpleNamespace
+import httpx
+import openai
+from fastapi import HTTPException
+from services import model_health
+from services.ai_helpers import (
+    MODEL_FAILURE, RATE_LIMITED, REQUEST_ERROR, classify_upstream_error, create_chat_completion_with_retry, llm_unavailable,
+)
+from services.model_health import ModelHealthRegistry
+
+class FakeCompletions:
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.models = []
+
+    async def create(self, model, messages, **kwargs):
+        self.models.append(model)
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(model=model, usage=None)
+
+def test_half_open_model_gets_a_single_probe(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(model_health.time, "time", lambda: now[0])
+    registry = ModelHealthRegistry(cooldown_seconds=30)
+    registry.record_failure("primary", rate_limited=True)
+    now[0] += 30
+    completions = FakeCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    async def call():
+        return await create_chat_completion_with_retry(
+            client=client, model="primary", messages=[], fallback_models=["fallback"], health_registry=registry
+        )
+
+    async def run():
+        return await asyncio.gather(call(), call(), call())
+
+    responses = asyncio.run(run())
+    assert sorted(r.model for r in responses) == ["fallback", "fallback", "primary"]
+    assert registry.snapshot()["primary"]["state"] == model_health.CLOSED
+
+def test_deadline_caps_each_timeout_phase():
+    completions = FakeCompletions(delay=0)
+    completions.create_kwargs = []
+    create = completions.create
+
+    async def recording_create(model, messages, **kwargs):
+        completions.create_kwargs.append(kwargs)
+        return await create(model, messages, **kwargs)
+
+    completions.create = recording_create
+    client = SimpleNamespace(
+        chat=SimpleNamespace(completions=completions),
+        timeout=httpx.Timeout(connect=5, read=120, write=30, pool=10),
+    )
+
+    async def call():
+        return await create_chat_completion_with_retry(
+            client=client, model="m", messages=[], deadline=time.monotonic() + 20
+        )
+
+    asyncio.run(call())
+    timeout = completions.create_kwargs[0]["timeout"]
+    assert isinstance(timeout, httpx.Timeout)
+    assert timeout.connect == 5 and timeout.pool == 10
+    assert 19 < timeout.read <= 20 and 19 < timeout.write <= 20
+
+def status_error(status):
+    response = httpx.Response(status, request=httpx.Request("POST", "https://openrouter.ai/api/v1/chat/completions"))
+    return openai.APIStatusError("Upstream error", response=response, body=None)
+
+def test_errors_are_classified_by_status_code():
+    assert classify_upstream_error(status_error(429)) == RATE_LIMITED
+    assert classify_upstream_error(status_error(502)) == MODEL_FAILURE
+    assert classify_upstream_error(status_error(400)) == REQUEST_ERROR
+    assert classify_upstream_error(status_error(413)) == REQUEST_ERROR
+    request = httpx.Request("POST", "https://openrouter.ai")
+    assert classify_upstream_error(openai.APITimeoutError(request)) == MODEL_FAILURE
+    assert classify_upstream_error(httpx.ConnectError("refused")) == MODEL_FAILURE
+    # Error text alone doesn't make a rate limit ("generate", "moderate", "accurate")
+    assert classify_upstream_error(ValueError("could not generate an accurate answer")) == REQUEST_ERROR
+
+def test_llm_unavailable_covers_the_helpers_own_http_errors():
+    assert llm_unavailable(HTTPException(status_code=429, detail=""))
+    assert llm_unavailable(HTTPException(status_code=504, detail=""))
+    assert llm_unavailable(status_error(503))
+    assert not llm_unavailable(HTTPException(status_code=413, detail=""))
+    assert not llm_unavailable(status_error(400))
+
+def test_request_errors_do_not_open_the_circuit():
+    registry = ModelHealthRegistry(failure_threshold=3)
+    completions = FakeCompletions(delay=0)
+
+    async def bad_request(model, messages, **kwargs):
+        raise status_error(400)
+
+    completions.create = bad_request
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    async def call():
+        try:
+            await create_chat_completion_with_retry(client=client, model="m", messages=[], health_registry=registry)
+        except openai.APIStatusError:
+            return
+        raise AssertionError("the 400 should reach the caller")
+
+    for _ in range(5):
+        asyncio.run(call())
+    assert registry.is_available("m")
+    assert registry.snapshot().get("m", {}).get("failures", 0) == 0
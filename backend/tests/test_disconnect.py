@@ -0,0 +1,67 @@
+# backend/tests/test_disconnect.py
+import asyncio
+import pytest
+from fastapi import HTTPException
+from services.disconnect import CLIENT_CLOSED_REQUEST, DisconnectStats, run_until_disconnected
+from services import disconnect
+
+class FakeRequest:
+    def __init__(self):
+        self.disconnected = asyncio.Event()
+
+    async def receive(self):
+        await self.disconnected.wait()
+        return {"type": "http.disconnect"}
+
+def test_result_is_returned_while_the_client_is_connected(monkeypatch):
+    monkeypatch.setattr(disconnect, "disconnect_stats", DisconnectStats())
+
+    async def scenario():
+        async def work():
+            await asyncio.sleep(0)
+            return "done"
+        return await run_until_disconnected(FakeRequest(), "review", work())
+
+    assert asyncio.run(scenario()) == "done"
+    assert disconnect.disconnect_stats.stats()["review"]["disconnects"] == 0
+
+def test_disconnect_cancels_the_work(monkeypatch):
+    monkeypatch.setattr(disconnect, "disconnect_stats", DisconnectStats())
+    cancelled = []
+
+    async def scenario():
+        request = FakeRequest()
+
+        async def work():
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def client_goes_away():
+            await asyncio.sleep(0.01)
+            request.disconnected.set()
+
+        asyncio.ensure_future(client_goes_away())
+        with pytest.raises(HTTPException) as excinfo:
+            await run_until_disconnected(request, "review", work())
+        assert excinfo.value.status_code == CLIENT_CLOSED_REQUEST
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert cancelled == [True]
+    stats = disconnect.disconnect_stats.stats()["review"]
+    assert (stats["requests"], stats["disconnects"]) == (1, 1)
+
+def test_errors_of_the_work_reach_the_caller(monkeypatch):
+    monkeypatch.setattr(disconnect, "disconnect_stats", DisconnectStats())
+
+    async def scenario():
+        async def work():
+            raise HTTPException(status_code=504, detail="deadline")
+        await run_until_disconnected(FakeRequest(), "review", work())
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(scenario())
+    assert excinfo.value.status_code == 504
@@ -0,0 +1,22 @@
+# backend/tests/test_http_transport.py
+import httpx
+from services.http_transport import capped_timeout
+
+BASE = httpx.Timeout(connect=5, read=120, write=30, pool=10)
+
+def phases(timeout):
+    return timeout.connect, timeout.read, timeout.write, timeout.pool
+
+def test_phases_under_the_budget_keep_their_limit():
+    assert phases(capped_timeout(BASE, 300)) == (5, 120, 30, 10)
+
+def test_each_phase_is_capped_separately():
+    assert phases(capped_timeout(BASE, 20)) == (5, 20, 20, 10)
+    assert phases(capped_timeout(BASE, 3)) == (3, 3, 3, 3)
+
+def test_unlimited_and_float_timeouts():
+    assert phases(capped_timeout(None, 3)) == (3, 3, 3, 3)
+    assert phases(capped_timeout(8.0, 20)) == (8, 8, 8, 8)
+
+def test_an_exhausted_budget_still_gets_a_minimal_timeout():
+    assert phases(capped_timeout(BASE, -1)) == (0.1, 0.1, 0.1, 0.1)
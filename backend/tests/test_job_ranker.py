@@ -0,0 +1,45 @@
+# backend/tests/test_job_ranker.py
+from services.job_ranker import analyze_terms, rank_jobs
+
+RESUME = """
+Senior Backend Engineer. Python, FastAPI, PostgreSQL, Redis, AWS, Docker, Kubernetes.
+Built REST APIs and microservices; led the CI/CD migration to GitHub Actions.
+"""
+JOBS = [
+    "Frontend developer: React, TypeScript, CSS, Redux, Webpack, accessibility.",
+    "Backend engineer: Python, FastAPI, PostgreSQL, Redis, Docker, k8s, AWS. REST APIs, microservices.",
+    "Sales executive: quota, pipeline, Salesforce, negotiation.",
+]
+
+def test_analyze_terms_keeps_phrases_and_maps_aliases():
+    terms = analyze_terms("Experience with k8s, machine learning and amazon web services")
+    assert "kubernetes" in terms
+    assert "machine learning" in terms
+    assert "aws" in terms
+    assert "with" not in terms
+
+def test_best_match_ranks_first():
+    ranked = rank_jobs(RESUME, JOBS)
+    assert [r.index for r in ranked][0] == 1
+    assert sorted(r.index for r in ranked) == [0, 1, 2]
+    scores = [r.match_score for r in ranked]
+    assert scores == sorted(scores, reverse=True)
+    assert all(0 <= r.match_score <= 100 for r in ranked)
+
+def test_keyword_lists_split_on_the_resume():
+    backend = next(r for r in rank_jobs(RESUME, JOBS) if r.index == 1)
+    assert "kubernetes" in backend.matched_keywords  # k8s in the JD, Kubernetes in the resume
+    assert not set(backend.matched_keywords) & set(backend.missing_keywords)
+    frontend = next(r for r in rank_jobs(RESUME, JOBS) if r.index == 0)
+    assert "react.js" in frontend.skill_gaps  # "React" listed with other skills
+    assert set(frontend.skill_gaps) <= set(frontend.missing_keywords)
+
+def test_keywords_per_job_limits_the_lists():
+    for r in rank_jobs(RESUME, JOBS, keywords_per_job=3):
+        assert len(r.matched_keywords) + len(r.missing_keywords) <= 3
+
+def test_edge_cases():
+    assert rank_jobs(RESUME, []) == []
+    ranked = rank_jobs("", ["Python developer", ""])
+    assert all(r.match_score == 0 for r in ranked)
+    assert [r.index for r in ranked] == [0, 1]  # Ties keep input order
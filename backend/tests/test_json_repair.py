@@ -0,0 +1,94 @@
+# backend/tests/test_json_repair.py
+import asyncio
+from typing import List, Optional
+import pytest
+from pydantic import BaseModel
+from services.json_repair import IncrementalJSONParser, JSONRepairError, JSONSchemaMismatch, parse_model_output
+
+class Review(BaseModel):
+    score: int
+    strengths: List[str]
+    summary: Optional[str] = None
+
+def parser_for(*chunks):
+    parser = IncrementalJSONParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser
+
+def test_candidates_skip_prose_and_stop_after_the_document():
+    parser = parser_for("Sure! ```json\n", '{"a": [1, 2]', "}\n``` Anything else?")
+    assert parser.complete
+    assert parser.candidates() == ['{"a": [1, 2]}']
+
+def test_candidates_close_an_open_string_and_containers():
+    parser = parser_for('{"a": 1, "b": ["x", "unfinish')
+    assert parser.depth == 2
+    assert parser.candidates()[0] == '{"a": 1, "b": ["x", "unfinish"]}'
+    assert parser.snapshot() == {"a": 1, "b": ["x", "unfinish"]}
+
+def test_candidates_fall_back_to_the_last_complete_value():
+    parser = parser_for('{"a": 1, "b": tr')
+    assert parser.candidates()[1] == '{"a": 1}'
+    assert parser.snapshot() == {"a": 1}
+
+def test_dangling_key_and_backslash():
+    assert parser_for('{"a": "x\\').snapshot() == {"a": "x"}
+    assert parser_for('{"a": 1, "b":').snapshot() == {"a": 1, "b": None}
+
+def test_nothing_parseable_yet():
+    parser = parser_for("Let me think about this")
+    assert parser.candidates() == []
+    assert parser.snapshot() is None
+
+def test_parse_model_output_clean_output_is_not_repaired():
+    data, repaired = parse_model_output('{"score": 7, "strengths": ["clear"]}', Review)
+    assert data == {"score": 7, "strengths": ["clear"]}
+    assert not repaired
+
+def test_parse_model_output_repairs_and_coerces():
+    data, repaired = parse_model_output('```json\n{"score": "8/10", "strengths": "concise", ', Review)
+    assert repaired
+    assert data["score"] == 8
+    assert data["strengths"] == ["concise"]
+
+def test_parse_model_output_drops_malformed_optional_fields():
+    data, repaired = parse_model_output('{"score": 5, "strengths": [], "summary": {"x": 1}}', Review)
+    assert repaired
+    assert "summary" not in data
+
+def test_parse_model_output_uses_defaults_for_validation_only():
+    data, _ = parse_model_output('{"strengths": ["a"]}', Review, defaults={"score": 3})
+    assert data == {"strengths": ["a"]}
+
+def test_parse_model_output_rejects_unrepairable_output():
+    with pytest.raises(JSONRepairError):
+        parse_model_output("I can't help with that.", Review)
+    with pytest.raises(JSONSchemaMismatch):
+        parse_model_output('{"strengths": ["a"]}', Review)
+    with pytest.raises(JSONSchemaMismatch):
+        parse_model_output("[1, 2]")
+
+def test_only_upstream_calls_are_counted(fake_llm, monkeypatch):
+    from services import ai_service
+    from services.json_repair import JSONRepairStats
+    stats = JSONRepairStats()
+    monkeypatch.setattr(ai_service, "json_repair_stats", stats)
+    fake_llm.respond = lambda kwargs: {"score": 7, "strengths": ["clear"]}
+
+    async def call():
+        return await ai_service.create_json_completion(
+            schema=Review, endpoint="review", cache=True,
+            messages=[{"role": "user", "content": "Review this"}], response_format={"type": "json_object"},
+        )
+
+    async def scenario():
+        # Two coalesced callers, then a cache hit
+        await asyncio.gather(call(), call())
+        await call()
+
+    asyncio.run(scenario())
+    assert len(fake_llm.calls) == 1
+    counters = stats.stats()["review"]
+    assert (counters["upstream_calls"], counters["successes"]) == (1, 3)
+    assert counters["upstream_calls_per_success"] == 0.333
@@ -0,0 +1,53 @@
+# backend/tests/test_keyword_matcher.py
+from services.keyword_matcher import (
+    KNOWN_SKILLS, SKILL_SYNONYMS, canonical, extract_keywords, listed_skills, local_recommendations, match_keywords,
+    term_set, tokenize,
+)
+from services.skill_taxonomy import skill_taxonomy
+
+JOB = """
+Senior Backend Engineer
+Requirements: Python, PostgreSQL and Kubernetes (k8s) are required.
+Nice to have: Amazon Web Services, Go, Terraform.
+You will own payment services and payment integrations end to end.
+"""
+
+def test_tokenize_keeps_tech_spellings():
+    assert tokenize("C++, C#, Node.js and CI/CD; scikit-learn.") == ["c++", "c#", "node.js", "and", "ci/cd", "scikit-learn"]
+
+def test_tables_come_from_the_taxonomy():
+    aliases = skill_taxonomy.aliases()
+    assert canonical("k8s") == "kubernetes" and "kubernetes" in aliases["Kubernetes"]
+    assert canonical("amazon web services") == "aws"
+    assert canonical("golang") == "golang" and "golang" in KNOWN_SKILLS
+    assert set(SKILL_SYNONYMS.values()) <= KNOWN_SKILLS
+    # Everyday words are not skills on their own, nor are aliases tokenizing can't reproduce
+    assert not {"go", "react", "swift", "c", "r", "net"} & KNOWN_SKILLS
+    assert "net" not in SKILL_SYNONYMS
+
+def test_term_set_maps_aliases_and_listed_names():
+    terms = term_set("Shipped ML models on GCP. Languages: Python, Go")
+    assert {"machine learning", "google cloud", "python", "golang"} <= terms
+    assert "golang" not in term_set("Ready to go live next week")
+    assert listed_skills("React, Redux and TypeScript") == ["react.js"]
+    assert listed_skills("react to incidents") == []
+
+def test_extract_keywords_weights_skills_and_requirements():
+    weights = extract_keywords(JOB)
+    assert {"python", "postgresql", "kubernetes", "aws", "golang", "terraform"} <= set(weights)
+    # Required-line skills outrank the nice-to-haves, which outrank repeated plain words
+    assert weights["python"] > weights["terraform"] > weights["payment"]
+    assert weights["kubernetes"] > weights["python"]  # k8s and Kubernetes both count
+    # "k8s" and "kubernetes" count as one skill, the bare "go" folds into golang
+    assert "k8s" not in weights and "go" not in weights
+    assert "with" not in weights
+
+def test_match_keywords_scores_and_splits():
+    resume = "Python and Postgres developer; deployed to Kubernetes on AWS."
+    match = match_keywords(resume, JOB)
+    assert {"python", "postgresql", "kubernetes", "aws"} <= set(match.matched_keywords)
+    assert {"golang", "terraform"} <= set(match.skill_gaps)
+    assert set(match.skill_gaps) <= set(match.missing_keywords)
+    assert 0 < match.match_score < 100
+    assert match_keywords(resume, "").match_score == 0
+    assert any("golang" in r for r in local_recommendations(match))
@@ -0,0 +1,75 @@
+# backend/tests/test_llm_cache.py
+import asyncio
+import sqlite3
+from openai.types.chat import ChatCompletion
+from services import llm_cache
+from services.llm_cache import LLMResponseCache, make_cache_key
+
+MESSAGES = [{"role": "user", "content": "Rewrite this bullet"}]
+
+def test_cache_key_is_stable():
+    assert make_cache_key("m", MESSAGES, 0.2, max_tokens=600, endpoint="rewrite-bullet") == make_cache_key(
+        "m", list(MESSAGES), 0.2, max_tokens=600, endpoint="rewrite-bullet"
+    )
+
+def test_cache_key_separates_budgets_and_endpoints():
+    base = make_cache_key("m", MESSAGES, 0.2, max_tokens=600, endpoint="rewrite-bullet")
+    assert make_cache_key("m", MESSAGES, 0.2, max_tokens=3000, endpoint="rewrite-bullet") != base
+    assert make_cache_key("m", MESSAGES, 0.2, max_tokens=600, endpoint="quantify-achievement") != base
+
+def completion(content):
+    return ChatCompletion.model_validate({
+        "id": "c", "object": "chat.completion", "created": 0, "model": "m",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+    })
+
+def rows(path):
+    with sqlite3.connect(path) as db:
+        return db.execute("SELECT key FROM llm_cache ORDER BY key").fetchall()
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    path = str(tmp_path / "cache.db")
+
+    async def scenario():
+        cache = LLMResponseCache(db_path=path)
+        await cache.set("k", completion("hello"))
+        assert (await cache.get("k")).choices[0].message.content == "hello"
+        restarted = LLMResponseCache(db_path=path)
+        assert (await restarted.get("k")).choices[0].message.content == "hello"
+        assert await restarted.get("missing") is None
+        return restarted.stats()
+
+    stats = asyncio.run(scenario())
+    assert (stats["disk_hits"], stats["misses"]) == (1, 1)
+
+def test_expired_rows_are_purged(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.db")
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+
+    async def scenario():
+        cache = LLMResponseCache(ttl_seconds=60, db_path=path)
+        await cache.set("old", completion("a"))
+        now[0] += 61
+        # Writing any response purges the expired rows, not only reading their key
+        await cache.set("new", completion("b"))
+        assert rows(path) == [("new",)]
+        assert await cache.get("old") is None
+
+        now[0] += 61
+        LLMResponseCache(ttl_seconds=60, db_path=path)
+        assert rows(path) == []
+
+    asyncio.run(scenario())
+
+def test_discard_removes_both_tiers(tmp_path):
+    path = str(tmp_path / "cache.db")
+
+    async def scenario():
+        cache = LLMResponseCache(db_path=path)
+        await cache.set("k", completion("x"))
+        await cache.discard("k")
+        assert await cache.get("k") is None
+        assert rows(path) == []
+
+    asyncio.run(scenario())
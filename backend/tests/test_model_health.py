@@ -0,0 +1,81 @@
+# backend/tests/test_model_health.py
+import pytest
+from services import model_health
+from services.model_health import CLOSED, HALF_OPEN, OPEN, ModelHealthRegistry
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(model_health.time, "time", clock)
+    return clock
+
+def half_open(registry, clock, model="m"):
+    registry.record_failure(model, rate_limited=True)
+    clock.now += registry.cooldown_seconds
+    assert registry.snapshot()[model]["state"] == HALF_OPEN
+
+def test_circuit_opens_after_threshold(clock):
+    registry = ModelHealthRegistry(failure_threshold=2, cooldown_seconds=30)
+    registry.record_failure("m")
+    assert registry.is_available("m")
+    registry.record_failure("m")
+    assert registry.snapshot()["m"]["state"] == OPEN
+    assert registry.available_models(["m", "fallback"]) == ["fallback"]
+
+def test_open_circuit_turns_half_open_after_cooldown(clock):
+    registry = ModelHealthRegistry(cooldown_seconds=30)
+    registry.record_failure("m", rate_limited=True, retry_after=60)
+    clock.now += 30
+    assert not registry.is_available("m")
+    clock.now += 30
+    assert registry.is_available("m")
+
+def test_only_one_probe_while_half_open(clock):
+    registry = ModelHealthRegistry(cooldown_seconds=30)
+    half_open(registry, clock)
+    probe = registry.begin_request("m")
+    assert probe
+    assert registry.begin_request("m") is None
+    assert not registry.is_available("m")
+    assert registry.available_models(["m", "fallback"]) == ["fallback"]
+
+def test_only_the_probe_holder_releases_it(clock):
+    registry = ModelHealthRegistry(cooldown_seconds=30)
+    half_open(registry, clock)
+    probe = registry.begin_request("m")
+    # A cancelled request that never held the probe (queued waiter, hedge loser)
+    registry.cancel_request("m", 0)
+    registry.cancel_request("m", probe + 1)
+    assert registry.begin_request("m") is None
+    registry.cancel_request("m", probe)
+    assert registry.begin_request("m")
+
+def test_successful_probe_closes_the_circuit(clock):
+    registry = ModelHealthRegistry(cooldown_seconds=30)
+    half_open(registry, clock)
+    registry.begin_request("m")
+    registry.record_success("m", 1.0)
+    assert registry.snapshot()["m"]["state"] == CLOSED
+    assert registry.begin_request("m") == 0
+
+def test_failed_probe_reopens_with_a_longer_cooldown(clock):
+    registry = ModelHealthRegistry(cooldown_seconds=30)
+    half_open(registry, clock)
+    probe = registry.begin_request("m")
+    registry.record_failure("m", probe=probe)
+    snapshot = registry.snapshot()["m"]
+    assert snapshot["state"] == OPEN
+    assert snapshot["reopens_in_seconds"] == 60
+
+def test_all_open_still_returns_the_soonest_model(clock):
+    registry = ModelHealthRegistry(cooldown_seconds=30)
+    registry.record_failure("a", rate_limited=True, retry_after=120)
+    registry.record_failure("b", rate_limited=True)
+    assert registry.available_models(["a", "b"]) == ["b"]
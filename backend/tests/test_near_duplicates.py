@@ -0,0 +1,130 @@
+# backend/tests/test_near_duplicates.py
+import asyncio
+from services import ai_service, near_duplicates
+from services.ai_service import analysis_scope, drop_near_duplicates, portfolio_version_text
+from services.near_duplicates import NearDuplicateResultCache, changed_lines, dedupe, edit_touches_result
+from services.request_context import current_client_id
+from schemas.resume import ResumeVersion, ReviewInput
+
+RESUME = """
+Senior backend engineer with eight years of experience building payment APIs in Python and Go.
+Led the migration of a monolith to event driven services on Kubernetes, cutting deploy time by
+seventy percent. Mentored six engineers and ran the on-call rotation for the platform team.
+"""
+EDITED = RESUME.replace("six engineers", "seven engineers")
+OTHER = """
+Marketing manager who grew organic traffic threefold through content strategy, search engine
+optimisation and partnerships. Owns a quarterly budget and reports to the chief marketing officer.
+"""
+
+def test_dedupe_points_duplicates_at_their_first_occurrence():
+    assert dedupe([RESUME, OTHER, EDITED, "", ""]) == [0, 1, 0, 3, 3]
+
+def test_drop_near_duplicates_remaps_positions():
+    kept, positions = drop_near_duplicates(["a", "b", "c"], [RESUME, EDITED, OTHER], "test")
+    assert kept == ["a", "c"]
+    assert positions == [0, 0, 1]
+
+def test_reuse_cache_matches_near_identical_text_in_scope():
+    cache = NearDuplicateResultCache(threshold=0.8)
+    cache.store("review", "scope", RESUME, {"score": 80})
+    reused = cache.lookup("review", "scope", EDITED)
+    assert reused is not None and reused.result == {"score": 80}
+    assert reused.similarity >= 0.8
+    assert cache.lookup("review", "scope", OTHER) is None
+    assert cache.lookup("review", "other-scope", RESUME) is None
+    assert cache.lookup("heatmap", "scope", RESUME) is None
+    assert cache.stats()["hits"] == 1
+
+def test_reuse_cache_expiry_and_invalidate(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(near_duplicates.time, "time", lambda: now[0])
+    cache = NearDuplicateResultCache(ttl_seconds=60)
+    cache.store("review", "scope", RESUME, {"score": 80})
+    assert cache.invalidate("review", "scope", EDITED) == 1
+    assert cache.lookup("review", "scope", RESUME) is None
+
+    cache.store("review", "scope", RESUME, {"score": 81})
+    now[0] += 61
+    assert cache.lookup("review", "scope", RESUME) is None
+    assert cache.stats()["entries"] == 0
+
+def test_reuse_cache_evicts_least_recently_used():
+    cache = NearDuplicateResultCache(max_entries=1)
+    cache.store("review", "a", RESUME, {"n": 1})
+    cache.store("review", "b", OTHER, {"n": 2})
+    assert cache.lookup("review", "a", RESUME) is None
+    assert cache.lookup("review", "b", OTHER).result == {"n": 2}
+    assert cache.stats()["evictions"] == 1
+
+def test_analysis_scope_includes_the_client():
+    token = current_client_id.set("client-a")
+    try:
+        scope_a = analysis_scope("1", "model", "backend engineer")
+    finally:
+        current_client_id.reset(token)
+    token = current_client_id.set("client-b")
+    try:
+        scope_b = analysis_scope("1", "model", "backend engineer")
+    finally:
+        current_client_id.reset(token)
+    assert scope_a != scope_b
+
+def version(name, style, summary, sections=("summary", "experience", "skills")):
+    data = {key: [] for key in sections}
+    data["summary"] = summary
+    data["experience"] = [{"title": "Engineer", "bullet_points": [RESUME]}]
+    return ResumeVersion(
+        version_id=name, version_name=name, style=style, resume_data=data, key_changes=[], best_for=[]
+    )
+
+def test_portfolio_versions_are_compared_on_what_sets_them_apart():
+    technical = version("Technical Focus", "technical", "Backend engineer focused on distributed systems.")
+    executive = version("Leadership Focus", "executive", "Engineering leader who builds teams.", ("summary", "skills", "experience"))
+    copy = version("Technical Focus", "technical", "Backend engineer focused on distributed systems.")
+    texts = [portfolio_version_text(v) for v in (technical, executive, copy)]
+    assert dedupe(texts, 0.9) == [0, 1, 0]
+
+REVIEW = {
+    "ats_score": 78,
+    "strengths": ["Quantified impact: cutting deploy time by seventy percent"],
+    "weaknesses": ["No mention of testing practices"],
+    "suggestions": ["Add the size of the payment volume you handled"],
+    "missing_skills": ["Terraform", "GraphQL"],
+}
+
+def test_changed_lines_ignore_case_and_spacing():
+    assert changed_lines("A line\nKept  line", "a LINE\nkept line\nNew line") == ["new line"]
+
+def test_edits_that_touch_the_analysis_block_reuse():
+    # "six engineers" -> "seven engineers" is on a line the review doesn't quote
+    assert not edit_touches_result(RESUME, EDITED, REVIEW)
+    # Rewording the quoted line, or adding a skill the review says is missing, is not
+    assert edit_touches_result(RESUME, RESUME.replace("deploy time", "release time"), REVIEW)
+    assert edit_touches_result(RESUME, RESUME + "\nSkills: Terraform, Go", REVIEW)
+
+def test_lookup_can_turn_candidates_down():
+    cache = NearDuplicateResultCache(threshold=0.8)
+    cache.store("review", "scope", RESUME, {"score": 80})
+    assert cache.lookup("review", "scope", EDITED, accept=lambda text, result: False) is None
+    reused = cache.lookup("review", "scope", EDITED, accept=lambda text, result: text == RESUME)
+    assert reused.text == RESUME
+    assert cache.stats()["rejected"] == 1 and cache.stats()["by_endpoint"]["review"]["rejected"] == 1
+
+def test_review_reuse_is_flagged_and_skips_touched_edits(fake_llm):
+    fake_llm.respond = lambda kwargs: REVIEW
+
+    def review(text):
+        return asyncio.run(ai_service.review_resume_content(ReviewInput(resume_text=text, target_role="Backend Engineer")))
+
+    first = review(RESUME)
+    assert not first.reused_from_similar and first.reuse_similarity is None
+    reused = review(EDITED)
+    assert reused.reused_from_similar and reused.reuse_similarity >= 0.9
+    assert reused.ats_score == 78
+    assert len(fake_llm.calls) == 1
+
+    fresh = review(RESUME.replace("deploy time", "release time"))
+    assert not fresh.reused_from_similar
+    assert len(fake_llm.calls) == 2
+    assert ai_service.analysis_reuse_cache.stats()["rejected"] == 1  # Similar enough, but edited where it quotes
@@ -0,0 +1,35 @@
+# backend/tests/test_request_context.py
+import time
+from services import request_context
+from services.request_context import resolve_client_id, resolve_deadline
+
+def test_client_id_header_is_ignored_from_untrusted_peers():
+    headers = {"x-client-id": "someone-else", "authorization": "Bearer token"}
+    assert resolve_client_id(headers, "203.0.113.7") == resolve_client_id({"authorization": "Bearer token"}, "203.0.113.7")
+    assert resolve_client_id({"x-client-id": "someone-else"}, "203.0.113.7") == "ip:203.0.113.7"
+
+def test_client_id_header_from_a_trusted_proxy(monkeypatch):
+    monkeypatch.setattr(request_context, "TRUSTED_CLIENT_ID_PROXIES", frozenset({"10.0.0.2"}))
+    assert resolve_client_id({"x-client-id": "user-42"}, "10.0.0.2") == "client:user-42"
+    assert resolve_client_id({"x-client-id": "user-42"}, "10.0.0.3") == "ip:10.0.0.3"
+
+def test_authorization_is_hashed():
+    client_id = resolve_client_id({"authorization": "Bearer secret"}, "1.2.3.4")
+    assert client_id.startswith("auth:") and "secret" not in client_id
+
+def test_forwarded_for_uses_the_trusted_hop(monkeypatch):
+    # The client can prepend anything; only the hop added by our proxy counts
+    headers = {"x-forwarded-for": "6.6.6.6, 198.51.100.9"}
+    assert resolve_client_id(headers, "10.0.0.1") == "ip:198.51.100.9"
+    monkeypatch.setattr(request_context, "TRUSTED_PROXY_HOPS", 2)
+    assert resolve_client_id(headers, "10.0.0.1") == "ip:6.6.6.6"
+    assert resolve_client_id({"x-forwarded-for": "198.51.100.9"}, "10.0.0.1") == "ip:10.0.0.1"
+    monkeypatch.setattr(request_context, "TRUSTED_PROXY_HOPS", 0)
+    assert resolve_client_id(headers, "10.0.0.1") == "ip:10.0.0.1"
+
+def test_request_timeout_header():
+    assert resolve_deadline({}) is None
+    assert resolve_deadline({"x-request-timeout": "abc"}) is None
+    assert resolve_deadline({"x-request-timeout": "-5"}) is None
+    deadline = resolve_deadline({"x-request-timeout": "1e9"})
+    assert deadline - time.monotonic() <= request_context.MAX_REQUEST_TIMEOUT_SECONDS
@@ -0,0 +1,96 @@
+# backend/tests/test_resume_analytics.py
+import asyncio
+import pytest
+from fastapi import HTTPException
+from services import ai_service
+from services.resume_analytics import (
+    analyze_resume_text, count_syllables, flesch_reading_ease, keyword_density, role_terms, sections_completeness,
+    split_sections, words,
+)
+from schemas.resume import ResumeAnalyticsInput
+
+RESUME = """Jane Doe
+jane@example.com | +1 555 010 0199 | linkedin.com/in/janedoe
+
+SUMMARY
+Backend engineer with seven years of experience building payment platforms in Python.
+
+EXPERIENCE
+- Led the migration of 40 services to Kubernetes, cutting deploy time by 70%.
+- Built REST APIs in Python and FastAPI serving 2M requests a day.
+- Reduced AWS costs by $120k a year by rightsizing clusters.
+
+EDUCATION
+B.Sc. Computer Science, State University, 2016
+
+SKILLS
+Python, FastAPI, PostgreSQL, Docker, Kubernetes, AWS, CI/CD, Git
+"""
+
+def test_syllables_and_flesch():
+    assert [count_syllables(w) for w in ("cat", "table", "make", "beautiful", "2024")] == [1, 2, 1, 3, 1]
+    assert flesch_reading_ease("The cat sat on the mat.") == 100  # Capped: short words, one sentence
+    hard = "Institutional interoperability necessitates comprehensive organizational standardization."
+    assert flesch_reading_ease(hard) == 0
+    assert flesch_reading_ease("We shipped the app. It was fast.") > flesch_reading_ease("We implemented a sophisticated microservice architecture.")
+    assert flesch_reading_ease("") == 0
+
+def test_sections_are_split_on_headings():
+    sections = split_sections(RESUME)
+    assert set(sections) == {"summary", "experience", "education", "skills"}
+    assert "Kubernetes" in sections["experience"] and "State University" in sections["education"]
+    completeness = sections_completeness(RESUME)
+    assert completeness["contact"] == 100
+    assert completeness["projects"] == completeness["certifications"] == 0
+    assert 50 < completeness["experience"] < 100  # Present, shorter than a full section
+    assert completeness["skills"] == 95  # 9 of the 10 words a full skills section has
+    assert sections_completeness("Skills:\nPython")["contact"] == 0
+
+def test_keyword_density_counts_aliases_for_their_term():
+    text = "Shipped on k8s. Kubernetes operator author. Ran workloads on Amazon Web Services."
+    density = keyword_density(text, ["kubernetes", "aws", "terraform"])
+    assert list(density) == ["kubernetes", "aws"]  # Highest first, absent terms left out
+    assert density["kubernetes"] == round(100 * 2 / len(words(text)), 2)  # Adjacent mentions both count
+
+def test_role_terms_pick_families_and_title_skills():
+    terms = role_terms("Senior Backend Engineer (Go)")
+    assert "kubernetes" in terms and "rest api" in terms
+    assert "leadership" in terms
+    assert len(terms) == len(set(terms))
+    assert "figma" not in terms
+
+def test_ats_score_rewards_a_complete_quantified_resume():
+    metrics = analyze_resume_text(RESUME, "Backend Engineer")
+    assert {"python", "kubernetes", "aws", "docker", "git"} <= set(metrics.role_terms_found)
+    assert not set(metrics.role_terms_found) & set(metrics.role_terms_missing)
+    sparse = analyze_resume_text("Worked at a company. Did some things there.", "Backend Engineer")
+    assert 0 <= sparse.ats_score < metrics.ats_score <= 100
+    assert metrics.word_count > sparse.word_count
+
+@pytest.mark.parametrize("error", [
+    HTTPException(status_code=429, detail="rate limited"),
+    HTTPException(status_code=504, detail="deadline"),
+    ai_service.JSONRepairError("no JSON in the answer"),
+])
+def test_analytics_falls_back_to_local_metrics(monkeypatch, error):
+    async def failing(**kwargs):
+        raise error
+    monkeypatch.setattr(ai_service, "create_json_completion", failing)
+    result = asyncio.run(ai_service.analyze_resume_analytics(ResumeAnalyticsInput(resume_text=RESUME, target_role="Backend Engineer")))
+    metrics = analyze_resume_text(RESUME, "Backend Engineer")
+    assert result.ats_score == metrics.ats_score
+    assert result.keyword_density == metrics.keyword_density
+    assert result.improvement_potential == max(0, 90 - metrics.ats_score)
+    assert result.estimated_interview_rate is None
+
+def test_analytics_request_errors_still_raise(monkeypatch):
+    async def failing(**kwargs):
+        raise HTTPException(status_code=413, detail="over budget")
+    monkeypatch.setattr(ai_service, "create_json_completion", failing)
+    with pytest.raises(HTTPException):
+        asyncio.run(ai_service.analyze_resume_analytics(ResumeAnalyticsInput(resume_text=RESUME, target_role="Backend Engineer")))
+
+def test_analytics_uses_the_predictions(fake_llm):
+    fake_llm.respond = lambda kwargs: {"improvement_potential": 12, "estimated_interview_rate": 0.3}
+    result = asyncio.run(ai_service.analyze_resume_analytics(ResumeAnalyticsInput(resume_text=RESUME, target_role="Backend Engineer")))
+    assert (result.improvement_potential, result.estimated_interview_rate) == (12, 0.3)
@@ -0,0 +1,83 @@
+# backend/tests/test_rewrite_bullets.py
+import time
+import asyncio
+from fastapi import HTTPException
+from services import ai_service
+from services.ai_service import group_bullets
+from services.request_context import current_deadline
+from schemas.resume import RewriteBulletsInput
+
+def bullets(*contexts):
+    return RewriteBulletsInput(bullets=[{"text": f"Bullet {i}", "context": c} for i, c in enumerate(contexts)], target_role="Engineer")
+
+def test_bullets_are_grouped_by_context_in_order():
+    assert group_bullets(bullets("A", "B", "A", None, "B")) == [[0, 2], [1, 4], [3]]
+
+def test_large_groups_are_split_evenly(monkeypatch):
+    monkeypatch.setattr(ai_service, "REWRITE_BULLETS_PER_CALL", 4)
+    groups = group_bullets(bullets(*["A"] * 9))
+    assert [len(g) for g in groups] == [3, 3, 3]
+    assert sum(groups, []) == list(range(9))
+
+def collect(data, positions):
+    async def run():
+        return [b async for b in ai_service.stream_bullet_group(data, positions)]
+    return sorted(asyncio.run(run()), key=lambda b: b.index)
+
+def streaming(*chunks, error=None):
+    async def stream(**kwargs):
+        for chunk in chunks:
+            yield chunk
+        if error is not None:
+            raise error
+    return stream
+
+INDIVIDUAL = {"improved_bullet": "Rewritten alone", "improvements_made": ["verb"], "keywords_added": []}
+
+def test_rate_limited_batch_does_not_fan_out(fake_llm, monkeypatch):
+    monkeypatch.setattr(ai_service, "stream_chat_completion_with_auto_fallback", streaming(
+        error=HTTPException(status_code=429, detail="AI service is currently rate-limited"),
+    ))
+    result = collect(bullets("A", "A", "A"), [0, 1, 2])
+    assert fake_llm.calls == []
+    assert [b.improved_bullet for b in result] == ["Bullet 0", "Bullet 1", "Bullet 2"]
+    assert all("rate-limited" in b.error for b in result)
+
+def test_failure_mid_stream_keeps_the_bullets_already_rewritten(fake_llm, monkeypatch):
+    first = '{"bullets": [{"id": 0, "improved_bullet": "Batch 0", "improvements_made": [], "keywords_added": []}, '
+    monkeypatch.setattr(ai_service, "stream_chat_completion_with_auto_fallback", streaming(
+        first, error=HTTPException(status_code=504, detail="deadline"),
+    ))
+    result = collect(bullets("A", "A"), [0, 1])
+    assert fake_llm.calls == []
+    assert (result[0].improved_bullet, result[0].error) == ("Batch 0", None)
+    assert result[1].error == "deadline"
+
+def test_unparseable_or_skipped_bullets_are_rewritten_one_by_one(fake_llm, monkeypatch):
+    fake_llm.respond = lambda kwargs: INDIVIDUAL
+    monkeypatch.setattr(ai_service, "stream_chat_completion_with_auto_fallback", streaming("I can't help with that."))
+    result = collect(bullets("A", "A"), [0, 1])
+    assert len(fake_llm.calls) == 2
+    assert [b.improved_bullet for b in result] == ["Rewritten alone"] * 2
+
+    fake_llm.calls.clear()
+    answer = '{"bullets": [{"id": 1, "improved_bullet": "Batch 1", "improvements_made": [], "keywords_added": []}]}'
+    monkeypatch.setattr(ai_service, "stream_chat_completion_with_auto_fallback", streaming(answer))
+    result = collect(bullets("A", "A"), [0, 1])
+    assert len(fake_llm.calls) == 1
+    assert [b.improved_bullet for b in result] == ["Rewritten alone", "Batch 1"]
+
+def test_fallbacks_share_the_batch_deadline(fake_llm, monkeypatch):
+    seen = []
+
+    async def rewrite(data, index):
+        seen.append(current_deadline.get())
+        return ai_service.unrewritten_bullet(data, index, ValueError("skipped"))
+
+    monkeypatch.setattr(ai_service, "rewrite_bullet_individually", rewrite)
+    monkeypatch.setattr(ai_service, "stream_chat_completion_with_auto_fallback", streaming('{"bullets": []}'))
+    started = time.monotonic()
+    collect(bullets("A", "A"), [0, 1])
+    assert len(seen) == 2 and seen[0] is not None and seen[0] == seen[1]
+    assert seen[0] <= started + ai_service.ENDPOINT_DEADLINES.get("rewrite-bullets", ai_service.LLM_DEFAULT_DEADLINE) + 1
+    assert current_deadline.get() is None  # Not leaked into the caller's context
@@ -0,0 +1,91 @@
+# backend/tests/test_search_index.py
+import asyncio
+from services.search_index import ResumeSearchIndex
+
+BACKEND = {
+    "target_role": "Backend Engineer",
+    "skills": ["Python", "PostgreSQL", "Kubernetes"],
+    "experience": [{"title": "Software Engineer", "bullet_points": ["Built REST APIs in FastAPI"]}],
+}
+FRONTEND = {
+    "target_role": "Frontend Developer",
+    "skills": ["React", "TypeScript", "CSS"],
+    "experience": [{"title": "UI Engineer", "bullet_points": ["Shipped a design system"]}],
+}
+DATA = {
+    "target_role": "Data Scientist",
+    "skills": ["Python", "pandas", "machine learning"],
+}
+
+def ids(hits):
+    return [hit.resume_id for hit in hits]
+
+def test_update_compact_query(tmp_path):
+    index = ResumeSearchIndex(str(tmp_path), compact_after=100)
+    index.upsert("be", "Backend", BACKEND, "u1")
+    index.upsert("fe", "Frontend", FRONTEND, "u2")
+    index.upsert("ds", "Data", DATA, "u3")
+    before = ids(index.search("Python with Kubernetes and PostgreSQL"))
+    assert before[0] == "be" and "fe" not in before
+
+    index.upsert("fe", "Frontend", {**FRONTEND, "skills": ["React", "Kubernetes"]}, "u2")
+    index.delete("ds")
+    assert index.stats()["dead_docs"] == 2
+
+    index.compact()
+    stats = index.stats()
+    assert stats["resumes"] == 2 and stats["dead_docs"] == 0
+    assert stats["log_entries"] == 0 and stats["delta_postings"] == 0
+    hits = index.search("Kubernetes")
+    assert set(ids(hits)) == {"be", "fe"}
+    assert all("kubernetes" in hit.matched_terms for hit in hits)
+    assert index.search("pandas") == []
+
+    # Updates after compaction combine segment and delta postings
+    index.upsert("ds", "Data", DATA, "u3")
+    assert ids(index.search("python pandas"))[0] == "ds"
+
+def test_reload_replays_segment_and_log(tmp_path):
+    index = ResumeSearchIndex(str(tmp_path), compact_after=100)
+    index.upsert("be", "Backend", BACKEND, "u1")
+    index.compact()
+    index.upsert("fe", "Frontend", FRONTEND, "u2")
+    index.delete("be")
+
+    reloaded = ResumeSearchIndex(str(tmp_path), compact_after=100)
+    assert reloaded.enabled
+    assert reloaded.stats()["resumes"] == 1
+    hits = reloaded.search("React TypeScript")
+    assert ids(hits) == ["fe"] and hits[0].user_id == "u2"
+    assert reloaded.search("Python PostgreSQL") == []
+
+def test_sync_updates_compact_at_the_threshold(tmp_path):
+    index = ResumeSearchIndex(str(tmp_path), compact_after=2)
+    index.upsert("be", "Backend", BACKEND)
+    index.upsert("fe", "Frontend", FRONTEND)
+    assert index.stats()["log_entries"] == 0
+    assert index.stats()["segment_docs"] == 2
+
+def test_async_updates_compact_in_the_background(tmp_path):
+    index = ResumeSearchIndex(str(tmp_path), compact_after=2)
+
+    async def scenario():
+        await index.upsert_async("be", "Backend", BACKEND)
+        await index.upsert_async("fe", "Frontend", FRONTEND)
+        assert index._compaction is not None
+        # Updates queue behind the running compaction instead of racing it
+        await index.upsert_async("ds", "Data", DATA)
+        assert await index.delete_async("missing") is False
+        await index._compaction
+
+    asyncio.run(scenario())
+    stats = index.stats()
+    assert stats["resumes"] == 3
+    assert stats["segment_docs"] + stats["log_entries"] >= 3
+    assert set(ids(index.search("Python"))) == {"be", "ds"}
+
+def test_compact_async_without_updates_is_a_no_op(tmp_path):
+    index = ResumeSearchIndex(str(tmp_path))
+    asyncio.run(index.compact_async())
+    assert index.stats()["segment_docs"] == 0
+    assert not (tmp_path / "segment.bin").exists()
@@ -0,0 +1,66 @@
+# backend/tests/test_skill_taxonomy.py
+import json
+import pytest
+from services.skill_taxonomy import (
+    ARTIFACT_PATH, TAXONOMY_PATH, SkillTaxonomy, compile_taxonomy, file_sha256, load_skill_taxonomy, skill_taxonomy,
+)
+
+AMBIGUOUS = {"Swift", "React", "Ruby", "Julia", "Apache Spark", "Rust", "Dart", "Flask", "Chef", "Puppet", "Go", "C", "R"}
+
+def skills(text):
+    return {m.skill for m in skill_taxonomy.extract(text)}
+
+def test_everyday_words_and_names_are_not_skills():
+    prose = """
+    Julia Ruby joined the support team in March. Delivered swift responses to customer tickets
+    and learned to react to incidents calmly. Spark joy in the team; ready to go the extra mile.
+    Led a rust removal project, kept a flask of coffee at hand, ran the chef rotation and a puppet show.
+    """
+    assert not skills(prose) & AMBIGUOUS
+
+def test_aliases_and_skill_lists_still_match():
+    assert skills("Built the dashboard with React.js and React Hooks") == {"React"}
+    assert skills("iOS apps in SwiftUI, data jobs in PySpark") >= {"SwiftUI", "Apache Spark"}
+    assert skills("Deployed with Helm charts, Puppet Enterprise and Chef Infra") >= {"Helm", "Puppet", "Chef"}
+    # Names that are also words count when listed alongside another skill
+    assert skills("Languages: Python, Swift, Rust, Julia and Ruby") == {"Python", "Swift", "Rust", "Julia", "Ruby"}
+    assert skills("Skills: React, Redux, TypeScript") == {"React", "Redux", "TypeScript"}
+    assert skills("C/C++ and Go") == {"C", "C++", "Go"}
+    # ... but not when the list is only made of them
+    assert skills("Julia, Ruby and Rust") == set()
+
+def test_counts_and_matched_terms():
+    [match] = skill_taxonomy.extract("k8s clusters; Kubernetes operators; K8S upgrades")
+    assert match.skill == "Kubernetes"
+    assert match.count == 3
+    assert match.matched_terms == ["k8s", "kubernetes"]
+
+def test_longest_match_wins():
+    assert skills("React Native apps") == {"React Native"}
+
+def test_aliases_exclude_list_only_names():
+    aliases = skill_taxonomy.aliases()
+    assert aliases["Python"][0] == "python"
+    assert "react" not in aliases["React"] and "react.js" in aliases["React"]
+    # Every list-only skill keeps an alias that can carry it in prose
+    assert all(aliases[name] for name in AMBIGUOUS)
+
+def test_conflicting_alias_is_rejected():
+    taxonomy = {"skills": {"A": {"category": "x", "aliases": ["shared"]}, "B": {"category": "x", "aliases": ["shared"]}}}
+    with pytest.raises(ValueError):
+        compile_taxonomy(taxonomy)
+
+def test_artifact_round_trip_and_freshness(tmp_path):
+    with open(TAXONOMY_PATH, encoding="utf-8") as f:
+        compiled = compile_taxonomy(json.load(f), file_sha256(TAXONOMY_PATH))
+    restored = SkillTaxonomy.from_bytes(compiled.to_bytes())
+    assert restored.patterns == compiled.patterns
+    assert restored.list_only == compiled.list_only
+    text = "Python, Go and Julia; React.js"
+    assert restored.extract(text) == compiled.extract(text)
+    # The committed artifact is built from the committed taxonomy
+    assert load_skill_taxonomy(ARTIFACT_PATH, TAXONOMY_PATH).source_hash == file_sha256(TAXONOMY_PATH)
+
+    stale = tmp_path / "stale.bin"
+    stale.write_bytes(b"SKAC")
+    assert load_skill_taxonomy(str(stale), TAXONOMY_PATH).patterns == compiled.patterns
@@ -0,0 +1,39 @@
+# backend/tests/test_streaming.py
+from services.streaming import JSONStringFieldStreamer
+
+def stream(chunks, field="text"):
+    streamer = JSONStringFieldStreamer(field)
+    out = "".join(streamer.feed(chunk) for chunk in chunks)
+    return out + streamer.close(), streamer
+
+def test_extracts_only_the_requested_field():
+    text, streamer = stream(['{"title": "x", "te', 'xt": "Dear ', 'team,\\nThanks", "tone": "warm"}'])
+    assert text == "Dear team,\nThanks"
+    assert streamer.done
+
+def test_nested_keys_with_the_same_name_are_ignored():
+    text, _ = stream(['{"meta": {"text": "no"}, "text": "yes"}'])
+    assert text == "yes"
+
+def test_unicode_escapes_split_across_chunks():
+    text, _ = stream(['{"text": "caf\\u00', 'e9 \\ud83d', '\\ude', '00"}'])
+    assert text == "café 😀"
+
+def test_bad_hex_is_kept_as_literal_text():
+    text, streamer = stream(['{"text": "C:\\users and \\u12zz ok"}'])
+    assert text == "C:\\users and \\u12zz ok"
+    assert streamer.done
+
+def test_bad_escape_does_not_swallow_the_closing_quote():
+    text, streamer = stream(['{"text": "abc\\u12", "other": "x"}'])
+    assert text == "abc\\u12"
+    assert streamer.done
+
+def test_unpaired_surrogates_are_kept_as_literal_text():
+    text, _ = stream(['{"text": "a\\ud83d b \\ude00 c\\ud83d"}'])
+    assert text == "a\\ud83d b \\ude00 c\\ud83d"
+
+def test_truncated_escape_is_flushed_on_close():
+    text, streamer = stream(['{"text": "cut off \\u00'])
+    assert text == "cut off \\u00"
+    assert not streamer.done
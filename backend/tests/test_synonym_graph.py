@@ -0,0 +1,117 @@
+# backend/tests/test_synonym_graph.py
+import asyncio
+import pytest
+from services import ai_service
+from services.request_context import current_client_id
+from services.synonym_graph import LearnedSynonymStore, SynonymVotes, expand_keywords_locally, load_synonym_graph
+from schemas.resume import KeywordSynonymExpanderInput
+
+RESUME = """
+Led the payments team. Led the migration to Kubernetes.
+Led hiring for the platform group and improved deploy times.
+"""
+JOB = "Required: storytelling with data. Experience with Terraform is required."
+
+def test_expand_keywords_locally_finds_overused_and_missing_terms():
+    expansion = expand_keywords_locally(load_synonym_graph(), RESUME, JOB)
+    assert expansion.keywords[0] == "led"  # Repeated three times
+    assert expansion.keyword_density_analysis["overused_keywords"] == ["led"]
+    assert {"storytelling", "terraform"} <= set(expansion.keyword_density_analysis["underused_keywords"])
+    assert "spearheaded" in expansion.synonyms["led"]
+    assert expansion.suggested_replacements["led"] and "led" not in expansion.suggested_replacements["led"]
+    assert "storytelling" not in expansion.synonyms  # Not in the graph: left to the LLM
+    assert expansion.ats_impact["kubernetes"] == "high" and expansion.ats_impact["led"] == "medium"
+    assert any("storytelling" in r for r in expansion.recommendations)
+
+def test_balanced_resume_gets_the_default_recommendation():
+    expansion = expand_keywords_locally(load_synonym_graph(), "Built a billing service.")
+    assert expansion.keyword_density_analysis["optimal_density"] == "good"
+    assert len(expansion.recommendations) == 1
+
+def test_votes_need_agreement_from_different_clients():
+    votes = SynonymVotes(min_agreement=2, ttl=100)
+    assert votes.vote("storytelling", ["narrative design", "data stories"], "Note A", "ip:a", now=0) == ([], None)
+    assert votes.own("Storytelling", "ip:a", now=1) == (["narrative design", "data stories"], "Note A")
+    assert votes.own("storytelling", "ip:b", now=1) == ([], None)
+    # The same client asking again doesn't count twice
+    assert votes.vote("storytelling", ["narrative design"], "Note A", "ip:a", now=2) == ([], None)
+    agreed, context = votes.vote("storytelling", ["Narrative Design", "pitching"], "Note B", "ip:b", now=3)
+    assert agreed == ["narrative design"]
+    assert context == "Note B"  # Two clients got a note; the latest wins
+    assert votes.stats()["pending_terms"] == 0
+
+def test_pending_votes_expire_and_are_bounded():
+    votes = SynonymVotes(min_agreement=2, ttl=10, max_terms=2)
+    votes.vote("storytelling", ["narrative design"], None, "ip:a", now=0)
+    assert votes.vote("storytelling", ["narrative design"], None, "ip:b", now=20) == ([], None)
+    votes.vote("pitching", ["presenting"], None, "ip:a", now=21)
+    votes.vote("negotiation", ["bargaining"], None, "ip:a", now=22)
+    assert votes.stats()["pending_terms"] == 2
+    assert votes.own("storytelling", "ip:b", now=22) == ([], None)  # Evicted as least recently voted
+
+def test_learned_synonyms_expire():
+    graph = load_synonym_graph()
+    graph.learn("storytelling", ["narrative design"], "Use for pitches.", learned_at=0)
+    assert graph.synonyms("storytelling") == ["narrative design"]
+    assert graph.learned("storytelling") == ["narrative design"]
+    groups = graph.stats()["groups"]
+    assert graph.expire_learned(max_age=10, now=5) == 0
+    assert graph.expire_learned(max_age=10, now=11) == 1
+    assert "storytelling" not in graph
+    assert graph.context("storytelling") is None
+    assert graph.stats()["groups"] == groups - 1
+    assert "spearheaded" in graph.synonyms("led")  # Bundled groups stay
+
+def test_learn_and_replay_round_trip(tmp_path):
+    store = LearnedSynonymStore(str(tmp_path / "synonyms.sqlite3"))
+    graph = load_synonym_graph()
+    graph.learn("storytelling", ["narrative design", "data stories"], "Use for pitches.")
+    store.save("storytelling", graph.learned("storytelling"), graph.context("storytelling"))
+
+    replayed = load_synonym_graph()
+    assert LearnedSynonymStore(store.db_path).load_into(replayed) == 1
+    assert replayed.synonyms("storytelling") == ["narrative design", "data stories"]
+    assert replayed.context("storytelling") == "Use for pitches."
+    # Entries past their TTL are deleted instead of replayed
+    assert LearnedSynonymStore(store.db_path).load_into(load_synonym_graph(), max_age=-1) == 0
+    assert LearnedSynonymStore(store.db_path).load_into(load_synonym_graph()) == 0
+
+@pytest.fixture
+def fresh_graph(monkeypatch, tmp_path):
+    graph = load_synonym_graph()
+    store = LearnedSynonymStore(str(tmp_path / "synonyms.sqlite3"))
+    monkeypatch.setattr(ai_service, "synonym_graph", graph)
+    monkeypatch.setattr(ai_service, "synonym_votes", SynonymVotes(min_agreement=2))
+    monkeypatch.setattr(ai_service, "learned_synonyms", store)
+    return graph, store
+
+def expand(client_id):
+    async def run():
+        token = current_client_id.set(client_id)
+        try:
+            return await ai_service.expand_keyword_synonyms(
+                KeywordSynonymExpanderInput(resume_text=RESUME, target_role="Engineer", job_description=JOB)
+            )
+        finally:
+            current_client_id.reset(token)
+    return asyncio.run(run())
+
+def test_llm_answers_are_per_client_until_others_agree(fake_llm, fresh_graph):
+    graph, store = fresh_graph
+    fake_llm.respond = lambda kwargs: {"keyword_synonyms": [
+        {"original_keyword": "storytelling", "synonyms": ["narrative design", "data stories"], "context": "Use for pitches."},
+    ]}
+    first = expand("ip:a")
+    assert {k.original_keyword: k.synonyms for k in first.keyword_synonyms}["storytelling"] == ["narrative design", "data stories"]
+    assert "storytelling" not in graph
+
+    # The same client gets its own answer back without asking again
+    expand("ip:a")
+    assert "storytelling" not in fake_llm.calls[-1]["messages"][-1]["content"]
+
+    # A second client's agreeing answer teaches the shared graph, and it's persisted
+    expand("ip:b")
+    assert graph.synonyms("storytelling") == ["narrative design", "data stories"]
+    replayed = load_synonym_graph()
+    LearnedSynonymStore(store.db_path).load_into(replayed)
+    assert replayed.context("storytelling") == "Use for pitches."
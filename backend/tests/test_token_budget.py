@@ -0,0 +1,90 @@
+# backend/tests/test_token_budget.py
+from services import ai_service, token_budget
+from services.token_budget import (
+    TRUNCATION_MARKER, EndpointBudget, PromptSection, count_message_tokens, count_tokens, endpoint_budget,
+    fit_sections, parse_budget_overrides, trim_history, truncate_to_tokens
+)
+
+MODEL = "meta-llama/llama-3.2-3b-instruct:free"
+
+def test_count_tokens_uses_the_family_ratio():
+    text = "x" * 380
+    assert count_tokens("", MODEL) == 0
+    assert count_tokens(text, MODEL) == 101  # 3.8 chars per token
+    assert count_tokens(text, "unknown/model") == 109  # 3.5 by default
+    assert count_message_tokens([{"role": "user", "content": text}], MODEL) == 101 + token_budget.MESSAGE_OVERHEAD_TOKENS
+
+def test_endpoint_budget_shrinks_to_the_smallest_window():
+    assert endpoint_budget("review", ["openai/gpt-4o-mini"]) == EndpointBudget(6000, 3000)
+    # 8k free-tier window: the completion keeps its budget, the prompt gets the rest
+    assert endpoint_budget("review", ["openai/gpt-4o-mini", MODEL]) == EndpointBudget(8192 - 3000, 3000)
+    # The completion never takes more than half the window
+    assert endpoint_budget("translate", [MODEL]) == EndpointBudget(4096, 4096)
+    assert endpoint_budget("no-such-endpoint", []) == token_budget.DEFAULT_ENDPOINT_BUDGET
+
+def test_budget_overrides():
+    overrides = parse_budget_overrides('{"review": {"prompt_tokens": 8000}, "chat": {"completion_tokens": "500"}}')
+    assert overrides["review"] == EndpointBudget(8000, token_budget.DEFAULT_ENDPOINT_BUDGET.completion_tokens)
+    assert overrides["chat"] == EndpointBudget(token_budget.DEFAULT_ENDPOINT_BUDGET.prompt_tokens, 500)
+    assert parse_budget_overrides("") == {}
+    assert parse_budget_overrides("{not json") == {}
+    assert parse_budget_overrides('{"review": 5}') == {}
+
+def test_truncate_keeps_text_that_fits():
+    assert truncate_to_tokens("short text", 100, MODEL) == "short text"
+
+def test_truncate_cuts_at_a_line_boundary():
+    text = "\n".join(f"Line {i}: built and shipped a feature used by many customers" for i in range(50))
+    cut = truncate_to_tokens(text, 100, MODEL)
+    assert count_tokens(cut, MODEL) <= 100
+    assert cut.endswith(TRUNCATION_MARKER)
+    body = cut[:-len(TRUNCATION_MARKER)]
+    assert text.startswith(body)
+    assert body.endswith("customers")  # whole lines only
+
+def test_truncate_below_the_marker_size_drops_everything():
+    assert truncate_to_tokens("word " * 200, count_tokens(TRUNCATION_MARKER, MODEL), MODEL) == ""
+
+def test_fit_sections_trims_lowest_priority_first():
+    resume = "Resume line with achievements and metrics.\n" * 40
+    job = "Job description requirement sentence here.\n" * 40
+    sizes = [count_tokens(resume, MODEL), count_tokens(job, MODEL)]
+    budget = sum(sizes) - 100
+    texts = fit_sections([PromptSection(resume, priority=2), PromptSection(job, priority=1)], budget, MODEL)
+    assert texts[0] == resume  # Order is preserved and the higher priority is untouched
+    assert texts[1] != job and texts[1].endswith(TRUNCATION_MARKER)
+    assert sum(count_tokens(t, MODEL) for t in texts) <= budget
+
+def test_fit_sections_moves_on_when_a_section_is_used_up():
+    sections = [PromptSection("keep " * 10, 3), PromptSection("a " * 100, 1), PromptSection("b\n" * 100, 2)]
+    texts = fit_sections(sections, 60, MODEL)
+    assert texts[0] == "keep " * 10
+    assert texts[1] == ""
+    assert texts[2] and texts[2] != "b\n" * 100
+    assert sum(count_tokens(t, MODEL) for t in texts) <= 60
+
+def test_fit_sections_within_budget_is_unchanged():
+    sections = [PromptSection("alpha"), PromptSection("beta", 2)]
+    assert fit_sections(sections, 1000, MODEL) == ["alpha", "beta"]
+
+def test_trim_history_drops_oldest_turns_only():
+    messages = [{"role": "system", "content": "s" * 40}] + [
+        {"role": "user" if i % 2 else "assistant", "content": f"turn {i} " + "x" * 100} for i in range(6)
+    ]
+    trimmed = trim_history(messages, 80, MODEL, keep_last=2)
+    assert trimmed[0] == messages[0]
+    assert trimmed[-2:] == messages[-2:]
+    assert len(trimmed) < len(messages)
+    # keep_last wins over the budget
+    assert trim_history(messages, 1, MODEL, keep_last=2) == [messages[0]] + messages[-2:]
+
+def test_fit_prompt_records_truncation(monkeypatch):
+    monkeypatch.setattr(ai_service, "MODEL_LIST", [MODEL])
+    tracker = token_budget.TokenUsageTracker()
+    monkeypatch.setattr(ai_service, "token_usage_tracker", tracker)
+    budget = endpoint_budget("rewrite-bullet", [MODEL])
+    long_text = "Did a thing that mattered.\n" * 2000
+    (fitted,) = ai_service.fit_prompt("rewrite-bullet", "system prompt", PromptSection(long_text))
+    assert count_tokens(fitted, ai_service.MODEL_NAME) <= budget.prompt_tokens
+    assert tracker.stats()["rewrite-bullet"]["truncated"] == 1
+    assert ai_service.fit_prompt("rewrite-bullet", "system prompt", PromptSection("short")) == ["short"]
@@ -0,0 +1,101 @@
+# backend/tests/test_upstream_scheduler.py
+import asyncio
+from services.upstream_scheduler import ModelLimiter
+
+def run(coro):
+    return asyncio.run(coro)
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+async def queue_requests(limiter, requests, started):
+    """
+    Queue (name, priority, client, cost) requests behind a held slot, then release it and
+    record the order in which they start.
+    """
+    await limiter.acquire(1, "standard", "holder")
+
+    async def request(name, priority, client, cost):
+        await limiter.acquire(cost, priority, client)
+        started.append(name)
+        await asyncio.sleep(0)
+        limiter.release(priority)
+
+    tasks = [asyncio.create_task(request(*r)) for r in requests]
+    await settle()
+    assert started == []
+    limiter.release("standard")
+    await asyncio.gather(*tasks)
+
+def test_priority_classes_are_served_in_order():
+    limiter = ModelLimiter("m", concurrency=1)
+    started = []
+    run(queue_requests(limiter, [
+        ("batch", "batch", "a", 10),
+        ("standard", "standard", "a", 10),
+        ("interactive", "interactive", "a", 10),
+    ], started))
+    assert started == ["interactive", "standard", "batch"]
+
+def test_clients_are_interleaved_within_a_class():
+    limiter = ModelLimiter("m", concurrency=1)
+    started = []
+    run(queue_requests(limiter, [
+        ("a1", "standard", "a", 100),
+        ("a2", "standard", "a", 100),
+        ("a3", "standard", "a", 100),
+        ("b1", "standard", "b", 100),
+    ], started))
+    assert started.index("b1") < started.index("a3")
+
+def test_batch_never_takes_every_slot():
+    assert ModelLimiter("m", concurrency=4, batch_max_share=0.5).batch_slots == 2
+    assert ModelLimiter("m", concurrency=2, batch_max_share=1.0).batch_slots == 1
+    assert ModelLimiter("m", concurrency=1).batch_slots == 0
+
+    async def scenario():
+        limiter = ModelLimiter("m", concurrency=4, batch_max_share=0.5)
+        for _ in range(2):
+            await limiter.acquire(1, "batch", "a")
+        third = asyncio.create_task(limiter.acquire(1, "batch", "a"))
+        await settle()
+        assert not third.done()
+        # Interactive work still gets the free slots
+        await asyncio.wait_for(limiter.acquire(1, "interactive", "b"), 1)
+        limiter.release("batch")
+        await asyncio.wait_for(third, 1)
+
+    run(scenario())
+
+def test_single_slot_batch_runs_only_when_idle():
+    async def scenario():
+        limiter = ModelLimiter("m", concurrency=1)
+        await limiter.acquire(1, "batch", "a")  # Idle model: batch may start
+        limiter.release("batch")
+
+        await limiter.acquire(1, "interactive", "b")
+        batch = asyncio.create_task(limiter.acquire(1, "batch", "a"))
+        interactive = asyncio.create_task(limiter.acquire(1, "interactive", "c"))
+        await settle()
+        limiter.release("interactive")
+        await settle()
+        assert interactive.done() and not batch.done()
+        limiter.release("interactive")
+        await asyncio.wait_for(batch, 1)
+        assert limiter.in_flight_by_class["batch"] == 1
+
+    run(scenario())
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        limiter = ModelLimiter("m", concurrency=1)
+        await limiter.acquire(1, "standard", "a")
+        waiter = asyncio.create_task(limiter.acquire(1, "standard", "b"))
+        await settle()
+        waiter.cancel()
+        await settle()
+        limiter.release("standard")
+        assert limiter.in_flight == 0 and not limiter._waiters
+
+    run(scenario())
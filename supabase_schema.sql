@@ -96,3 +96,8 @@ CREATE TRIGGER update_resumes_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
+
+-- Resume search: the backend keeps its own inverted index of resume content (skills, titles,
+-- bullets). Keep it current with a Database Webhook on this table (Database -> Webhooks):
+-- events INSERT, UPDATE, DELETE; HTTP POST to <backend URL>/api/search/webhook with header
+-- X-Search-Key: <SEARCH_API_KEY>.